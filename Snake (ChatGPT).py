@@ -1,72 +1,39 @@
-import pygame
 import math
+import numpy as np
+
+from snakesim.body import SnakeBody
+from snakesim.collision import sweep
+from snakesim.geometry import RegularPolygon
+from snakesim.governor import FrameGovernor
+from snakesim.profiler import FrameProfiler
+from snakesim.timestep import FixedTimestep
 
 #########################
 #  CONFIGURATION
 #########################
 WINDOW_WIDTH  = 800
 WINDOW_HEIGHT = 600
-FPS = 60
+FPS = 144         # frame cap for drawing, 0 for uncapped
+PHYSICS_HZ = 60   # physics steps per second (speeds below are per step)
+DIRTY_RECTS = False  # redraw/present only the changed areas instead of the full frame
+OUTLINE_CACHE = 0  # pre-rendered anti-aliased pentagon outlines per symmetry period to blit from, 0 to draw it
+PROFILE = False   # time each phase of the loop (F3 overlay), written to PROFILE_OUT on exit
+PROFILE_OUT = "profile.json"
 
 # Pentagon / snake settings
 PENTAGON_RADIUS = 200
 PENTAGON_SIDES  = 5
-ROTATION_SPEED  = 0.01  # Radians per frame
+ROTATION_SPEED  = 0.01  # Radians per step
 SNAKE_SPEED     = 3.0
 SNAKE_HEAD_RADIUS = 10
 SNAKE_LENGTH    = 30  # number of segments in snake
 SNAKE_SEGMENT_SPACING = 4  # distance between consecutive snake segments
-
-#########################
-#  INITIALIZE PYGAME
-#########################
-pygame.init()
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Rotating Pentagon Bouncing Snake")
-clock = pygame.time.Clock()
+SWEPT_COLLISION = False  # solve exact contact times instead of testing end positions
 
 #########################
 #  HELPER FUNCTIONS
 #########################
 
-def create_pentagon_points(center, radius, sides=5, rotation=0.0):
-    """
-    Return a list of (x, y) points for a regular polygon (pentagon by default)
-    given:
-      - center (cx, cy)
-      - radius
-      - sides (default=5)
-      - rotation offset in radians
-    """
-    cx, cy = center
-    points = []
-    for i in range(sides):
-        angle = 2.0 * math.pi * i / sides + rotation
-        x = cx + radius * math.cos(angle)
-        y = cy + radius * math.sin(angle)
-        points.append((x, y))
-    return points
-
-def point_in_polygon(pt, polygon):
-    """
-    Determine if point pt=(x,y) is inside a polygon using the ray-casting method.
-    Returns True if inside, False if outside.
-    """
-    x, y = pt
-    inside = False
-    n = len(polygon)
-    for i in range(n):
-        x1, y1 = polygon[i]
-        x2, y2 = polygon[(i+1) % n]
-        # Check if the line from (x1,y1)->(x2,y2) intersects with
-        # a ray going to the right from point (x,y).
-        if ((y1 > y) != (y2 > y)):
-            # Compute the x-coordinate where it intersects
-            intersectX = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
-            if intersectX > x:  # a valid crossing
-                inside = not inside
-    return inside
-
 def distance_point_to_line_segment(px, py, x1, y1, x2, y2):
     """
     Returns the distance from point (px,py) to the line segment from (x1,y1) to (x2,y2).
@@ -136,63 +103,65 @@ def reflect_velocity(vel, normal):
 center_x = WINDOW_WIDTH // 2
 center_y = WINDOW_HEIGHT // 2
 
-# Snake will be stored as a list of (x,y) from head to tail
-snake_positions = []
-snake_positions.append((center_x, center_y))  # start with just a head
+# Snake will be stored as a ring buffer of (x,y) from head to tail
+snake_positions = SnakeBody(SNAKE_LENGTH)
+snake_positions.extend_tail([(center_x, center_y)])  # start with just a head
 # We can fill initial positions behind head:
-for i in range(1, SNAKE_LENGTH):
-    snake_positions.append((center_x - i*SNAKE_SEGMENT_SPACING, center_y))
+snake_positions.extend_tail([(center_x - i*SNAKE_SEGMENT_SPACING, center_y)
+                             for i in range(1, SNAKE_LENGTH)])
 
 # Snake velocity (head). Start moving diagonally
 snake_velocity = (SNAKE_SPEED, -SNAKE_SPEED)
 
-# Keep track of rotation angle for the pentagon
-pentagon_angle = 0.0
-
-running = True
-
-while running:
-    dt = clock.tick(FPS) / 1000.0  # seconds passed since last frame
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+# The pentagon keeps its unit shape cached and only tracks its rotation angle
+pentagon = RegularPolygon((center_x, center_y), PENTAGON_RADIUS,
+                          sides=PENTAGON_SIDES, step=ROTATION_SPEED)
+
+
+def step():
+    """Advance the simulation by one fixed physics step."""
+    global snake_velocity
+
+    if SWEPT_COLLISION:
+        # Move head and pentagon together, bouncing at the exact time the
+        # head circle touches a (rotating) wall, so it can never end up outside
+        pos = np.array([snake_positions.head])
+        vel = np.array([snake_velocity], dtype=float)
+        angle = np.array([pentagon.angle])
+        sweep(pos, vel, angle, SNAKE_HEAD_RADIUS, (center_x, center_y),
+              PENTAGON_RADIUS, PENTAGON_SIDES, ROTATION_SPEED)
+        profiler.lap("collision")
+        pentagon.rotate()
+        profiler.lap("pentagon")
+        snake_velocity = (float(vel[0, 0]), float(vel[0, 1]))
+        snake_positions.push(pos[0, 0], pos[0, 1])
+        profiler.lap("body")
+        return
 
     # Update pentagon rotation
-    pentagon_angle += ROTATION_SPEED
+    pentagon.rotate()
+    profiler.lap("pentagon")
 
     # 1) Update snake head position
-    head_x, head_y = snake_positions[0]
+    head_x, head_y = snake_positions.head
     vx, vy = snake_velocity
 
     new_head_x = head_x + vx
     new_head_y = head_y + vy
-
-    # 2) Build the new pentagon (rotated)
-    pentagon_points = create_pentagon_points(
-        (center_x, center_y),
-        PENTAGON_RADIUS,
-        sides=PENTAGON_SIDES,
-        rotation=pentagon_angle
-    )
-
-    # 3) Check collision:
-    #    We'll see if the new head position is *outside* the pentagon.
-    #    If it is outside, we attempt a more accurate reflection using the nearest edge.
-    if not point_in_polygon((new_head_x, new_head_y), pentagon_points):
-        # Attempt to reflect around the nearest pentagon edge
-        # Find the edge that gives the minimal distance to head
-        min_dist = float('inf')
-        best_normal = (0, 0)
-
-        for i in range(len(pentagon_points)):
-            x1, y1 = pentagon_points[i]
-            x2, y2 = pentagon_points[(i+1) % len(pentagon_points)]
-            dist, normal_vec = distance_point_to_line_segment(
-                new_head_x, new_head_y, x1, y1, x2, y2
-            )
-            if dist < min_dist:
-                min_dist = dist
-                best_normal = normal_vec
+    profiler.lap("head")
+
+    # 2) Check collision:
+    #    The only edge that can matter is the one whose sector (seen from the
+    #    centre) the new head is in: it is the nearest edge, both for the
+    #    inside test and for the reflection. Found from the head's angle, so
+    #    this costs the same for any number of sides.
+    edge, wall_dist = pentagon.nearest_edge(new_head_x, new_head_y)
+    if wall_dist < 0:
+        # The head is *outside* the pentagon: reflect around the nearest edge
+        (x1, y1), (x2, y2), _ = pentagon.edge(edge)
+        dist, best_normal = distance_point_to_line_segment(
+            new_head_x, new_head_y, x1, y1, x2, y2
+        )
 
         # Reflect velocity
         snake_velocity = reflect_velocity(snake_velocity, best_normal)
@@ -206,24 +175,130 @@ while running:
         # This naive approach simply repositions the head a bit:
         # new_head_x = head_x + vx * 0.5
         # new_head_y = head_y + vy * 0.5
+    profiler.lap("collision")
 
-    # 4) Update snake body:
+    # 3) Update snake body:
     #    Move the head to new position and "pull" each segment after it
-    snake_positions.insert(0, (new_head_x, new_head_y))  # new head at front
-    snake_positions.pop()  # remove last tail segment to keep length
+    #    (pushing the new head drops the last tail segment in O(1))
+    snake_positions.push(new_head_x, new_head_y)
+    profiler.lap("body")
 
-    # 5) RENDER
-    screen.fill((0, 0, 0))
 
-    # Draw pentagon
-    pygame.draw.polygon(screen, (255, 255, 255), pentagon_points, width=2)
+def snapshot():
+    """The whole simulation state as plain data (see ``restore``)."""
+    return {
+        "snake": snake_positions.snapshot(),
+        "velocity": list(snake_velocity),
+        "pentagon": pentagon.snapshot(),
+    }
+
+
+def restore(state):
+    """Go back to a ``snapshot()``; the following steps replay exactly."""
+    global snake_velocity
+    snake_positions.restore(state["snake"])
+    snake_velocity = tuple(state["velocity"])
+    pentagon.restore(state["pentagon"])
 
-    # Draw snake (simple approach: draw circles for each segment)
-    for i, pos in enumerate(snake_positions):
-        color = (200, 200, 50) if i == 0 else (0, 255, 0)
-        pygame.draw.circle(screen, color, (int(pos[0]), int(pos[1])), SNAKE_HEAD_RADIUS)
 
-    # Show everything
-    pygame.display.flip()
+# Per-phase timings (does nothing unless PROFILE is on)
+profiler = FrameProfiler(enabled=PROFILE)
 
-pygame.quit()
+
+#########################
+#  DISPLAY
+#########################
+# Importing this file only sets up the physics: pygame is imported, and the
+# window opened, by init_display()
+pygame = None
+render = None
+screen = None
+snake_sprites = None
+dirty = None
+overlay = None
+outline = None
+
+
+def init_display(surface=None):
+    """Import pygame and open the window (or draw into ``surface``); returns the screen."""
+    global pygame, render, screen, snake_sprites, dirty, overlay, outline
+    import pygame
+    from snakesim import render
+    pygame.init()
+    if surface is None:
+        surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Rotating Pentagon Bouncing Snake")
+    screen = surface
+    # Head is yellow, the rest green (each distinct circle is rendered only once)
+    snake_sprites = render.SnakeSprites(SNAKE_HEAD_RADIUS, [(200, 200, 50)] + [(0, 255, 0)] * (SNAKE_LENGTH - 1))
+    # Clears and presents the whole frame, or only what changed in DIRTY_RECTS mode
+    dirty = render.DirtyRects((0, 0, 0), DIRTY_RECTS)
+    overlay = render.TimingOverlay(profiler)
+    if OUTLINE_CACHE:
+        outline = render.OutlineCache(pentagon.center, PENTAGON_RADIUS, PENTAGON_SIDES, (255, 255, 255), 2,
+                                      OUTLINE_CACHE)
+    return screen
+
+
+def draw(alpha):
+    """
+    Render the current state, blended alpha of a step past the previous one.
+    Returns the rects that were drawn to.
+    """
+    dirty.erase(screen)
+
+    # Draw pentagon
+    angle = pentagon.angle - ROTATION_SPEED * (1 - alpha)
+    if outline is not None:
+        rects = outline.draw(screen, angle)
+    else:
+        pentagon_points = pentagon.vertices_at(angle)
+        pygame.draw.polygon(screen, (255, 255, 255), pentagon_points, width=2)
+        rects = render.outline_rects(pentagon_points, 2)
+
+    # Draw snake: cached circle sprites, the whole body in one blits call
+    positions = snake_positions.interpolated(alpha)
+    snake_sprites.draw(screen, positions)
+
+    return rects + [render.points_rect(positions, SNAKE_HEAD_RADIUS)]
+
+
+def main():
+    init_display()
+    timestep = FixedTimestep(PHYSICS_HZ)
+    # Frame cap; draws less while hidden, unfocused or idle, skips when behind
+    governor = FrameGovernor(FPS, PHYSICS_HZ)
+    running = True
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            overlay.handle(event)
+            governor.handle(event)
+        profiler.lap("event")
+
+        # Physics runs at PHYSICS_HZ whatever the frame rate is
+        steps = timestep.tick()
+        for _ in range(steps):
+            step()
+
+        # 5) RENDER
+        if governor.render(steps):
+            rects = draw(timestep.alpha)
+            rects += overlay.draw(screen)
+            profiler.lap("draw")
+
+            # Show everything (or only the changed rects)
+            dirty.present(rects)
+            profiler.lap("flip")
+        governor.wait()
+        profiler.lap("wait")
+        profiler.frame()
+
+    profiler.dump(PROFILE_OUT)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
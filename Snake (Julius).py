@@ -1,18 +1,22 @@
-# Import necessary libraries
-import pygame
-import math
+# Import necessary libraries (pygame only when drawing, see init_display)
 import sys
 
-# Initialize pygame
-pygame.init()
+from snakesim.body import SnakeBody
+from snakesim.geometry import RegularPolygon
+from snakesim.governor import FrameGovernor
+from snakesim.profiler import FrameProfiler
+from snakesim.timestep import FixedTimestep
 
-# Setup the screen
+# Screen size
 width, height = 800, 600
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption('Bouncing Snake in a Rotating Pentagon')
 
-# Clock to control the frame rate
-clock = pygame.time.Clock()
+# Frame rate
+physics_hz = 60   # physics steps per second (speeds are per step)
+render_fps = 144  # frame cap for drawing, 0 for uncapped
+dirty_rects = False  # redraw/present only the changed areas instead of the full frame
+outline_cache = 0  # pre-rendered anti-aliased pentagon outlines per symmetry period to blit from, 0 to draw it
+profile = False   # time each phase of the loop (F3 overlay), written to profile_out on exit
+profile_out = 'profile.json'
 
 # Colors
 BLACK = (0, 0, 0)
@@ -26,31 +30,21 @@ pentagon_center = (width//2, height//2)
 pentagon_radius = 250
 num_sides = 5
 
-# Function to calculate the vertices of a regular pentagon given center, radius and rotation angle
-def get_pentagon_vertices(center, radius, rotation_angle):
-    cx, cy = center
-    vertices = []
-    for i in range(num_sides):
-        angle = math.radians(360/num_sides * i) + rotation_angle
-        x = cx + radius * math.cos(angle)
-        y = cy + radius * math.sin(angle)
-        vertices.append((x, y))
-    return vertices
-
 # Snake properties
 snake_length = 100  # number of segments
-snake_points = []
+# To keep a tail for the snake history, we store recent positions (head first)
+max_points = snake_length
+snake_points = SnakeBody(max_points)
 # Start snake in center with a given initial direction
 head = [width//2, height//2]
-snake_points.append(head[:])
+snake_points.push(*head)
 snake_dir = [3, 2]  # velocity vector
 
-# To keep a tail for the snake history, we store recent positions
-max_points = snake_length
-
 # Rotation of the pentagon
-rotation = 0
-rotation_speed = 0.005  # radians per frame
+rotation_speed = 0.005  # radians per step
+
+# The pentagon caches its unit shape and edge normals; rotating only turns them
+pentagon = RegularPolygon(pentagon_center, pentagon_radius, num_sides, step=rotation_speed)
 
 # Collision detection helper functions
 # Function to get line from two points (for collision) if segment intersects with any edge of pentagon
@@ -87,80 +81,152 @@ def line_intersection(p0, p1, p2, p3):
     intersection_point = (p0[0] + (t * s10_x), p0[1] + (t * s10_y))
     return (True, intersection_point)
 
-# Function to reflect the velocity vector across a line defined by two points (edge of pentagon)
-
-def reflect_velocity(vel, edge_start, edge_end):
-    # edge vector
-    edge_vec = (edge_end[0]-edge_start[0], edge_end[1]-edge_start[1])
-    # normalize edge vector
-    edge_length = math.hypot(edge_vec[0], edge_vec[1])
-    if edge_length == 0:
-        return vel
-    edge_unit = (edge_vec[0]/edge_length, edge_vec[1]/edge_length)
+# Function to reflect the velocity vector across an edge, given the edge's unit normal
 
-    # normal to the edge (rotate by 90 degrees)
-    normal = (-edge_unit[1], edge_unit[0])
+def reflect_velocity(vel, normal):
     # reflect velocity v across normal: v' = v - 2*(v dot n)*n
     v_dot_n = vel[0]*normal[0] + vel[1]*normal[1]
     new_vel = (vel[0] - 2*v_dot_n*normal[0], vel[1] - 2*v_dot_n*normal[1])
     return new_vel
 
-# Main loop
-running = True
-while running:
-    dt = clock.tick(60)  # 60 FPS
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+def step():
+    """Advance the simulation by one fixed physics step."""
+    global snake_dir
 
     # Update pentagon rotation
-    rotation += rotation_speed
-
-    # Get current pentagon vertices for collision detection and drawing
-    pentagon_vertices = get_pentagon_vertices(pentagon_center, pentagon_radius, rotation)
+    pentagon.rotate()
+    profiler.lap('pentagon')
 
     # Update snake head position
     head[0] += snake_dir[0]
     head[1] += snake_dir[1]
-
-    # Check collision with pentagon edges
-    collision_detected = False
-
-    # iterate through each edge of pentagon
-    for i in range(len(pentagon_vertices)):
-        p1 = pentagon_vertices[i]
-        p2 = pentagon_vertices[(i + 1) % len(pentagon_vertices)]
-        collided, pt = line_intersection(snake_points[-1], head, p1, p2)
-        if collided:
-            collision_detected = True
-            # Reflect the snake_dir with respect to the edge
-            snake_dir = list(reflect_velocity(snake_dir, p1, p2))
-            # Move head back to collision point to avoid sticking
-            head[0], head[1] = pt
-            break
-
-    # Append new head position to snake_points
-    snake_points.append(head[:])
-
-    # Keep only max_points
-    if len(snake_points) > max_points:
-        snake_points.pop(0)
-
+    profiler.lap('head')
+
+    # Check collision with pentagon edges. The head can only have crossed an
+    # edge if it (or, once the walls turned past it, its last position) is
+    # outside, and then the crossed edge is the one of the sector it is in
+    # (seen from the centre) or, near a corner, a neighbour of it, so only
+    # those are tested whatever num_sides is
+    edge, wall_dist = pentagon.nearest_edge(*head)
+    if wall_dist < 0 or not pentagon.contains(*snake_points.head):
+        for i in (edge, edge - 1, edge + 1):
+            p1, p2, normal = pentagon.edge(i)
+            collided, pt = line_intersection(snake_points.head, head, p1, p2)
+            if collided:
+                # Reflect the snake_dir with respect to the edge
+                snake_dir = list(reflect_velocity(snake_dir, normal))
+                # Move head back to collision point to avoid sticking
+                head[0], head[1] = pt
+                break
+    profiler.lap('collision')
+
+    # Push new head position to snake_points (keeps only max_points)
+    snake_points.push(*head)
+    profiler.lap('body')
+
+def snapshot():
+    """The whole simulation state as plain data (see restore)."""
+    return {
+        'head': list(head),
+        'direction': list(snake_dir),
+        'points': snake_points.snapshot(),
+        'pentagon': pentagon.snapshot(),
+    }
+
+def restore(state):
+    """Go back to a snapshot(); the following steps replay exactly."""
+    global snake_dir
+    head[:] = state['head']
+    snake_dir = list(state['direction'])
+    snake_points.restore(state['points'])
+    pentagon.restore(state['pentagon'])
+
+# Per-phase timings (does nothing unless profile is on)
+profiler = FrameProfiler(enabled=profile)
+
+# Display, set up by init_display() so importing this file opens no window
+pygame = None
+render = None
+screen = None
+dirty = None
+overlay = None
+outline = None
+
+def init_display(surface=None):
+    """Import pygame and open the window (or draw into surface); returns the screen."""
+    global pygame, render, screen, dirty, overlay, outline
+    import pygame
+    from snakesim import render
+    pygame.init()
+    if surface is None:
+        surface = pygame.display.set_mode((width, height))
+        pygame.display.set_caption('Bouncing Snake in a Rotating Pentagon')
+    screen = surface
+    # Clears and presents the whole frame, or only what changed when dirty_rects is on
+    dirty = render.DirtyRects(BLACK, dirty_rects)
+    overlay = render.TimingOverlay(profiler)
+    if outline_cache:
+        outline = render.OutlineCache(pentagon_center, pentagon_radius, num_sides, BLUE, 3, outline_cache)
+    return screen
+
+def draw(alpha):
+    """Draw the state alpha of a step past the previous one; returns the rects drawn to."""
     # Clear screen
-    screen.fill(BLACK)
+    dirty.erase(screen)
 
     # Draw the rotating pentagon
-    pygame.draw.polygon(screen, BLUE, pentagon_vertices, 3)
+    angle = pentagon.angle - rotation_speed * (1 - alpha)
+    if outline is not None:
+        rects = outline.draw(screen, angle)
+    else:
+        pentagon_vertices = pentagon.vertices_at(angle)
+        pygame.draw.polygon(screen, BLUE, pentagon_vertices, 3)
+        rects = render.outline_rects(pentagon_vertices, 3)
 
     # Draw the snake
     if len(snake_points) > 1:
-        pygame.draw.lines(screen, GREEN, False, snake_points, 3)
+        points = snake_points.interpolated(alpha)
+        pygame.draw.lines(screen, GREEN, False, points, 3)
         # Draw head as red circle
-        pygame.draw.circle(screen, RED, (int(head[0]), int(head[1])), 5)
-
-    pygame.display.flip()
-
-pygame.quit()
-sys.exit()
-
-print('Script executed successfully')
\ No newline at end of file
+        pygame.draw.circle(screen, RED, (int(points[0][0]), int(points[0][1])), 5)
+        rects.append(render.points_rect(points, 5))
+    return rects
+
+def main():
+    init_display()
+    timestep = FixedTimestep(physics_hz)
+    # Frame cap; draws less while hidden, unfocused or idle, skips when behind
+    governor = FrameGovernor(render_fps, physics_hz)
+
+    # Main loop
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            overlay.handle(event)
+            governor.handle(event)
+        profiler.lap('event')
+
+        # Physics runs at physics_hz whatever the frame rate is
+        steps = timestep.tick()
+        for _ in range(steps):
+            step()
+
+        if governor.render(steps):
+            rects = draw(timestep.alpha)
+            rects += overlay.draw(screen)
+            profiler.lap('draw')
+
+            dirty.present(rects)
+            profiler.lap('flip')
+        governor.wait()
+        profiler.lap('wait')
+        profiler.frame()
+
+    profiler.dump(profile_out)
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()
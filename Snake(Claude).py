@@ -1,45 +1,81 @@
-import pygame
 import math
 import numpy as np
 
-# Initialize Pygame
-pygame.init()
+from snakesim.body import SnakeBody
+from snakesim.geometry import RegularPolygon
+from snakesim.governor import FrameGovernor
+from snakesim.pipeline import PhysicsThread
+from snakesim.profiler import FrameProfiler
+from snakesim.timestep import FixedTimestep
 
-# Set up the display
+# Display size
 WIDTH = 800
 HEIGHT = 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Bouncing Snake in Rotating Pentagon")
 
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GREEN = (0, 255, 0)
 
+# Timing
+PHYSICS_HZ = 60   # Physics steps per second (speeds are per step)
+RENDER_FPS = 144  # Frame cap for drawing, 0 for uncapped
+DIRTY_RECTS = False  # Redraw/present only the changed areas instead of the full frame
+OUTLINE_CACHE = 0  # Pre-rendered anti-aliased pentagon outlines per 72 degrees to blit from, 0 to draw it
+THREADED = False  # Step the physics on its own thread, drawing copies of its state on this one
+PROFILE = False   # Time each phase of the loop (F3 overlay), written to PROFILE_OUT on exit
+PROFILE_OUT = "profile.json"
+
+# Per-phase timings (does nothing unless PROFILE is on)
+profiler = FrameProfiler(enabled=PROFILE)
+
+# pygame is only imported (and initialized) by init_display, so importing
+# this file for the physics alone opens no window
+pygame = None
+render = None
+
+def init_display(surface=None):
+    """Import pygame and open the window, unless given a surface to draw into; returns it."""
+    global pygame, render
+    import pygame
+    from snakesim import render
+    pygame.init()
+    if surface is None:
+        surface = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Bouncing Snake in Rotating Pentagon")
+    return surface
+
 class Snake:
     def __init__(self, x, y):
-        self.segments = [(x, y)]
         self.length = 20  # Number of segments
         self.spacing = 10  # Space between segments
         self.velocity = [4, 4]  # Initial velocity
         
         # Initialize snake segments
-        for i in range(1, self.length):
-            self.segments.append((x - i * self.spacing, y))
+        self.segments = SnakeBody(self.length, [(x - i * self.spacing, y) for i in range(self.length)])
+        self.sprites = None  # Pre-rendered gradient circles, built on first draw
     
     def update(self):
-        # Update head position
-        new_x = self.segments[0][0] + self.velocity[0]
-        new_y = self.segments[0][1] + self.velocity[1]
-        self.segments.insert(0, (new_x, new_y))
-        self.segments.pop()
+        # Update head position (the tail drops off in the same O(1) push)
+        head_x, head_y = self.segments.head
+        self.segments.push(head_x + self.velocity[0], head_y + self.velocity[1])
     
-    def draw(self, screen):
-        for i, segment in enumerate(self.segments):
-            # Gradient color from head to tail
-            color_val = 255 - (i * 155 // self.length)
-            color = (0, color_val, 0)
-            pygame.draw.circle(screen, color, (int(segment[0]), int(segment[1])), 5)
+    def snapshot(self):
+        return {"velocity": list(self.velocity), "segments": self.segments.snapshot()}
+    
+    def restore(self, state):
+        self.velocity = list(state["velocity"])
+        self.segments.restore(state["segments"])
+    
+    def draw(self, screen, alpha=1.0):
+        # Blend towards the current state by alpha of a physics step
+        segments = self.segments.interpolated(alpha)
+        if self.sprites is None:
+            # Gradient color from head to tail, one cached sprite per color
+            colors = [(0, 255 - (i * 155 // self.length), 0) for i in range(self.length)]
+            self.sprites = render.SnakeSprites(5, colors)
+        self.sprites.draw(screen, segments)
+        return [render.points_rect(segments, 5)]
 
 class Pentagon:
     def __init__(self, center_x, center_y, radius):
@@ -47,23 +83,39 @@ class Pentagon:
         self.center_y = center_y
         self.radius = radius
         self.rotation = 0
-        self.rotation_speed = 0.5  # Degrees per frame
+        self.rotation_speed = 0.5  # Degrees per step
+        # Unit shape and normals are computed once; rotate() only turns them
+        self.polygon = RegularPolygon((center_x, center_y), radius, 5,
+                                      step=math.radians(self.rotation_speed))
         
-    def get_vertices(self):
-        vertices = []
-        for i in range(5):
-            angle = math.radians(self.rotation + i * 72)  # 72 degrees = 360/5
-            x = self.center_x + self.radius * math.cos(angle)
-            y = self.center_y + self.radius * math.sin(angle)
-            vertices.append((x, y))
-        return vertices
+    def get_vertices(self, alpha=1.0):
+        if alpha >= 1.0:
+            return self.polygon.vertices()
+        # alpha < 1 gives the outline part way through the last rotation step
+        rotation = self.rotation - self.rotation_speed * (1 - alpha)
+        return self.polygon.vertices_at(math.radians(rotation))
     
-    def draw(self, screen):
-        vertices = self.get_vertices()
+    def draw(self, screen, alpha=1.0):
+        if OUTLINE_CACHE:
+            # One set of outlines for every Pentagon of this size (the physics thread's views too)
+            outline = render.OutlineCache.shared((self.center_x, self.center_y), self.radius, 5, WHITE, 2,
+                                                 OUTLINE_CACHE)
+            rotation = self.rotation - self.rotation_speed * (1 - alpha)
+            return outline.draw(screen, math.radians(rotation))
+        vertices = self.get_vertices(alpha)
         pygame.draw.polygon(screen, WHITE, vertices, 2)
+        return render.outline_rects(vertices, 2)
     
     def rotate(self):
         self.rotation += self.rotation_speed
+        self.polygon.rotate()
+    
+    def snapshot(self):
+        return {"rotation": self.rotation, "polygon": self.polygon.snapshot()}
+    
+    def restore(self, state):
+        self.rotation = state["rotation"]
+        self.polygon.restore(state["polygon"])
 
 def get_line_intersection(p1, p2, p3, p4):
     """Calculate intersection point of two line segments"""
@@ -86,8 +138,9 @@ def get_line_intersection(p1, p2, p3, p4):
 
 def check_collision(snake, pentagon):
     """Check collision between snake head and pentagon walls"""
-    vertices = pentagon.get_vertices()
-    head = snake.segments[0]
+    vertices = pentagon.polygon.vertices()
+    normals = pentagon.polygon.normals()
+    head = snake.segments.head
     next_head = (head[0] + snake.velocity[0], head[1] + snake.velocity[1])
     
     for i in range(5):
@@ -96,11 +149,8 @@ def check_collision(snake, pentagon):
         
         intersection = get_line_intersection(head, next_head, v1, v2)
         if intersection:
-            # Calculate normal vector of the wall
-            wall_vector = (v2[0] - v1[0], v2[1] - v1[1])
-            wall_normal = (-wall_vector[1], wall_vector[0])
-            normal_length = math.sqrt(wall_normal[0]**2 + wall_normal[1]**2)
-            wall_normal = (wall_normal[0]/normal_length, wall_normal[1]/normal_length)
+            # Unit normal of the wall (cached by the polygon)
+            wall_normal = normals[i]
             
             # Reflect velocity vector
             dot_product = (snake.velocity[0] * wall_normal[0] + 
@@ -110,31 +160,96 @@ def check_collision(snake, pentagon):
             return True
     return False
 
-# Create game objects
-snake = Snake(WIDTH//2, HEIGHT//2)
-pentagon = Pentagon(WIDTH//2, HEIGHT//2, 200)
-
-# Game loop
-running = True
-clock = pygame.time.Clock()
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-    # Update
+def step(snake, pentagon):
+    """Advance the simulation by one fixed physics step."""
     check_collision(snake, pentagon)
-    snake.update()
+    profiler.lap("collision")
+    snake.update()  # Moves the head and the body in one push
+    profiler.lap("body")
     pentagon.rotate()
-    
-    # Draw
-    screen.fill(BLACK)
-    pentagon.draw(screen)
-    snake.draw(screen)
-    
-    # Update display
-    pygame.display.flip()
-    clock.tick(60)
+    profiler.lap("pentagon")
+
+def snapshot(snake, pentagon):
+    """The whole simulation state as plain data (see ``restore``)."""
+    return {"snake": snake.snapshot(), "pentagon": pentagon.snapshot()}
+
+def restore(state, snake, pentagon):
+    """Go back to a ``snapshot()``; the following steps replay exactly."""
+    snake.restore(state["snake"])
+    pentagon.restore(state["pentagon"])
+
+def copy_state(snake, pentagon, view):
+    """Copy what ``draw`` reads into ``view``, a (snake, pentagon) pair."""
+    view_snake, view_pentagon = view
+    view_snake.segments.copy_from(snake.segments)
+    view_pentagon.restore(pentagon.snapshot())
+    profiler.lap("copy")
+
+def draw(screen, snake, pentagon, alpha=1.0):
+    """Draw the state alpha of a step past the previous one; returns the rects drawn to."""
+    rects = pentagon.draw(screen, alpha)
+    rects += snake.draw(screen, alpha)
+    return rects
+
+def main():
+    screen = init_display()
+
+    # Create game objects
+    snake = Snake(WIDTH//2, HEIGHT//2)
+    pentagon = Pentagon(WIDTH//2, HEIGHT//2, 200)
+
+    # Game loop
+    running = True
+    timestep = FixedTimestep(PHYSICS_HZ)
+    physics = None
+    if THREADED:
+        # Physics steps on its own thread; this loop draws the newest copy
+        physics = PhysicsThread(lambda: step(snake, pentagon), PHYSICS_HZ,
+                                make=lambda: (Snake(WIDTH//2, HEIGHT//2), Pentagon(WIDTH//2, HEIGHT//2, 200)),
+                                copy=lambda view: copy_state(snake, pentagon, view),
+                                idle=lambda: profiler.lap("physics wait")).start()
+    # Frame cap; draws less while hidden, unfocused or idle, skips when behind
+    governor = FrameGovernor(RENDER_FPS, PHYSICS_HZ)
+    dirty = render.DirtyRects(BLACK, DIRTY_RECTS)
+    overlay = render.TimingOverlay(profiler)
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            overlay.handle(event)
+            governor.handle(event)
+        profiler.lap("event")
+
+        if physics is None:
+            # Update at a fixed rate, however long the last frame took
+            steps = timestep.tick()
+            for _ in range(steps):
+                step(snake, pentagon)
+            view, alpha = (snake, pentagon), timestep.alpha
+        else:
+            # Drawing can't hold the physics back here, so never skip a frame for it
+            steps = min(physics.poll(), 1)
+            view, alpha = physics.view, physics.alpha
+
+        if view is not None and governor.render(steps):
+            # Draw, interpolated between the last two physics states
+            dirty.erase(screen)
+            rects = draw(screen, *view, alpha)
+            rects += overlay.draw(screen)
+            profiler.lap("draw")
+
+            # Update display (only the changed rects in DIRTY_RECTS mode)
+            dirty.present(rects)
+            profiler.lap("flip")
+        governor.wait()
+        profiler.lap("wait")
+        profiler.frame()
+
+    if physics is not None:
+        physics.stop()
+    profiler.dump(PROFILE_OUT)
+    pygame.quit()
 
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
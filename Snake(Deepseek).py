@@ -1,15 +1,16 @@
-import pygame
 import math
 import sys
 
-# Initialize Pygame
-pygame.init()
+from snakesim.body import SnakeBody
+from snakesim.geometry import RegularPolygon
+from snakesim.governor import FrameGovernor
+from snakesim.pipeline import PhysicsThread
+from snakesim.profiler import FrameProfiler
+from snakesim.spatial import SnakeWorld
+from snakesim.timestep import FixedTimestep
 
 # Screen dimensions
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Bouncing Snake in Rotating Pentagon")
-clock = pygame.time.Clock()
 
 # Colors
 BLACK = (0, 0, 0)
@@ -21,121 +22,334 @@ GREEN = (0, 255, 0)
 CENTER = (WIDTH//2, HEIGHT//2)
 RADIUS = 250
 NUM_SIDES = 5
-ROTATION_SPEED = 0.5  # Degrees per frame
+ROTATION_SPEED = 0.5  # Degrees per step
+ROTATING_FRAME = False  # Move the snakes in the pentagon's frame, where its walls stand still
 
 # Snake properties
 SNAKE_SPEED = 3
 TAIL_LENGTH = 50
 SNAKE_SIZE = 8
+NUM_SNAKES = 1  # More than one turns on snake-vs-snake (and self) collisions
+
+# Timing
+PHYSICS_HZ = 60   # Physics steps per second (speeds are per step)
+RENDER_FPS = 144  # Frame cap for drawing, 0 for uncapped
+DIRTY_RECTS = False  # Redraw/present only the changed areas instead of the full frame
+OUTLINE_CACHE = 0  # Pre-rendered anti-aliased pentagon outlines per 72 degrees to blit from, 0 to draw it
+THREADED = False  # Step the physics on its own thread, drawing copies of its state on this one
+PROFILE = False   # Time each phase of the loop (F3 overlay), written to PROFILE_OUT on exit
+PROFILE_OUT = "profile.json"
+
+# Per-phase timings (does nothing unless PROFILE is on)
+profiler = FrameProfiler(enabled=PROFILE)
+
+# pygame is only imported (and initialized) by init_display, so the physics
+# can be imported and run without opening a window
+pygame = None
+render = None
+
+def init_display(surface=None):
+    """Import pygame and open the window, unless given a surface to draw into; returns it."""
+    global pygame, render
+    import pygame
+    from snakesim import render
+    pygame.init()
+    if surface is None:
+        surface = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Bouncing Snake in Rotating Pentagon")
+    return surface
 
 class Pentagon:
     def __init__(self):
         self.angle = 0
-        self.vertices = []
-        self.edges = []
-        self.update_vertices()
-        
-    def update_vertices(self):
-        self.vertices = []
-        angle_step = 360 / NUM_SIDES
-        current_angle = self.angle
-        for _ in range(NUM_SIDES):
-            x = CENTER[0] + RADIUS * math.cos(math.radians(current_angle))
-            y = CENTER[1] + RADIUS * math.sin(math.radians(current_angle))
-            self.vertices.append((x, y))
-            current_angle += angle_step
-        
-        # Create edges as (start, end, normal)
-        self.edges = []
-        for i in range(NUM_SIDES):
-            start = self.vertices[i]
-            end = self.vertices[(i+1)%NUM_SIDES]
-            # Calculate edge normal (pointing inward)
-            edge = (end[0] - start[0], end[1] - start[1])
-            normal = (-edge[1], edge[0])
-            length = math.hypot(normal[0], normal[1])
-            if length == 0:
-                length = 1
-            normal = (normal[0]/length, normal[1]/length)
-            self.edges.append((start, end, normal))
+        # Unit vertices and edge normals are computed once; each rotation
+        # just turns them by a cached ROTATION_SPEED step
+        self.polygon = RegularPolygon(CENTER, RADIUS, NUM_SIDES,
+                                      step=math.radians(ROTATION_SPEED))
+        
+    @property
+    def vertices(self):
+        return self.polygon.vertices()
+    
+    @property
+    def edges(self):
+        # Edges as (start, end, normal), normal pointing inward
+        return self.polygon.edges()
+        
+    @property
+    def local_edges(self):
+        # The edges in the pentagon's own frame, which never change
+        return self.polygon.local_edges()
+        
+    def to_local(self, point):
+        return self.polygon.to_local(point[0], point[1])
+        
+    def to_world(self, point):
+        return self.polygon.to_world(point[0], point[1])
+        
+    def vertices_at(self, angle):
+        return self.polygon.vertices_at(math.radians(angle))
         
     def rotate(self):
         self.angle = (self.angle + ROTATION_SPEED) % 360
-        self.update_vertices()
+        self.polygon.rotate()
+        
+    def snapshot(self):
+        return {"angle": self.angle, "polygon": self.polygon.snapshot()}
+        
+    def restore(self, state):
+        self.angle = state["angle"]
+        self.polygon.restore(state["polygon"])
         
-    def draw(self, surface):
-        pygame.draw.polygon(surface, WHITE, self.vertices, 2)
+    def draw(self, surface, alpha=1.0):
+        if OUTLINE_CACHE:
+            # One set of outlines for every Pentagon (the physics thread's views too)
+            outline = render.OutlineCache.shared(CENTER, RADIUS, NUM_SIDES, WHITE, 2, OUTLINE_CACHE)
+            return outline.draw(surface, math.radians(self.angle - ROTATION_SPEED * (1 - alpha)))
+        vertices = self.vertices
+        if alpha < 1.0:
+            # Outline part way through the last rotation step
+            vertices = self.vertices_at(self.angle - ROTATION_SPEED * (1 - alpha))
+        pygame.draw.polygon(surface, WHITE, vertices, 2)
+        return render.outline_rects(vertices, 2)
 
 class Snake:
-    def __init__(self):
-        self.position = list(CENTER)
-        self.direction = [1, 0]  # Initial direction
-        self.tail = [tuple(self.position)] * TAIL_LENGTH
+    def __init__(self, position=None, direction=None):
         self.speed = SNAKE_SPEED
+        if position is None:
+            self.position = list(CENTER)
+            self.direction = [1, 0]  # Initial direction
+            self.tail = SnakeBody.filled(TAIL_LENGTH, *self.position)
+        else:
+            self.position = list(position)
+            self.direction = list(direction)
+            # Lay the tail out behind the head, one step apart
+            step_x = self.direction[0] * self.speed
+            step_y = self.direction[1] * self.speed
+            self.tail = SnakeBody(TAIL_LENGTH, [(position[0] - i * step_x, position[1] - i * step_y)
+                                                for i in range(TAIL_LENGTH)])
+        self.sprites = None  # Pre-rendered segment circles, built on first draw
+        # Lower bounds on how far the body and the head are from touching a
+        # wall; below 0, keep_inside checks the whole body again
+        self.slack = -1.0
+        self.head_slack = 0.0
         
     def update(self, pentagon):
         # Update position
         self.position[0] += self.direction[0] * self.speed
         self.position[1] += self.direction[1] * self.speed
+        profiler.lap("head")
+        
+        if ROTATING_FRAME:
+            # Position and direction are kept in the pentagon's frame: rather
+            # than the walls turning, the snake turns back by one step
+            self.position = list(pentagon.polygon.step_back(*self.position))
+            self.direction = list(pentagon.polygon.step_back(*self.direction, vector=True))
+            edges = pentagon.local_edges
+        else:
+            edges = pentagon.edges
         
         # Check collisions with pentagon edges
-        for edge in pentagon.edges:
+        for edge in edges:
             start, end, normal = edge
             # Vector from edge start to snake position
             rel_pos = (self.position[0] - start[0], self.position[1] - start[1])
             # Dot product with normal
             dot = rel_pos[0] * normal[0] + rel_pos[1] * normal[1]
             
-            if dot < 0:  # Outside the edge
-                # Reflect direction
-                reflect = [self.direction[0], self.direction[1]]
-                dn = 2 * (reflect[0] * normal[0] + reflect[1] * normal[1])
-                reflect[0] -= dn * normal[0]
-                reflect[1] -= dn * normal[1]
-                # Normalize direction
-                length = math.hypot(reflect[0], reflect[1])
-                if length > 0:
-                    self.direction = [reflect[0]/length, reflect[1]/length]
-                # Move back inside
-                self.position[0] += normal[0] * (-dot + 1)
-                self.position[1] += normal[1] * (-dot + 1)
-                break
-        
-        # Update tail
-        self.tail.pop()
-        self.tail.insert(0, tuple(self.position))
-        
-    def draw(self, surface):
-        # Draw tail
-        for i, pos in enumerate(self.tail):
-            alpha = 255 * (1 - i/TAIL_LENGTH)
-            color = (0, 255, 0, alpha)
-            radius = SNAKE_SIZE * (1 - i/(TAIL_LENGTH*2))
-            pygame.draw.circle(surface, GREEN, (int(pos[0]), int(pos[1])), int(radius))
+            if dot < SNAKE_SIZE:  # Head circle crosses the edge
+                dn = self.direction[0] * normal[0] + self.direction[1] * normal[1]
+                if dn < 0:  # Only when heading into the edge
+                    # Reflect direction
+                    reflect = [self.direction[0] - 2 * dn * normal[0],
+                               self.direction[1] - 2 * dn * normal[1]]
+                    # Normalize direction
+                    length = math.hypot(reflect[0], reflect[1])
+                    if length > 0:
+                        self.direction = [reflect[0]/length, reflect[1]/length]
+                # Move back inside, the head's radius from the edge (no
+                # break: in a corner the next edge may need it too)
+                self.position[0] += normal[0] * (SNAKE_SIZE - dot)
+                self.position[1] += normal[1] * (SNAKE_SIZE - dot)
+        # How far the head circle now is from every edge
+        self.head_slack = min((self.position[0] - start[0]) * normal[0] + (self.position[1] - start[1]) * normal[1]
+                              for start, end, normal in edges) - SNAKE_SIZE
+        profiler.lap("collision")
+        
+        # Update tail (always in screen space, for drawing)
+        head = pentagon.to_world(self.position) if ROTATING_FRAME else self.position
+        self.tail.push(head[0], head[1])
+        profiler.lap("body")
+        
+    def keep_inside(self, pentagon):
+        # The walls turn under the body too: push every segment behind the
+        # head (which bounces on its own) back inside, all in one go. A
+        # step's turn moves the walls at most RADIUS * step towards any
+        # segment, so while the body is further than that from them, and
+        # the new head came in clear of them, there is nothing to check
+        polygon = pentagon.polygon
+        self.slack = min(self.slack - polygon.radius * abs(polygon.step), self.head_slack)
+        if self.slack >= 0:
+            return []
+        tail = self.tail.view()
+        self.slack = min(polygon.clearance(tail[1:], SNAKE_SIZE), self.head_slack)
+        if self.slack >= 0:
+            return []
+        moved = polygon.push_inside(tail[1:], SNAKE_SIZE) + 1
+        if len(moved):
+            self.tail.sync_view()
+        # Moved segments now touch their wall; the rest were already clear
+        self.slack = min(0.0, self.head_slack)
+        return moved
+        
+    def snapshot(self):
+        return {"position": list(self.position), "direction": list(self.direction),
+                "tail": self.tail.snapshot()}
+        
+    def restore(self, state):
+        self.position = list(state["position"])
+        self.direction = list(state["direction"])
+        self.tail.restore(state["tail"])
+        self.slack = -1.0
+        
+    def bounce_off(self, point):
+        # Reflect direction away from a body segment the head ran into
+        normal = (self.position[0] - point[0], self.position[1] - point[1])
+        length = math.hypot(normal[0], normal[1])
+        if length == 0:
+            return
+        normal = (normal[0]/length, normal[1]/length)
+        dn = self.direction[0] * normal[0] + self.direction[1] * normal[1]
+        if dn < 0:  # Only when heading into the segment
+            self.direction = [self.direction[0] - 2 * dn * normal[0],
+                              self.direction[1] - 2 * dn * normal[1]]
+        
+    def draw(self, surface, alpha=1.0):
+        # Blend towards the current state by alpha of a physics step
+        tail = self.tail.interpolated(alpha)
+        # Draw tail: one cached sprite per radius, all segments in one blits call
+        if self.sprites is None:
+            radii = [int(SNAKE_SIZE * (1 - i/(TAIL_LENGTH*2))) for i in range(TAIL_LENGTH)]
+            self.sprites = render.SnakeSprites(radii, GREEN)
+        self.sprites.draw(surface, tail)
         # Draw head
-        pygame.draw.circle(surface, RED, (int(self.position[0]), int(self.position[1])), SNAKE_SIZE)
+        pygame.draw.circle(surface, RED, (int(tail[0][0]), int(tail[0][1])), SNAKE_SIZE)
+        return [render.points_rect(tail, SNAKE_SIZE)]
+
+def create_snakes(count):
+    if count == 1:
+        return [Snake()]
+    # Spread the snakes round a circle, each heading along it
+    snakes = []
+    for i in range(count):
+        angle = 2 * math.pi * i / count
+        position = (CENTER[0] + RADIUS * 0.5 * math.cos(angle), CENTER[1] + RADIUS * 0.5 * math.sin(angle))
+        snakes.append(Snake(position, (-math.sin(angle), math.cos(angle))))
+    return snakes
+
+def step(pentagon, snakes, world=None):
+    """Advance the simulation by one fixed physics step."""
+    pentagon.rotate()
+    profiler.lap("pentagon")
+    for snake in snakes:
+        snake.update(pentagon)
+    if world is not None:
+        for i, other, segment in world.track():
+            point = snakes[other].tail[segment]
+            if ROTATING_FRAME:
+                point = pentagon.to_local(point)
+            snakes[i].bounce_off(point)
+        profiler.lap("collision")
+    for i, snake in enumerate(snakes):
+        moved = snake.keep_inside(pentagon)
+        if world is not None and len(moved):
+            world.moved(i, moved)
+    profiler.lap("body")
+
+def snapshot(pentagon, snakes):
+    """The whole simulation state as plain data (see ``restore``)."""
+    return {"pentagon": pentagon.snapshot(), "snakes": [snake.snapshot() for snake in snakes]}
+
+def restore(state, pentagon, snakes, world=None):
+    """Go back to a ``snapshot()``; the following steps replay exactly."""
+    pentagon.restore(state["pentagon"])
+    for snake, snake_state in zip(snakes, state["snakes"]):
+        snake.restore(snake_state)
+    if world is not None:
+        world.rebuild()
+
+def copy_state(pentagon, snakes, view):
+    """Copy what ``draw`` reads into ``view``, a (pentagon, snakes) pair of the same size."""
+    view_pentagon, view_snakes = view
+    view_pentagon.restore(pentagon.snapshot())
+    for snake, copy in zip(snakes, view_snakes):
+        copy.tail.copy_from(snake.tail)
+    profiler.lap("copy")
+
+def draw(surface, pentagon, snakes, alpha=1.0):
+    """Draw the state alpha of a step past the previous one; returns the rects drawn to."""
+    rects = pentagon.draw(surface, alpha)
+    for snake in snakes:
+        rects += snake.draw(surface, alpha)
+    return rects
 
 def main():
+    screen = init_display()
     pentagon = Pentagon()
-    snake = Snake()
+    snakes = create_snakes(NUM_SNAKES)
+    # Spatial hash of every body segment, updated incrementally each step
+    world = SnakeWorld(snakes, SNAKE_SIZE) if len(snakes) > 1 else None
+    
+    timestep = FixedTimestep(PHYSICS_HZ)
+    physics = None
+    if THREADED:
+        # Physics steps on its own thread; this loop draws the newest copy
+        physics = PhysicsThread(lambda: step(pentagon, snakes, world), PHYSICS_HZ,
+                                make=lambda: (Pentagon(), create_snakes(NUM_SNAKES)),
+                                copy=lambda view: copy_state(pentagon, snakes, view),
+                                idle=lambda: profiler.lap("physics wait")).start()
+    # Frame cap; draws less while hidden, unfocused or idle, skips when behind
+    governor = FrameGovernor(RENDER_FPS, PHYSICS_HZ)
+    dirty = render.DirtyRects(BLACK, DIRTY_RECTS)
+    overlay = render.TimingOverlay(profiler)
     
     running = True
     while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            overlay.handle(event)
+            governor.handle(event)
+        profiler.lap("event")
                 
-        screen.fill(BLACK)
+        if physics is None:
+            # Update at a fixed rate, however long the last frame took
+            steps = timestep.tick()
+            for _ in range(steps):
+                step(pentagon, snakes, world)
+            view, alpha = (pentagon, snakes), timestep.alpha
+        else:
+            # Drawing can't hold the physics back here, so never skip a frame for it
+            steps = min(physics.poll(), 1)
+            view, alpha = physics.view, physics.alpha
         
-        # Update and draw objects
-        pentagon.rotate()
-        pentagon.draw(screen)
-        snake.update(pentagon)
-        snake.draw(screen)
-        
-        pygame.display.flip()
-        clock.tick(60)
+        if view is not None and governor.render(steps):
+            # Draw, interpolated between the last two physics states
+            dirty.erase(screen)
+            rects = draw(screen, *view, alpha)
+            rects += overlay.draw(screen)
+            profiler.lap("draw")
+            
+            # Only the changed rects are presented in DIRTY_RECTS mode
+            dirty.present(rects)
+            profiler.lap("flip")
+        governor.wait()
+        profiler.lap("wait")
+        profiler.frame()
         
+    if physics is not None:
+        physics.stop()
+    profiler.dump(PROFILE_OUT)
     pygame.quit()
     sys.exit()
 
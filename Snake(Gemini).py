@@ -1,14 +1,14 @@
-import pygame
-import math
+import numpy as np
 
-# Initialize Pygame
-pygame.init()
+from snakesim.chain import follow_chain, resample_path
+from snakesim.geometry import RegularPolygon
+from snakesim.governor import FrameGovernor
+from snakesim.profiler import FrameProfiler
+from snakesim.timestep import FixedTimestep
 
 # Screen dimensions
 screen_width = 800
 screen_height = 600
-screen = pygame.display.set_mode((screen_width, screen_height))
-pygame.display.set_caption("Bouncing Snake Pentagon")
 
 # Colors
 white = (255, 255, 255)
@@ -16,48 +16,53 @@ black = (0, 0, 0)
 green = (0, 255, 0)
 red = (255, 0, 0)
 
+# Timing
+physics_hz = 60   # Physics steps per second (speeds are per step)
+render_fps = 144  # Frame cap for drawing, 0 for uncapped
+dirty_rects = False  # Redraw/present only the changed areas instead of the full frame
+outline_cache = 0  # Pre-rendered anti-aliased pentagon outlines per 72 degrees to blit from, 0 to draw it
+profile = False   # Time each phase of the loop (F3 overlay), written to profile_out on exit
+profile_out = "profile.json"
+
 # Pentagon parameters
 pentagon_center = [screen_width // 2, screen_height // 2]
 pentagon_radius = 200
-pentagon_rotation_speed = 0.01  # Radians per frame
-pentagon_rotation_angle = 0
-
-def get_pentagon_vertices(center, radius, angle):
-    vertices = []
-    for i in range(5):
-        angle_radians = math.radians(72 * i) + angle
-        x = center[0] + radius * math.cos(angle_radians)
-        y = center[1] + radius * math.sin(angle_radians)
-        vertices.append([x, y])
-    return vertices
-
-def draw_pentagon(vertices):
+pentagon_rotation_speed = 0.01  # Radians per step
+# Unit vertices, edge directions and normals are computed once here
+pentagon = RegularPolygon(pentagon_center, pentagon_radius, 5, step=pentagon_rotation_speed)
+
+def draw_pentagon(angle):
+    if outline is not None:
+        return outline.draw(screen, angle)
+    vertices = pentagon.vertices_at(angle)
     pygame.draw.polygon(screen, white, vertices, 2)
+    return render.outline_rects(vertices, 2)
 
 # Snake parameters
 snake_length = 20
 snake_segment_radius = 8
-snake_segments = []
+snake_follow = 0.3  # How far each segment moves towards the one in front, per step
+snake_spacing = None  # Set (px) to keep the segments this far apart along the head's path instead
 snake_head_pos = [screen_width // 2 - 100, screen_height // 2 - 100]  # Initial position
-snake_segments.append(list(snake_head_pos)) # Add head
-for _ in range(snake_length - 1): # Add body segments
-    snake_segments.append(list(snake_head_pos))  # Initialize body at same pos for now
+# Head first, one (x, y) row per segment; the body starts on the head
+snake_segments = np.tile(np.array(snake_head_pos, dtype=float), (snake_length, 1))
 snake_speed = 3
 snake_direction = [1, 1] # Initial direction (x, y)
+previous_segments = snake_segments.copy() # State before the last step
 
 
-def draw_snake(segments):
-    for i in range(len(segments)):
-        pygame.draw.circle(screen, green, (int(segments[i][0]), int(segments[i][1])), snake_segment_radius)
-        if i > 0: # Draw connecting lines between segments
-            pygame.draw.line(screen, green, (int(segments[i-1][0]), int(segments[i-1][1])), (int(segments[i][0]), int(segments[i][1])), snake_segment_radius * 2 // 3)
+snake_sprites = None # Pre-rendered segment circle, built on first draw
 
+def draw_snake(segments):
+    global snake_sprites
+    if snake_sprites is None:
+        snake_sprites = render.SnakeSprites(snake_segment_radius, green)
+    # Connecting lines between segments in one call, then every circle in one blits call
+    if len(segments) > 1:
+        pygame.draw.lines(screen, green, False, segments, snake_segment_radius * 2 // 3)
+    snake_sprites.draw(screen, segments)
+    return [render.points_rect(segments, snake_segment_radius)]
 
-def normalize_vector(vec):
-    magnitude = math.sqrt(vec[0]**2 + vec[1]**2)
-    if magnitude == 0:
-        return [0, 0]
-    return [vec[0] / magnitude, vec[1] / magnitude]
 
 def reflect_vector(velocity, edge_normal):
     # Reflect velocity vector across the edge normal
@@ -67,14 +72,17 @@ def reflect_vector(velocity, edge_normal):
     return [reflected_x, reflected_y]
 
 
-def check_collision_pentagon(snake_head, pentagon_vertices):
+def check_collision_pentagon(snake_head, pentagon):
+    # Rotated vertices, unit normals and unit edge directions come from the
+    # polygon's per-rotation cache, so nothing is normalized here
+    pentagon_vertices = pentagon.vertices()
+    edge_normals = pentagon.normals()
+    edge_directions = pentagon.directions()
+    edge_length = pentagon.edge_length
     for i in range(5):
         p1 = pentagon_vertices[i]
-        p2 = pentagon_vertices[(i + 1) % 5] # Next vertex, wrap around
-
-        edge_vector = [p2[0] - p1[0], p2[1] - p1[1]]
-        edge_normal = [-edge_vector[1], edge_vector[0]] # 90 degree rotation for normal
-        edge_normal = normalize_vector(edge_normal)
+        edge_normal = edge_normals[i]
+        edge_direction = edge_directions[i]
 
         segment_vector = [snake_head[0] - p1[0], snake_head[1] - p1[1]]
 
@@ -82,55 +90,53 @@ def check_collision_pentagon(snake_head, pentagon_vertices):
         projection = segment_vector[0] * edge_normal[0] + segment_vector[1] * edge_normal[1]
 
         # Project snake_head onto the edge vector
-        edge_projection = segment_vector[0] * normalize_vector(edge_vector)[0] + segment_vector[1] * normalize_vector(edge_vector)[1]
+        edge_projection = segment_vector[0] * edge_direction[0] + segment_vector[1] * edge_direction[1]
 
 
         # Check if the projection is "inside" the edge bounds (not past endpoints)
-        edge_length_sq = (p2[0] - p1[0])**2 + (p2[1] - p1[1])**2
-        edge_proj_ratio = edge_projection / math.sqrt(edge_length_sq)
+        edge_proj_ratio = edge_projection / edge_length
 
 
         if 0 <= edge_proj_ratio <= 1 and projection < snake_segment_radius:  # Collision detected! projection < radius
             return edge_normal
     return None # No collision
 
-# Game loop
-running = True
-clock = pygame.time.Clock()
+def step():
+    """Advance the simulation by one fixed physics step."""
+    global snake_direction, previous_segments
 
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # Clear screen
-    screen.fill(black)
+    previous_segments = snake_segments.copy()
 
     # Rotate pentagon
-    pentagon_rotation_angle += pentagon_rotation_speed
-    pentagon_vertices = get_pentagon_vertices(pentagon_center, pentagon_radius, pentagon_rotation_angle)
-    draw_pentagon(pentagon_vertices)
+    pentagon.rotate()
+    profiler.lap("pentagon")
 
     # Move snake head
     snake_head_pos[0] += snake_direction[0] * snake_speed
     snake_head_pos[1] += snake_direction[1] * snake_speed
-    snake_segments[0] = list(snake_head_pos) # Update head segment position
+    snake_segments[0] = snake_head_pos # Update head segment position
+    profiler.lap("head")
 
     # Collision detection with pentagon for snake head
-    collision_normal = check_collision_pentagon(snake_head_pos, pentagon_vertices)
+    collision_normal = check_collision_pentagon(snake_head_pos, pentagon)
     if collision_normal:
         snake_direction = reflect_vector(snake_direction, collision_normal)
         # Adjust snake position slightly to avoid sticking inside after reflection (optional)
         snake_head_pos[0] += collision_normal[0] * 1.1 * snake_segment_radius # push a bit along normal
         snake_head_pos[1] += collision_normal[1] * 1.1 * snake_segment_radius
+    profiler.lap("collision")
 
 
-    # Snake body follows head (simple follow mechanism)
-    for i in range(1, snake_length):
-        segment_diff_x = snake_segments[i-1][0] - snake_segments[i][0]
-        segment_diff_y = snake_segments[i-1][1] - snake_segments[i][1]
-        snake_segments[i][0] += segment_diff_x * 0.3  # Adjust 0.3 for follow speed
-        snake_segments[i][1] += segment_diff_y * 0.3
+    # Snake body follows head, the whole chain in a few array passes
+    if snake_spacing:
+        # Evenly spaced along the path: the new head, then the old body
+        path = np.concatenate([snake_segments[:1], previous_segments])
+        resample_path(path, len(snake_segments), snake_spacing, out=snake_segments)
+    else:
+        follow_chain(snake_segments, snake_follow)
+    # The whole body stays inside the turning walls, not just the head
+    pentagon.push_inside(snake_segments[1:], snake_segment_radius)
+    profiler.lap("body")
 
 
     # Keep snake within screen bounds (optional, pentagon should contain it in this setup)
@@ -139,14 +145,110 @@ while running:
     #                                                     1 if snake_head_pos[1] < 0 or snake_head_pos[1] > screen_height else 0])
 
 
+def snapshot():
+    """The whole simulation state as plain data (see ``restore``)."""
+    return {
+        "head": list(snake_head_pos),
+        "direction": list(snake_direction),
+        "segments": snake_segments.copy(),
+        "previous": previous_segments.copy(),
+        "pentagon": pentagon.snapshot(),
+    }
+
+
+def restore(state):
+    """Go back to a ``snapshot()``; the following steps replay exactly."""
+    global snake_direction, snake_segments, previous_segments
+    snake_head_pos[:] = state["head"]
+    snake_direction = list(state["direction"])
+    snake_segments = np.array(state["segments"], dtype=float)
+    previous_segments = np.array(state["previous"], dtype=float)
+    pentagon.restore(state["pentagon"])
+
+
+# Per-phase timings (does nothing unless profile is on)
+profiler = FrameProfiler(enabled=profile)
+
+
+# Display: pygame is only imported and initialized by init_display(), so
+# importing this file for its physics opens no window
+pygame = None
+render = None
+screen = None
+dirty = None
+overlay = None
+outline = None
+
+def init_display(surface=None):
+    """Import pygame and open the window (or draw into surface); returns the screen."""
+    global pygame, render, screen, dirty, overlay, outline
+    import pygame
+    from snakesim import render
+    pygame.init()
+    if surface is None:
+        surface = pygame.display.set_mode((screen_width, screen_height))
+        pygame.display.set_caption("Bouncing Snake Pentagon")
+    screen = surface
+    # Clears and presents the whole frame, or only what changed when dirty_rects is on
+    dirty = render.DirtyRects(black, dirty_rects)
+    overlay = render.TimingOverlay(profiler)
+    if outline_cache:
+        outline = render.OutlineCache(pentagon_center, pentagon_radius, 5, white, 2, outline_cache)
+    return screen
+
+
+def draw(alpha):
+    """Draw the state alpha of a step past the previous one; returns the rects drawn to."""
+    # Clear screen
+    dirty.erase(screen)
+
+    angle = pentagon.angle - pentagon_rotation_speed * (1 - alpha)
+    rects = draw_pentagon(angle)
+
     # Draw snake
-    draw_snake(snake_segments)
+    rects += draw_snake(previous_segments + (snake_segments - previous_segments) * alpha)
+    return rects
+
+
+def main():
+    init_display()
+
+    # Game loop
+    running = True
+    timestep = FixedTimestep(physics_hz)
+    # Frame cap; draws less while hidden, unfocused or idle, skips when behind
+    governor = FrameGovernor(render_fps, physics_hz)
+
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            overlay.handle(event)
+            governor.handle(event)
+        profiler.lap("event")
+
+        # Physics runs at physics_hz whatever the frame rate is
+        steps = timestep.tick()
+        for _ in range(steps):
+            step()
+
+        if governor.render(steps):
+            rects = draw(timestep.alpha)
+            rects += overlay.draw(screen)
+            profiler.lap("draw")
+
+            # Update display
+            dirty.present(rects)
+            profiler.lap("flip")
 
+        # Control frame rate
+        governor.wait()
+        profiler.lap("wait")
+        profiler.frame()
 
-    # Update display
-    pygame.display.flip()
+    profiler.dump(profile_out)
+    pygame.quit()
 
-    # Control frame rate
-    clock.tick(60) # 60 FPS
 
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Shared simulation helpers for the bouncing snake scripts.
+
+Nothing in this package imports pygame at import time, so it can be used
+for headless batch work.
+"""
+from .body import SnakeBody
+from .engine import BatchEngine
+from .geometry import RegularPolygon
+from .profiler import FrameProfiler
+from .recording import Player, Recording, RecordingWriter, record_engine
+from .timestep import FixedTimestep
+
+__all__ = [
+    "BatchEngine", "FixedTimestep", "FrameProfiler", "Player", "Recording", "RecordingWriter",
+    "RegularPolygon", "SnakeBody", "record_engine",
+]
@@ -0,0 +1,211 @@
+"""
+Headless benchmark of the physics step of each script.
+
+    python -m snakesim.bench --lengths 30,1000,10000 --sides 5,64 --steps 2000
+    python -m snakesim.bench --compare old_bench.json
+
+Each script is imported under SDL's dummy video driver (see ``scripts.py``)
+and only its physics step is timed, for every snake length / side count
+combination. Per configuration the harness reports steps per second, p50
+and p99 step latency, and memory churn per step (peak bytes allocated
+inside a step, from ``tracemalloc``, and net allocated blocks). Results go
+to a JSON file tagged with the git commit, so runs can be compared across
+commits with ``--compare``.
+
+Scripts that hard-code the pentagon (Claude and Gemini loop over
+``range(5)``) are only benchmarked with 5 sides; other side counts are
+reported as unsupported.
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .body import SnakeBody
+from .geometry import RegularPolygon
+from .scripts import ROOT, SCRIPTS, load_script
+
+
+def _chatgpt(m, length, sides):
+    m.SNAKE_LENGTH = length
+    m.PENTAGON_SIDES = sides
+    m.pentagon = RegularPolygon((m.center_x, m.center_y), m.PENTAGON_RADIUS,
+                                sides=sides, step=m.ROTATION_SPEED)
+    m.snake_positions = SnakeBody(length, [(m.center_x - i * m.SNAKE_SEGMENT_SPACING, m.center_y)
+                                           for i in range(length)])
+    return m.step
+
+
+def _claude(m, length, sides):
+    if sides != 5:
+        return None
+    x, y = m.WIDTH // 2, m.HEIGHT // 2
+    snake = m.Snake(x, y)
+    snake.length = length
+    snake.segments = SnakeBody(length, [(x - i * snake.spacing, y) for i in range(length)])
+    pentagon = m.Pentagon(x, y, 200)
+    return lambda: m.step(snake, pentagon)
+
+
+def _deepseek(m, length, sides):
+    m.NUM_SIDES = sides
+    m.TAIL_LENGTH = length
+    pentagon = m.Pentagon()
+    snakes = [m.Snake()]
+    return lambda: m.step(pentagon, snakes)
+
+
+def _gemini(m, length, sides):
+    if sides != 5:
+        return None
+    m.snake_length = length
+    m.snake_segments = np.tile(np.array(m.snake_head_pos, dtype=float), (length, 1))
+    m.previous_segments = m.snake_segments.copy()
+    return m.step
+
+
+def _julius(m, length, sides):
+    m.num_sides = sides
+    m.pentagon = RegularPolygon(m.pentagon_center, m.pentagon_radius, sides, step=m.rotation_speed)
+    m.max_points = length
+    m.snake_points = SnakeBody(length)
+    m.snake_points.push(*m.head)
+    return m.step
+
+
+# Script name -> function(module, length, sides) returning a step callable
+ADAPTERS = {
+    "ChatGPT": _chatgpt,
+    "Claude": _claude,
+    "Deepseek": _deepseek,
+    "Gemini": _gemini,
+    "Julius": _julius,
+}
+
+
+def measure(step, steps, warmup=100):
+    """Time ``step`` and return the metrics dict for one configuration."""
+    for _ in range(warmup):
+        step()
+
+    clock = time.perf_counter_ns
+    latencies = np.empty(steps, dtype=np.int64)
+    start = clock()
+    for i in range(steps):
+        t0 = clock()
+        step()
+        latencies[i] = clock() - t0
+    total = clock() - start
+
+    # Memory churn is measured in a separate pass: tracing slows steps down
+    alloc_steps = min(steps, 200)
+    peaks = np.empty(alloc_steps, dtype=np.int64)
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for i in range(alloc_steps):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        step()
+        peaks[i] = tracemalloc.get_traced_memory()[1] - current
+    blocks_after = sys.getallocatedblocks()
+    tracemalloc.stop()
+
+    return {
+        "steps": steps,
+        "steps_per_second": steps / (total / 1e9),
+        "p50_us": float(np.percentile(latencies, 50)) / 1e3,
+        "p99_us": float(np.percentile(latencies, 99)) / 1e3,
+        "peak_alloc_bytes_per_step": float(peaks.mean()),
+        "net_blocks_per_step": (blocks_after - blocks_before) / alloc_steps,
+    }
+
+
+def run_benchmarks(scripts, lengths, sides_list, steps, log=print):
+    results = []
+    for name in scripts:
+        for sides in sides_list:
+            for length in lengths:
+                # Fresh module per configuration so no state leaks between runs
+                module = load_script(name)
+                step = ADAPTERS[name](module, length, sides)
+                row = {"script": name, "length": length, "sides": sides}
+                if step is None:
+                    row["unsupported"] = True
+                    log("%-8s length=%-6d sides=%-4d unsupported" % (name, length, sides))
+                else:
+                    row.update(measure(step, steps))
+                    log("%-8s length=%-6d sides=%-4d %10.0f steps/s  p50 %7.1fus  p99 %7.1fus"
+                        % (name, length, sides, row["steps_per_second"], row["p50_us"], row["p99_us"]))
+                results.append(row)
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import pygame
+    return {
+        "commit": _git_commit(),
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+    }
+
+
+def compare(old, new, log=print):
+    """Print the steps/second ratio of ``new`` over ``old`` per configuration."""
+    key = lambda row: (row["script"], row["length"], row["sides"])
+    before = {key(row): row for row in old["results"] if "steps_per_second" in row}
+    log("comparing %s -> %s" % (old["environment"].get("commit"), new["environment"].get("commit")))
+    for row in new["results"]:
+        prev = before.get(key(row))
+        if prev is None or "steps_per_second" not in row:
+            continue
+        ratio = row["steps_per_second"] / prev["steps_per_second"]
+        log("%-8s length=%-6d sides=%-4d x%.2f" % (row["script"], row["length"], row["sides"], ratio))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the physics step of each script.")
+    parser.add_argument("--scripts", default=",".join(SCRIPTS), help="comma list of script names")
+    parser.add_argument("--lengths", default="30,1000,10000", help="comma list of snake lengths")
+    parser.add_argument("--sides", default="5,64", help="comma list of polygon side counts")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--out", default="bench_output.json")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="compare against an earlier result file")
+    args = parser.parse_args(argv)
+
+    scripts = [s.strip() for s in args.scripts.split(",") if s.strip()]
+    lengths = [int(v) for v in args.lengths.split(",")]
+    sides_list = [int(v) for v in args.sides.split(",")]
+
+    report = {
+        "environment": environment(),
+        "results": run_benchmarks(scripts, lengths, sides_list, args.steps),
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print("wrote %s" % args.out)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Ring-buffer snake body.
+
+The body of every script is the history of head positions: each step a new
+head goes in at the front and the last segment falls off the back. Doing
+that with ``list.insert(0, ...)`` / ``list.pop(0)`` moves the whole body on
+every step. ``SnakeBody`` keeps the points in a preallocated circular array
+instead, so a step is O(1) whatever the length.
+
+Every point is written twice, at ``i`` and ``i + size``. That keeps the
+live window contiguous in memory no matter where it starts, so ``view()``
+is always a plain NumPy slice (no copy, no wrap-around handling) that can
+go straight to drawing or collision code.
+"""
+import numpy as np
+
+
+class SnakeBody:
+    """
+    Fixed-capacity body of (x, y) points, head first.
+
+    ``push`` adds a new head and, once the body is full, drops the tail in
+    the same O(1) operation. One spare slot keeps the point dropped by the
+    last push, so the previous state can be read back for interpolation.
+    """
+
+    def __init__(self, capacity, points=None, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._size = capacity + 1
+        self._buf = np.zeros((2 * self._size, 2), dtype=dtype)
+        self._start = 0
+        self._length = 0
+        self._pushed = False
+        if points is not None:
+            self.extend_tail(points)
+
+    @classmethod
+    def filled(cls, capacity, x, y, dtype=np.float64):
+        """A full body with every segment at (x, y)."""
+        body = cls(capacity, dtype=dtype)
+        body._buf[:] = (x, y)
+        body._length = capacity
+        return body
+
+    def extend_tail(self, points):
+        """Append points behind the current tail (head-first order)."""
+        points = np.asarray(points, dtype=self._buf.dtype).reshape(-1, 2)
+        if self._length + len(points) > self.capacity:
+            raise ValueError("body capacity exceeded")
+        for x, y in points:
+            i = (self._start + self._length) % self._size
+            self._buf[i] = self._buf[i + self._size] = (x, y)
+            self._length += 1
+
+    def push(self, x, y):
+        """Add a new head; drops the tail when the body is already full."""
+        size = self._size
+        start = self._start - 1
+        if start < 0:
+            start += size
+        buf = self._buf
+        buf[start] = buf[start + size] = (x, y)
+        self._start = start
+        if self._length < self.capacity:
+            self._length += 1
+            # Nothing was dropped: the old tail is its own previous position
+            spare = (start + self._length) % size
+            buf[spare] = buf[spare + size] = buf[start + self._length - 1]
+        self._pushed = True
+
+    def drop_tail(self):
+        """Remove and return the tail point."""
+        if self._length == 0:
+            raise IndexError("drop_tail from empty body")
+        self._length -= 1
+        i = self._start + self._length
+        return (float(self._buf[i, 0]), float(self._buf[i, 1]))
+
+    def snapshot(self):
+        """The body as plain lists; ``restore`` rebuilds it exactly."""
+        spare = None
+        if self._pushed:
+            spare = self._buf[self._start + self._length].tolist()
+        return {"capacity": self.capacity, "points": self.view().tolist(), "spare": spare}
+
+    def restore(self, state):
+        """Overwrite the body with a ``snapshot()``."""
+        if state["capacity"] != self.capacity:
+            raise ValueError("snapshot capacity %d does not match %d" % (state["capacity"], self.capacity))
+        self._start = 0
+        self._length = 0
+        self._pushed = False
+        self.extend_tail(state["points"])
+        if state["spare"] is not None:
+            i = self._length
+            self._buf[i] = self._buf[i + self._size] = state["spare"]
+            self._pushed = True
+
+    def sync_view(self):
+        """After points were changed in place through ``view()``, update their mirrored copies."""
+        size = self._size
+        start, end = self._start, self._start + self._length
+        low = min(end, size)
+        self._buf[start + size:low + size] = self._buf[start:low]
+        if end > size:
+            self._buf[:end - size] = self._buf[size:end]
+
+    def copy_from(self, other):
+        """Overwrite the body with ``other`` (same capacity): one array copy."""
+        if other.capacity != self.capacity:
+            raise ValueError("body capacity %d does not match %d" % (other.capacity, self.capacity))
+        self._buf[:] = other._buf
+        self._start = other._start
+        self._length = other._length
+        self._pushed = other._pushed
+
+    @classmethod
+    def from_snapshot(cls, state, dtype=np.float64):
+        body = cls(state["capacity"], dtype=dtype)
+        body.restore(state)
+        return body
+
+    def view(self):
+        """Zero-copy (n, 2) array of the body, head first."""
+        return self._buf[self._start:self._start + self._length]
+
+    def previous(self):
+        """
+        Zero-copy (n, 2) array of the body before the last push.
+
+        For a head-history body the previous position of point ``i`` is the
+        current point ``i + 1``, and the old tail is still in the spare slot.
+        """
+        if not self._pushed:
+            return self.view()
+        start = self._start + 1
+        return self._buf[start:start + self._length]
+
+    def interpolated(self, alpha):
+        """Body positions blended ``alpha`` of a step from previous to current."""
+        cur = self.view()
+        if alpha >= 1.0:
+            return cur
+        prev = self.previous()
+        return prev + (cur - prev) * alpha
+
+    @property
+    def head(self):
+        return (float(self._buf[self._start, 0]), float(self._buf[self._start, 1]))
+
+    @property
+    def tail(self):
+        i = self._start + self._length - 1
+        return (float(self._buf[i, 0]), float(self._buf[i, 1]))
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, i):
+        return self.view()[i]
+
+    def __iter__(self):
+        return iter(self.view())
@@ -0,0 +1,138 @@
+"""
+Checkpointed stepping, so any step can be reached without replaying from 0.
+
+A ``Timeline`` drives a deterministic simulation through three callables:
+``step()``, ``snapshot()`` (returns the full state as plain data: dicts,
+lists, numbers and NumPy arrays) and ``restore(state)``. Every ``every``
+steps it keeps a snapshot. ``seek(n)`` then restores the nearest checkpoint
+at or before step ``n`` (unless carrying on from the current step is
+shorter) and replays only the rest. Because the snapshots hold the exact
+state, the replayed steps are bit-identical to the original run.
+
+``limit`` bounds the number of checkpoints kept: when it is exceeded every
+other checkpoint is dropped and the interval doubles, so a run of any
+length costs at most ``limit`` snapshots and a seek replays at most the
+current interval.
+
+``restore`` must copy out of the state it is given (the checkpoint is
+restored again on the next seek), and ``snapshot`` must return fresh data.
+
+Checkpoints can be saved to and loaded from an ``.npz`` file: arrays are
+stored as arrays, everything else as JSON.
+"""
+import bisect
+import json
+
+import numpy as np
+
+
+class Timeline:
+    """Steps a simulation, keeping a snapshot every ``every`` steps."""
+
+    def __init__(self, step, snapshot, restore, every=1000, limit=1024, position=0):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        if limit < 2:
+            raise ValueError("limit must be at least 2")
+        self._step = step
+        self._snapshot = snapshot
+        self._restore = restore
+        self.every = every
+        self.limit = limit
+        self.position = position
+        self.origin = position
+        self.checkpoints = {}
+        self._keys = []
+        self._keep()
+
+    def _keep(self):
+        if self.position not in self.checkpoints:
+            self.checkpoints[self.position] = self._snapshot()
+            bisect.insort(self._keys, self.position)
+        if len(self._keys) > self.limit:
+            self._thin()
+
+    def _thin(self):
+        # Keep the origin and every other multiple of the interval
+        self.every *= 2
+        self._keys = [k for k in self._keys if k == self.origin or (k - self.origin) % self.every == 0]
+        self.checkpoints = {k: self.checkpoints[k] for k in self._keys}
+
+    def advance(self, steps=1):
+        """Run ``steps`` steps from the current position."""
+        for _ in range(steps):
+            self._step()
+            self.position += 1
+            if (self.position - self.origin) % self.every == 0:
+                self._keep()
+
+    def nearest(self, target):
+        """Step of the last checkpoint at or before ``target``."""
+        i = bisect.bisect_right(self._keys, target) - 1
+        if i < 0:
+            raise ValueError("step %d is before the first checkpoint (%d)" % (target, self._keys[0]))
+        return self._keys[i]
+
+    def seek(self, target):
+        """Bring the simulation to step ``target``; returns how many steps were replayed."""
+        base = self.nearest(target)
+        if not base <= self.position <= target:
+            self._restore(self.checkpoints[base])
+            self.position = base
+        replayed = target - self.position
+        self.advance(replayed)
+        return replayed
+
+    def save(self, path):
+        """Write the checkpoints (and the interval) to ``path`` (an .npz file)."""
+        save_states(path, self.checkpoints, {"every": self.every, "origin": self.origin})
+
+    def load(self, path):
+        """Add the checkpoints saved in ``path``, e.g. by an earlier run."""
+        states, meta = load_states(path)
+        self.checkpoints.update(states)
+        self._keys = sorted(self.checkpoints)
+        self.every = max(self.every, meta.get("every", self.every))
+        while len(self._keys) > self.limit:
+            self._thin()
+
+
+def _flatten(value, prefix, arrays):
+    # JSON tree with every array swapped for a reference to an npz entry
+    if isinstance(value, np.ndarray):
+        arrays[prefix] = value
+        return {"__array__": prefix}
+    if isinstance(value, dict):
+        return {key: _flatten(v, "%s/%s" % (prefix, key), arrays) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_flatten(v, "%s/%d" % (prefix, i), arrays) for i, v in enumerate(value)]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _unflatten(value, arrays):
+    if isinstance(value, dict):
+        if set(value) == {"__array__"}:
+            return arrays[value["__array__"]]
+        return {key: _unflatten(v, arrays) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_unflatten(v, arrays) for v in value]
+    return value
+
+
+def save_states(path, states, meta=None):
+    """Save ``{step: state}`` to an .npz file."""
+    arrays = {}
+    tree = {str(step): _flatten(state, str(step), arrays) for step, state in states.items()}
+    header = json.dumps({"meta": meta or {}, "states": tree})
+    np.savez_compressed(path, __header__=np.array(header), **arrays)
+
+
+def load_states(path):
+    """Load ``({step: state}, meta)`` saved by ``save_states``."""
+    with np.load(path) as data:
+        header = json.loads(str(data["__header__"]))
+        arrays = {key: data[key] for key in data.files if key != "__header__"}
+    states = {int(step): _unflatten(state, arrays) for step, state in header["states"].items()}
+    return states, header["meta"]
@@ -0,0 +1,224 @@
+"""
+Head-history delta encoding of snake bodies.
+
+A body is the history of its head positions (see ``body.py``), so between
+steps all that changes is one new head at the front. ``HeadDeltaEncoder``
+sends just that: the new head, quantized to ``1 / scale`` px, as an int16
+step from the previous one. ``HeadDeltaDecoder`` pushes it into its own
+``SnakeBody`` and so rebuilds the whole body. A step costs 8 bytes per
+snake whatever the body length (the step and a patch count), plus 12
+bytes for each point that was moved in place rather than pushed (segments
+pushed back inside the walls, say): the encoder compares every body with
+what the decoder will have and patches the points that differ.
+
+A full keyframe (every point, as int32) goes out first, every
+``keyframe_every`` messages, and whenever a delta can't describe the change
+or would be no smaller: a different snake count or capacity, a body that
+didn't gain exactly one head (restored, reset, pushed twice), a jump too
+big for int16, or most of a body moved. The encoder quantizes relative to
+what it has sent, not to the true positions, so rounding never accumulates:
+every decoded point is within ``0.5 / scale`` of the original.
+
+Message layout (little endian)::
+
+    keyframe  b"K", uint32 seq, uint32 n, float32 scale,
+              uint32 capacity[n], uint32 length[n], int32 points[sum(length), 2]
+    delta     b"D", uint32 seq, int16 step[n, 2], uint32 patches[n],
+              uint32 index[sum(patches)], int32 points[sum(patches), 2]
+
+Deltas only make sense applied in order to the state before them, so the
+channel must deliver every message (a file, a pipe, TCP). The decoder
+checks ``seq`` and raises ``ValueError`` on a gap; a receiver that joins
+late or falls out of step needs the sender to ``request_keyframe()``.
+
+    python -m snakesim.delta Julius --steps 3600
+"""
+import argparse
+import struct
+import sys
+
+import numpy as np
+
+from .body import SnakeBody
+from .scripts import load_script
+
+_KEY = struct.Struct("<cIIf")
+_DELTA = struct.Struct("<cI")
+_INT16 = np.iinfo(np.int16)
+
+
+class HeadDeltaEncoder:
+    """Encodes a list of ``SnakeBody`` objects, once per step."""
+
+    def __init__(self, scale=16.0, keyframe_every=600):
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        self.scale = float(np.float32(scale))
+        self.keyframe_every = keyframe_every
+        self.seq = 0
+        self.keyframes = 0
+        self._sent = None  # every body, quantized, as the decoder has it
+        self._capacities = None
+        self._since_key = 0
+
+    def request_keyframe(self):
+        """Make the next message a keyframe (e.g. for a new receiver)."""
+        self._sent = None
+
+    def _quantize(self, points):
+        return np.rint(np.asarray(points, dtype=np.float64) * self.scale).astype(np.int64)
+
+    def _delta(self, bodies, points):
+        # Delta message bytes, or None when a delta won't do
+        if self._sent is None or len(bodies) != len(self._sent) or self._since_key >= self.keyframe_every:
+            return None
+        steps = np.empty((len(bodies), 2), dtype=np.int64)
+        counts, indices, patches = [], [], []
+        for i, (body, capacity, sent) in enumerate(zip(bodies, self._capacities, self._sent)):
+            if body.capacity != capacity or len(body) != min(len(sent) + 1, capacity):
+                return None
+            new = points[i]
+            steps[i] = new[0] - sent[0]
+            # After the push the decoder has the new head, then what it had before
+            changed = np.flatnonzero((new[1:] != sent[:len(new) - 1]).any(axis=1)) + 1
+            counts.append(len(changed))
+            indices.append(changed)
+            patches.append(new[changed])
+        if steps.min() < _INT16.min or steps.max() > _INT16.max:
+            return None
+        if sum(counts) * 12 >= sum(len(p) for p in points) * 8:
+            return None  # a keyframe is no bigger
+        return b"".join([_DELTA.pack(b"D", self.seq), steps.astype("<i2").tobytes(),
+                         np.array(counts, dtype="<u4").tobytes(),
+                         np.concatenate(indices).astype("<u4").tobytes(),
+                         np.concatenate(patches).reshape(-1, 2).astype("<i4").tobytes()])
+
+    def encode(self, bodies):
+        """Message bytes taking a decoder from the last message to ``bodies``."""
+        self.seq += 1
+        points = [self._quantize(body.view()) for body in bodies]
+        delta = self._delta(bodies, points)
+        self._sent = points
+        if delta is not None:
+            self._since_key += 1
+            return delta
+
+        self._capacities = [body.capacity for body in bodies]
+        self._since_key = 0
+        self.keyframes += 1
+        capacities = np.array([body.capacity for body in bodies], dtype="<u4")
+        lengths = np.array([len(body) for body in bodies], dtype="<u4")
+        return b"".join([_KEY.pack(b"K", self.seq, len(bodies), self.scale), capacities.tobytes(),
+                         lengths.tobytes(), np.concatenate(points).astype("<i4").tobytes()])
+
+
+class HeadDeltaDecoder:
+    """Rebuilds the bodies from ``HeadDeltaEncoder`` messages."""
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+        self.bodies = None
+        self.seq = None
+        self._heads = None
+        self._scale = None
+
+    def decode(self, message):
+        """Apply one message; returns the (updated in place) list of bodies."""
+        kind = message[:1]
+        if kind == b"K":
+            _, self.seq, n, self._scale = _KEY.unpack_from(message)
+            offset = _KEY.size
+            capacities = np.frombuffer(message, "<u4", n, offset)
+            lengths = np.frombuffer(message, "<u4", n, offset + 4 * n)
+            points = np.frombuffer(message, "<i4", int(lengths.sum()) * 2, offset + 8 * n).reshape(-1, 2)
+            chunks = np.split(points.astype(np.int64), np.cumsum(lengths)[:-1])
+            self.bodies = [SnakeBody(int(capacity), chunk / self._scale, dtype=self.dtype)
+                           for capacity, chunk in zip(capacities, chunks)]
+            self._heads = np.array([chunk[0] for chunk in chunks]).reshape(-1, 2)
+        elif kind == b"D":
+            _, seq = _DELTA.unpack_from(message)
+            if self.bodies is None:
+                raise ValueError("a delta arrived before any keyframe")
+            if seq != self.seq + 1:
+                raise ValueError("expected message %d, got %d" % (self.seq + 1, seq))
+            self.seq = seq
+            n = len(self.bodies)
+            offset = _DELTA.size
+            step = np.frombuffer(message, "<i2", 2 * n, offset).reshape(-1, 2)
+            counts = np.frombuffer(message, "<u4", n, offset + 4 * n)
+            offset += 8 * n
+            total = int(counts.sum())
+            indices = np.frombuffer(message, "<u4", total, offset)
+            patches = np.frombuffer(message, "<i4", 2 * total, offset + 4 * total).reshape(-1, 2)
+            self._heads += step
+            first = 0
+            for body, (x, y), count in zip(self.bodies, (self._heads / self._scale).tolist(), counts.tolist()):
+                body.push(x, y)
+                if count:
+                    # Points moved in place since the last message
+                    view = body.view()
+                    view[indices[first:first + count]] = patches[first:first + count] / self._scale
+                    body.sync_view()
+                    first += count
+        else:
+            raise ValueError("not a head-delta message: %r" % kind)
+        return self.bodies
+
+
+def _chatgpt(m):
+    return m.step, lambda: [m.snake_positions]
+
+
+def _claude(m):
+    snake = m.Snake(m.WIDTH // 2, m.HEIGHT // 2)
+    pentagon = m.Pentagon(m.WIDTH // 2, m.HEIGHT // 2, 200)
+    return lambda: m.step(snake, pentagon), lambda: [snake.segments]
+
+
+def _deepseek(m):
+    pentagon = m.Pentagon()
+    snakes = m.create_snakes(m.NUM_SNAKES)
+    world = m.SnakeWorld(snakes, m.SNAKE_SIZE) if len(snakes) > 1 else None
+    return lambda: m.step(pentagon, snakes, world), lambda: [snake.tail for snake in snakes]
+
+
+def _julius(m):
+    return m.step, lambda: [m.snake_points]
+
+
+# Script name -> function(module) returning (step, bodies) for the head-history scripts
+ADAPTERS = {
+    "ChatGPT": _chatgpt,
+    "Claude": _claude,
+    "Deepseek": _deepseek,
+    "Julius": _julius,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure head-delta encoding on a script's run.")
+    parser.add_argument("script", choices=sorted(ADAPTERS))
+    parser.add_argument("--steps", type=int, default=3600)
+    parser.add_argument("--scale", type=float, default=16.0, help="quantization steps per pixel")
+    parser.add_argument("--keyframe-every", type=int, default=600)
+    args = parser.parse_args(argv)
+
+    step, bodies = ADAPTERS[args.script](load_script(args.script))
+    encoder = HeadDeltaEncoder(args.scale, args.keyframe_every)
+    decoder = HeadDeltaDecoder()
+    encoded = full = 0
+    error = 0.0
+    for _ in range(args.steps):
+        step()
+        message = encoder.encode(bodies())
+        decoded = decoder.decode(message)
+        encoded += len(message)
+        full += sum(body.view().nbytes for body in bodies())
+        error = max(error, max(np.abs(a.view() - b.view()).max() for a, b in zip(bodies(), decoded)))
+    print("%d steps: %d bytes encoded (%.1f per step, %d keyframes), %d bytes as float64 (%.0fx)"
+          % (args.steps, encoded, encoded / args.steps, encoder.keyframes, full, full / encoded))
+    print("max decoded error %.4f px (bound %.4f)" % (error, 0.5 / encoder.scale))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Event-driven simulation: jump from one wall contact straight to the next.
+
+Between bounces a head moves in a straight line at constant velocity while
+its polygon turns at a constant rate, so the whole motion up to the next
+contact is known in closed form. Instead of ticking every step, each snake
+keeps the state at its last event and the time of its next one (solved by
+``collision.time_of_impact``). Nothing happens between events, so time can
+be advanced by any amount at the cost of only the bounces in between, and
+positions are worked out only at the times someone asks for them.
+
+    python -m snakesim.events --n 100000 --time 100000
+
+Each round of ``advance`` handles the next event of every due snake at
+once, so the Python overhead is per round, not per bounce. What is left
+is the contact solve itself: a few marching iterations, each over every
+wall of every due snake.
+
+Known limitation: the goal was millions of bounces per second, and this
+module falls well short of it. The contact solve caps it at roughly 2e5
+bounces/s on one core (measured with 10,000 and 100,000 snakes in
+pentagons); reaching ``TARGET_RATE`` would need a compiled solver.
+``main`` prints the measured rate against that target.
+
+Units are the same as ``BatchEngine``: time in steps, speeds per step. The
+bounce rule is ``collision.reflect_off_wall``, the same as the swept engine.
+This module never imports pygame.
+"""
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from .collision import push_inside, reflect_off_wall, time_of_impact
+
+# Bounces closer together than this (in steps) count as one run of chatter
+CHATTER_GAP = 1e-3
+
+# Bounces per second this module was meant to reach (see the module docstring)
+TARGET_RATE = 1e6
+
+
+class EventSimulator:
+    """
+    N snakes in N rotating regular polygons, advanced bounce by bounce.
+
+    Parameters are as for ``BatchEngine``. ``horizon`` is how far ahead a
+    contact is searched for; a snake with no contact within it (or one the
+    solver could not pin down yet) gets a "no-op" event at the point it got
+    to, and the search carries on from there.
+
+    A head sliding along a turning wall keeps being turned back into it,
+    bouncing again and again a vanishing time apart. After ``max_bounces``
+    such bounces in a row it is left to slide for one step without events
+    and then pushed back inside, as the swept engine does within a step.
+    Positions sampled during that step would overlap the wall, so
+    ``state`` pushes every sampled head back inside its polygon.
+    """
+
+    def __init__(self, n, center=(400.0, 300.0), radius=200.0, sides=5,
+                 rotation_speed=0.01, speed=3.0, head_radius=10.0,
+                 heading=None, seed=None, horizon=1000.0, keep_speed=True, max_bounces=16):
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        if sides < 3:
+            raise ValueError("a polygon needs at least 3 sides")
+        self.n = n
+        self.sides = sides
+        self.horizon = float(horizon)
+        self.keep_speed = keep_speed
+        self.max_bounces = max_bounces
+        self.center = np.array(center, dtype=np.float64)
+        self.radius = self._per_snake(radius)
+        self.rotation_speed = self._per_snake(rotation_speed)
+        self.head_radius = self._per_snake(head_radius)
+        if np.any(self.head_radius >= self.radius * math.cos(math.pi / sides)):
+            raise ValueError("head_radius must be smaller than the apothem")
+
+        if heading is None:
+            rng = np.random.default_rng(seed)
+            heading = rng.uniform(0.0, 2 * math.pi, n)
+        heading = self._per_snake(heading)
+        speed = self._per_snake(speed)
+
+        # State at each snake's last event
+        self.time = 0.0
+        self._t0 = np.zeros(n)
+        self._pos = np.tile(self.center, (n, 1))
+        self._vel = np.stack([np.cos(heading), np.sin(heading)], axis=1) * speed[:, None]
+        self._angle = np.zeros(n)
+
+        self.bounces = np.zeros(n, dtype=np.int64)
+        self.edge_hits = np.zeros((n, sides), dtype=np.int64)
+        self.events = 0  # solver calls, bounces or not
+        self._streak = np.zeros(n, dtype=np.int64)
+
+        self._next_t = np.zeros(n)
+        self._next_edge = np.zeros(n, dtype=np.intp)
+        self._next_hit = np.zeros(n, dtype=bool)
+        self._schedule(np.arange(n))
+
+    @classmethod
+    def from_engine(cls, engine, **kwargs):
+        """Carry on from the current state of a (world-frame) ``BatchEngine``."""
+        sim = cls(engine.n, engine.center, engine.radius, engine.sides, engine.rotation_speed,
+                  engine.speed, engine.head_radius, heading=np.zeros(engine.n), **kwargs)
+        sim._pos[:] = engine.pos
+        sim._vel[:] = engine.vel
+        sim._angle[:] = engine.angle
+        sim._schedule(np.arange(engine.n))
+        return sim
+
+    def _per_snake(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (self.n,)).copy()
+
+    def _schedule(self, rows):
+        # Solve for the next contact of ``rows`` from their last event
+        t, edge, hit = time_of_impact(self._pos[rows], self._vel[rows], self.head_radius[rows],
+                                      self.center, self.radius[rows], self.sides,
+                                      self._angle[rows], self.rotation_speed[rows], self.horizon)
+        self._next_t[rows] = self._t0[rows] + t
+        self._next_edge[rows] = edge
+        self._next_hit[rows] = hit
+
+    def advance(self, until):
+        """Process every event up to time ``until``; returns the bounces done."""
+        if until < self.time:
+            raise ValueError("cannot go back in time (at %g, asked for %g)" % (self.time, until))
+        done = 0
+        while True:
+            rows = np.flatnonzero(self._next_t <= until)
+            if len(rows) == 0:
+                break
+            # Jump to the event
+            dt = self._next_t[rows] - self._t0[rows]
+            self._pos[rows] += self._vel[rows] * dt[:, None]
+            self._angle[rows] += self.rotation_speed[rows] * dt
+            self._t0[rows] = self._next_t[rows]
+
+            hit = self._next_hit[rows]
+            self._streak[rows] = np.where(hit & (dt < CHATTER_GAP), self._streak[rows] + 1, 0)
+            bounced = rows[hit]
+            missed = rows[~hit]
+            if len(missed):
+                # Only a slide can have left a head overlapping a wall
+                push_inside(self._pos, missed, self.head_radius, self.center, self.radius,
+                            self.sides, self._angle)
+            if len(bounced):
+                reflect_off_wall(self._pos, self._vel, bounced, self._next_edge[bounced], self._angle,
+                                 self.head_radius, self.center, self.sides, self.rotation_speed,
+                                 self.keep_speed)
+                self.bounces[bounced] += 1
+                np.add.at(self.edge_hits, (bounced, self._next_edge[bounced]), 1)
+                done += len(bounced)
+            self.events += len(rows)
+            self._schedule(rows)
+            sliding = rows[self._streak[rows] >= self.max_bounces]
+            if len(sliding):
+                self._next_t[sliding] = self._t0[sliding] + 1.0
+                self._next_hit[sliding] = False
+                self._streak[sliding] = 0
+        self.time = float(until)
+        return done
+
+    def state(self, t=None):
+        """
+        ``(pos, vel, angle)`` of every snake at time ``t`` (default: now),
+        advancing to it first. Computed on demand; nothing is stored.
+        """
+        if t is not None:
+            self.advance(t)
+        else:
+            t = self.time
+        dt = t - self._t0
+        pos = self._pos + self._vel * dt[:, None]
+        angle = self._angle + self.rotation_speed * dt
+        push_inside(pos, np.arange(self.n), self.head_radius, self.center, self.radius, self.sides, angle)
+        return pos, self._vel.copy(), angle
+
+    def sample(self, times):
+        """
+        Positions and polygon angles at each of ``times`` (ascending),
+        shapes (len(times), n, 2) and (len(times), n).
+        """
+        times = np.asarray(times, dtype=np.float64)
+        pos = np.empty((len(times), self.n, 2))
+        angle = np.empty((len(times), self.n))
+        for i, t in enumerate(times):
+            pos[i], _, angle[i] = self.state(t)
+        return pos, angle
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event-driven bounce throughput run.")
+    parser.add_argument("--n", type=int, default=10000, help="number of snakes")
+    parser.add_argument("--time", type=float, default=10000.0, help="steps of simulated time")
+    parser.add_argument("--sides", type=int, default=5)
+    parser.add_argument("--speed", type=float, default=3.0)
+    parser.add_argument("--rotation-speed", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sim = EventSimulator(args.n, sides=args.sides, speed=args.speed,
+                         rotation_speed=args.rotation_speed, seed=args.seed)
+    start = time.perf_counter()
+    bounces = sim.advance(args.time)
+    elapsed = time.perf_counter() - start
+    print("%d bounces (%d events) in %.2fs: %.0f bounces/s, %.0f steps/s equivalent"
+          % (bounces, sim.events, elapsed, bounces / elapsed, args.n * args.time / elapsed))
+    print("target %.0f bounces/s: reached %.0f%% (the contact solve is the limit)"
+          % (TARGET_RATE, 100.0 * bounces / elapsed / TARGET_RATE))
+    hits = sim.edge_hits.sum(axis=0)
+    print("hits per edge: %s" % " ".join(str(h) for h in hits))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
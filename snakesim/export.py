@@ -0,0 +1,295 @@
+"""
+Headless video export, as fast as frames can be encoded.
+
+    python -m snakesim.export Deepseek frames/ --seconds 20
+    python -m snakesim.export ChatGPT - --format y4m | ffmpeg -i - snake.mp4
+
+A script is loaded under SDL's dummy driver (see ``scripts.py``), so the
+screen its ``init_display()`` opens is an offscreen surface, and drawn into
+it at a fixed output frame rate. Physics
+still runs at the script's own rate: each frame advances it by exactly
+``1 / fps`` seconds, with no clock in the loop. Frame pixels are copied out
+on the main thread and handed to a pool of worker threads for compression,
+so the simulation carries on while earlier frames are encoded. At most
+``queue_size`` frames are in flight; when the encoders fall behind, the
+main thread waits for the oldest one, so the export runs at the speed of
+encoding, not of the wall clock.
+
+Two formats:
+
+* ``png``: a numbered PNG sequence in a directory. Each worker writes its
+  own files, so frames finish in any order.
+* ``y4m``: a YUV4MPEG2 (4:2:0) stream to a file or, with ``-``, to stdout
+  for a pipe into ffmpeg or a player. Frames are converted in the workers
+  and written in order. If the reader of stdout exits early (``| head``),
+  the export stops at that frame instead of failing.
+
+zlib and the large NumPy operations release the GIL, so the workers really
+do run in parallel with the simulation. Like ``render.py``, this module
+imports pygame.
+"""
+import argparse
+import collections
+import fractions
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# pygame's import banner goes to stdout, where a piped y4m stream goes too
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+
+from .scripts import SCRIPTS, load_script
+from .timestep import FixedTimestep
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def encode_png(rgb, width, height, level=6):
+    """PNG file contents for packed 8-bit RGB pixel bytes."""
+    rows = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width * 3)
+    # Every scanline starts with its filter type; 0 is "none"
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = rows
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"".join([PNG_SIGNATURE, _png_chunk(b"IHDR", header),
+                     _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), level)),
+                     _png_chunk(b"IEND", b"")])
+
+
+def rgb_to_yuv420(rgb, width, height):
+    """Planar Y, Cb, Cr bytes (full-range BT.601, chroma halved both ways)."""
+    pixels = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width, 3).astype(np.float32)
+    r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    y = 0.299 * r + 0.587 * g + 0.114 * b
+    cb = 128 - 0.168736 * r - 0.331264 * g + 0.5 * b
+    cr = 128 + 0.5 * r - 0.418688 * g - 0.081312 * b
+
+    def half(plane):
+        return plane.reshape(height // 2, 2, width // 2, 2).mean(axis=(1, 3))
+
+    planes = [y, half(cb), half(cr)]
+    return b"".join(np.clip(np.rint(p), 0, 255).astype(np.uint8).tobytes() for p in planes)
+
+
+class FrameExporter:
+    """
+    Compresses frames on a thread pool and writes them out.
+
+    ``target`` is a directory for ``png``, and a path, an open binary file
+    or ``-`` (stdout) for ``y4m``. ``write`` blocks only when ``queue_size``
+    frames are already waiting to be encoded. ``closed_early`` is set when
+    the reader of stdout went away; later frames are dropped.
+    """
+
+    def __init__(self, target, size, format="png", fps=60, workers=None, queue_size=None, level=6):
+        if format not in ("png", "y4m"):
+            raise ValueError("format must be 'png' or 'y4m'")
+        self.width, self.height = size
+        if format == "y4m" and (self.width % 2 or self.height % 2):
+            raise ValueError("y4m export needs an even width and height")
+        self.format = format
+        self.level = level
+        self.frames = 0
+        self.closed_early = False
+        workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or 2 * workers
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="export")
+        self._pending = collections.deque()
+
+        self._stream = None
+        self._owns_stream = False
+        self._stdout = target == "-"
+        if format == "png":
+            self.directory = target
+            os.makedirs(target, exist_ok=True)
+        else:
+            if target == "-":
+                self._stream = sys.stdout.buffer
+            elif isinstance(target, (str, bytes, os.PathLike)):
+                self._stream = open(target, "wb")
+                self._owns_stream = True
+            else:
+                self._stream = target
+            rate = fractions.Fraction(fps).limit_denominator(1001)
+            self._send(b"YUV4MPEG2 W%d H%d F%d:%d Ip A1:1 C420jpeg\n"
+                       % (self.width, self.height, rate.numerator, rate.denominator))
+
+    def write(self, surface):
+        """Queue the current contents of ``surface`` as the next frame."""
+        if surface.get_size() != (self.width, self.height):
+            raise ValueError("frame size %s does not match %s" % (surface.get_size(), (self.width, self.height)))
+        if self.closed_early:
+            return
+        while len(self._pending) >= self.queue_size:
+            self._finish(self._pending.popleft())
+        rgb = pygame.image.tobytes(surface, "RGB")
+        if self.format == "png":
+            path = os.path.join(self.directory, "frame_%06d.png" % self.frames)
+            future = self._pool.submit(self._save_png, path, rgb)
+        else:
+            future = self._pool.submit(rgb_to_yuv420, rgb, self.width, self.height)
+        self._pending.append(future)
+        self.frames += 1
+
+    def _save_png(self, path, rgb):
+        data = encode_png(rgb, self.width, self.height, self.level)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _finish(self, future):
+        result = future.result()
+        if self._stream is not None and not self.closed_early:
+            self._send(b"FRAME\n", result)
+
+    def _send(self, *chunks):
+        try:
+            for chunk in chunks:
+                self._stream.write(chunk)
+        except BrokenPipeError:
+            if not self._stdout:
+                raise
+            self._reader_gone()
+
+    def _reader_gone(self):
+        # Nothing reads stdout any more: stop writing, and point it at
+        # devnull so flushing what is still buffered can't fail again
+        self.closed_early = True
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+
+    def close(self):
+        """Wait for every queued frame to be written."""
+        while self._pending:
+            self._finish(self._pending.popleft())
+        self._pool.shutdown()
+        if self._stream is not None:
+            try:
+                self._stream.flush()
+            except BrokenPipeError:
+                if not self._stdout:
+                    raise
+                self._reader_gone()
+                self._stream.flush()
+            if self._owns_stream:
+                self._stream.close()
+            self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _chatgpt(m, surface):
+    return m.PHYSICS_HZ, m.step, m.draw
+
+
+def _claude(m, surface):
+    snake = m.Snake(m.WIDTH // 2, m.HEIGHT // 2)
+    pentagon = m.Pentagon(m.WIDTH // 2, m.HEIGHT // 2, 200)
+
+    def draw(alpha):
+        surface.fill(m.BLACK)
+        m.draw(surface, snake, pentagon, alpha)
+    return m.PHYSICS_HZ, lambda: m.step(snake, pentagon), draw
+
+
+def _deepseek(m, surface):
+    pentagon = m.Pentagon()
+    snakes = m.create_snakes(m.NUM_SNAKES)
+    world = m.SnakeWorld(snakes, m.SNAKE_SIZE) if len(snakes) > 1 else None
+
+    def draw(alpha):
+        surface.fill(m.BLACK)
+        m.draw(surface, pentagon, snakes, alpha)
+    return m.PHYSICS_HZ, lambda: m.step(pentagon, snakes, world), draw
+
+
+def _gemini(m, surface):
+    return m.physics_hz, m.step, m.draw
+
+
+def _julius(m, surface):
+    return m.physics_hz, m.step, m.draw
+
+
+# Script name -> function(module, screen from init_display) returning
+# (physics rate, step, draw(alpha))
+ADAPTERS = {
+    "ChatGPT": _chatgpt,
+    "Claude": _claude,
+    "Deepseek": _deepseek,
+    "Gemini": _gemini,
+    "Julius": _julius,
+}
+
+
+def export(name, target, seconds=10.0, fps=60, format="png", workers=None, queue_size=None,
+           level=6, log=None):
+    """
+    Render ``seconds`` of script ``name`` into ``target``; returns the frame
+    count (fewer if the reader of stdout stopped early).
+    """
+    module = load_script(name)
+    surface = module.init_display()
+    size = surface.get_size()
+    rate, step, draw = ADAPTERS[name](module, surface)
+
+    frames = int(round(seconds * fps))
+    timestep = FixedTimestep(rate, max_steps=sys.maxsize)
+    start = time.perf_counter()
+    with FrameExporter(target, size, format, fps, workers, queue_size, level) as exporter:
+        for frame in range(frames):
+            for _ in range(timestep.advance(1.0 / fps)):
+                step()
+            draw(timestep.alpha)
+            exporter.write(surface)
+            if exporter.closed_early:
+                if log:
+                    log("output closed by the reader after %d frames" % exporter.frames)
+                return exporter.frames
+            if log and (frame + 1) % fps == 0:
+                elapsed = time.perf_counter() - start
+                log("%d/%d frames, %.1fx real time" % (frame + 1, frames, (frame + 1) / fps / elapsed))
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a script's animation without a window.")
+    parser.add_argument("script", choices=sorted(SCRIPTS))
+    parser.add_argument("target", help="directory for png, file or - (stdout) for y4m")
+    parser.add_argument("--format", choices=("png", "y4m"),
+                        help="default: y4m for - or *.y4m targets, png otherwise")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=int, default=60, help="output frame rate")
+    parser.add_argument("--workers", type=int, help="encoder threads (default: CPU count)")
+    parser.add_argument("--queue", type=int, help="max frames waiting to be encoded")
+    parser.add_argument("--level", type=int, default=6, help="PNG zlib level, 0-9")
+    args = parser.parse_args(argv)
+
+    format = args.format
+    if format is None:
+        format = "y4m" if args.target == "-" or args.target.endswith(".y4m") else "png"
+
+    log = lambda message: print(message, file=sys.stderr)
+    start = time.perf_counter()
+    frames = export(args.script, args.target, args.seconds, args.fps, format, args.workers,
+                    args.queue, args.level, log=log)
+    elapsed = time.perf_counter() - start
+    log("wrote %d frames in %.1fs (%.0f fps)" % (frames, elapsed, frames / elapsed))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
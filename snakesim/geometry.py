@@ -0,0 +1,306 @@
+"""
+Cached geometry for a rotating regular polygon.
+
+The shape of a regular polygon never changes, only its angle. So the unit
+vertices, edge directions, normals and edge length are worked out once, and
+each rotation step just updates a cos/sin pair with a cached rotation for
+the step angle. World-space vertices, normals and edges are rebuilt lazily,
+only when a caller asks for them, and only once per rotation.
+
+Angles are in radians. Vertex ``k`` sits at ``angle + 2*pi*k/sides`` and
+edge ``k`` runs from vertex ``k`` to vertex ``k + 1``. ``normals()`` point
+inward, the same convention as the ``(-edge_y, edge_x)`` normals in the
+scripts.
+
+Seen from the centre, edge ``k`` owns the sector between the rays through
+its two vertices, and for any point (inside or out) the edge of its sector
+is the one whose line is nearest (most violated), since it is the edge
+whose normal is closest in angle. So the edge that matters for a point is
+found from its polar angle alone, in constant time, however many sides the
+polygon has.
+
+The polygon's own frame turns with it about the centre; at angle 0 it
+lines up with world space. In that frame the walls never move, so
+``local_vertices()`` and ``local_edges()`` are built once for good, and
+``to_local``/``to_world`` convert points between the two frames.
+
+``push_inside`` keeps whole bodies of circles inside with the same sector
+lookup, as array operations over every point at once. Most points of a
+body are nowhere near a wall and are ruled out by their distance from the
+centre alone, so only the few near the walls get the sector test.
+"""
+import math
+
+import numpy as np
+
+
+def sector_of(rel_x, rel_y, angle, sides):
+    """
+    Index of the edge whose sector contains the point(s) at ``rel`` from the
+    centre, for a polygon at ``angle``. Works on scalars and arrays.
+    """
+    theta = np.arctan2(rel_y, rel_x) - angle
+    return np.floor(theta * (sides / (2 * math.pi))).astype(np.intp) % sides
+
+
+class RegularPolygon:
+    """A regular polygon that rotates about its centre."""
+
+    # Re-normalise the incremental cos/sin pair this often to stop drift
+    RENORMALIZE_EVERY = 1024
+
+    def __init__(self, center, radius, sides=5, angle=0.0, step=0.0):
+        if sides < 3:
+            raise ValueError("a polygon needs at least 3 sides")
+        self.center = (float(center[0]), float(center[1]))
+        self.radius = float(radius)
+        self.sides = sides
+
+        # Fixed shape, computed once
+        k = np.arange(sides)
+        theta = 2 * math.pi * k / sides
+        self.unit_vertices = np.stack([np.cos(theta), np.sin(theta)], axis=1)
+        phi = theta + math.pi / sides
+        # Inward normal of each edge, and the edge direction (start -> end)
+        self.unit_normals = -np.stack([np.cos(phi), np.sin(phi)], axis=1)
+        self.unit_directions = np.stack([-np.sin(phi), np.cos(phi)], axis=1)
+        self.edge_length = 2 * self.radius * math.sin(math.pi / sides)
+        self.apothem = self.radius * math.cos(math.pi / sides)
+        # Built on first use; they never change
+        self._local_vertices = None
+        self._local_edges = None
+
+        self.set_step(step)
+        self.set_angle(angle)
+
+    def set_step(self, step):
+        """Set (and cache the rotation for) the default ``rotate()`` step."""
+        self.step = float(step)
+        self._step_cos = math.cos(self.step)
+        self._step_sin = math.sin(self.step)
+
+    def set_angle(self, angle):
+        """Jump straight to ``angle``."""
+        self.angle = float(angle)
+        self._cos = math.cos(self.angle)
+        self._sin = math.sin(self.angle)
+        self._rotations = 0
+        self._cache = {}
+
+    def snapshot(self):
+        """
+        The rotation state as plain data. It includes the incremental
+        cos/sin pair, so a restored polygon carries on bit for bit.
+        """
+        return {"angle": self.angle, "cos": self._cos, "sin": self._sin,
+                "rotations": self._rotations, "step": self.step}
+
+    def restore(self, state):
+        """Go back to a ``snapshot()``."""
+        self.set_step(state["step"])
+        self.angle = float(state["angle"])
+        self._cos = float(state["cos"])
+        self._sin = float(state["sin"])
+        self._rotations = int(state["rotations"])
+        self._cache = {}
+
+    def rotate(self, delta=None):
+        """Rotate by ``delta`` radians, or by the cached step when omitted."""
+        if delta is None or delta == self.step:
+            dc, ds = self._step_cos, self._step_sin
+            delta = self.step
+        else:
+            dc, ds = math.cos(delta), math.sin(delta)
+        c, s = self._cos, self._sin
+        c, s = c * dc - s * ds, s * dc + c * ds
+        self._rotations += 1
+        if self._rotations % self.RENORMALIZE_EVERY == 0:
+            norm = math.hypot(c, s)
+            c, s = c / norm, s / norm
+        self._cos, self._sin = c, s
+        self.angle += delta
+        self._cache = {}
+
+    def _rotated(self, unit, c, s):
+        out = np.empty_like(unit)
+        out[:, 0] = unit[:, 0] * c - unit[:, 1] * s
+        out[:, 1] = unit[:, 0] * s + unit[:, 1] * c
+        return out
+
+    def _cached(self, key, build):
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache[key] = build()
+        return value
+
+    def vertex_array(self):
+        """World-space vertices as a (sides, 2) array."""
+        def build():
+            pts = self._rotated(self.unit_vertices, self._cos, self._sin)
+            pts *= self.radius
+            pts += self.center
+            return pts
+        return self._cached("vertex_array", build)
+
+    def vertices(self):
+        """World-space vertices as a list of (x, y) tuples."""
+        return self._cached("vertices", lambda: [tuple(p) for p in self.vertex_array().tolist()])
+
+    def normal_array(self):
+        """Inward unit normals in world space, shape (sides, 2)."""
+        return self._cached("normal_array", lambda: self._rotated(self.unit_normals, self._cos, self._sin))
+
+    def normals(self):
+        """Inward unit normals in world space as (x, y) tuples."""
+        return self._cached("normals", lambda: [tuple(n) for n in self.normal_array().tolist()])
+
+    def direction_array(self):
+        """Unit edge directions in world space, shape (sides, 2)."""
+        return self._cached("direction_array", lambda: self._rotated(self.unit_directions, self._cos, self._sin))
+
+    def directions(self):
+        """Unit edge directions in world space as (x, y) tuples."""
+        return self._cached("directions", lambda: [tuple(d) for d in self.direction_array().tolist()])
+
+    def edges(self):
+        """List of (start, end, inward_normal) tuples, one per edge."""
+        def build():
+            verts = self.vertices()
+            normals = self.normals()
+            n = self.sides
+            return [(verts[i], verts[(i + 1) % n], normals[i]) for i in range(n)]
+        return self._cached("edges", build)
+
+    def vertex(self, k):
+        """World-space vertex ``k`` as an (x, y) tuple, without building the rest."""
+        ux, uy = self.unit_vertices[k % self.sides]
+        c, s = self._cos, self._sin
+        return (self.center[0] + self.radius * float(ux * c - uy * s),
+                self.center[1] + self.radius * float(ux * s + uy * c))
+
+    def edge_normal(self, k):
+        """Inward unit normal of edge ``k`` as an (x, y) tuple."""
+        ux, uy = self.unit_normals[k % self.sides]
+        c, s = self._cos, self._sin
+        return (float(ux * c - uy * s), float(ux * s + uy * c))
+
+    def edge(self, k):
+        """Edge ``k`` as a (start, end, inward_normal) tuple, in constant time."""
+        return (self.vertex(k), self.vertex(k + 1), self.edge_normal(k))
+
+    def sector(self, x, y):
+        """Index of the edge whose sector contains (x, y): the nearest edge line."""
+        theta = math.atan2(y - self.center[1], x - self.center[0]) - self.angle
+        return int(math.floor(theta * self.sides / (2 * math.pi))) % self.sides
+
+    def nearest_edge(self, x, y):
+        """
+        ``(k, distance)`` for the edge line nearest to (x, y), found from the
+        point's sector. ``distance`` is signed, negative outside, and equals
+        ``min(signed_distances(x, y))``.
+        """
+        k = self.sector(x, y)
+        nx, ny = self.edge_normal(k)
+        return k, self.apothem + (x - self.center[0]) * nx + (y - self.center[1]) * ny
+
+    def contains(self, x, y):
+        """True if (x, y) is inside the polygon (or on its boundary)."""
+        return self.nearest_edge(x, y)[1] >= 0
+
+    def to_local(self, x, y):
+        """World point (x, y) in the polygon's frame."""
+        cx, cy = self.center
+        x -= cx
+        y -= cy
+        c, s = self._cos, self._sin
+        return (cx + x * c + y * s, cy - x * s + y * c)
+
+    def to_world(self, x, y):
+        """Point (x, y) of the polygon's frame in world space."""
+        cx, cy = self.center
+        x -= cx
+        y -= cy
+        c, s = self._cos, self._sin
+        return (cx + x * c - y * s, cy + x * s + y * c)
+
+    def step_back(self, x, y, vector=False):
+        """
+        Turn (x, y), given in the polygon's frame, by minus one ``step``, so
+        it stays put in world space across the next ``rotate()``. Points turn
+        about the centre; with ``vector`` (directions, velocities) about the
+        origin.
+        """
+        cx, cy = (0.0, 0.0) if vector else self.center
+        x -= cx
+        y -= cy
+        c, s = self._step_cos, self._step_sin
+        return (cx + x * c + y * s, cy - x * s + y * c)
+
+    def local_vertices(self):
+        """Vertices in the polygon's frame, as (x, y) tuples (never change)."""
+        verts = self._local_vertices
+        if verts is None:
+            pts = self.unit_vertices * self.radius + self.center
+            verts = self._local_vertices = [tuple(p) for p in pts.tolist()]
+        return verts
+
+    def local_edges(self):
+        """``edges()`` in the polygon's frame (never change)."""
+        edges = self._local_edges
+        if edges is None:
+            verts = self.local_vertices()
+            normals = [tuple(n) for n in self.unit_normals.tolist()]
+            n = self.sides
+            edges = self._local_edges = [(verts[i], verts[(i + 1) % n], normals[i]) for i in range(n)]
+        return edges
+
+    def vertices_at(self, angle):
+        """Vertices at another angle (e.g. for render interpolation), uncached."""
+        pts = self._rotated(self.unit_vertices, math.cos(angle), math.sin(angle))
+        pts *= self.radius
+        pts += self.center
+        return [tuple(p) for p in pts.tolist()]
+
+    def signed_distances(self, x, y):
+        """Distance from (x, y) to every edge line; negative means outside."""
+        rel_x = x - self.center[0]
+        rel_y = y - self.center[1]
+        normals = self.normal_array()
+        return self.apothem + rel_x * normals[:, 0] + rel_y * normals[:, 1]
+
+    def push_inside(self, points, radius=0.0):
+        """
+        Move every one of the (n, 2) ``points`` whose circle of ``radius``
+        crosses a wall back inside, in place, onto the nearest point of the
+        polygon shrunk by ``radius``. Returns the indices of the points moved.
+        """
+        inset = self.apothem - radius
+        if inset <= 0:
+            raise ValueError("radius must be smaller than the apothem")
+        rel = points - self.center
+        # Within the shrunk polygon's incircle nothing can touch a wall
+        near = np.flatnonzero(np.einsum("ij,ij->i", rel, rel) > inset * inset)
+        if not len(near):
+            return near
+        rel = rel[near]
+        k = sector_of(rel[:, 0], rel[:, 1], self.angle, self.sides)
+        normal = self.normal_array()[k]
+        hit = self.apothem + np.einsum("ij,ij->i", rel, normal) < radius
+        near, rel, k, normal = near[hit], rel[hit], k[hit], normal[hit]
+        # Onto the shrunk edge's line, clamped to its ends so corners stay clear
+        along = self.direction_array()[k]
+        half = inset * math.tan(math.pi / self.sides)
+        t = np.clip(np.einsum("ij,ij->i", rel, along), -half, half)
+        points[near] = self.center - normal * inset + along * t[:, None]
+        return near
+
+    def clearance(self, points, radius=0.0):
+        """
+        How far the nearest of the (n, 2) ``points``' circles of ``radius``
+        is from touching a wall (negative if one crosses it). Only the
+        minimum is wanted, so one product against every edge normal is
+        cheaper here than a sector lookup per point.
+        """
+        if not len(points):
+            return math.inf
+        return float(((points - self.center) @ self.normal_array().T).min()) + self.apothem - radius
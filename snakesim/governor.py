@@ -0,0 +1,147 @@
+"""
+Adaptive frame pacing for the render loops.
+
+``clock.tick(fps)`` draws every frame at the same rate whether anyone can
+see it or not. ``FrameGovernor`` decides per loop iteration whether to draw
+at all, and how long to sleep:
+
+* Behind schedule: when the fixed-timestep physics needed at least a step
+  more this iteration than one loop period at ``physics_hz`` holds (the
+  last frame took too long), drawing is skipped, at most ``max_skip`` times
+  in a row, so the loop catches up. Only when drawing is worth skipping:
+  the governor times every drawn frame, and a draw costing under a tenth
+  of a step would not win the time back. Physics is never skipped; it is
+  the caller's ``FixedTimestep``.
+* Minimized or hidden, drawing drops to ``hidden_fps``; unfocused, to
+  ``background_fps``. The loop still wakes ``wake_hz`` times a second to
+  run the steps that came due, so the simulation keeps going.
+* Idle: after ``idle_after`` seconds in which nothing changed, drawing
+  drops to ``idle_fps`` until the next change (or input event). What
+  counts as a change is up to the caller's ``changed`` flag. The scripts'
+  snakes never stop, so they never go idle; the replay viewer does while
+  paused or stopped at either end.
+
+A ``fps`` of 0 means uncapped, as for ``clock.tick``. ``handle`` reads
+pygame window events, but this module never imports pygame itself until
+an event arrives.
+"""
+import math
+import time
+
+
+class FrameGovernor:
+    """Decides when to draw and sleeps between frames, in place of ``clock.tick``."""
+
+    def __init__(self, fps=60, physics_hz=60, background_fps=30, hidden_fps=1, idle_fps=10,
+                 idle_after=1.0, wake_hz=10, max_skip=4):
+        self.fps = fps
+        self.physics_hz = physics_hz
+        self.background_fps = background_fps
+        self.hidden_fps = hidden_fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.wake_hz = wake_hz
+        self.max_skip = max_skip
+        self.minimized = False
+        self.focused = True
+        self.rendered = 0
+        self.skipped = 0
+        self.render_ms = 0.0  # moving average of what a drawn frame costs
+        self._skip_run = 0
+        self._next_render = time.perf_counter()
+        self._last_change = self._next_render
+        self._render_start = None
+
+    @property
+    def idle(self):
+        return time.perf_counter() - self._last_change > self.idle_after
+
+    @property
+    def rate(self):
+        """The current frame cap (0 for none)."""
+        rates = [self.fps]
+        if self.minimized:
+            rates.append(self.hidden_fps)
+        elif not self.focused:
+            rates.append(self.background_fps)
+        if self.idle:
+            rates.append(self.idle_fps)
+        capped = [r for r in rates if r]
+        return min(capped) if capped else 0
+
+    def changed(self):
+        """Note that something on screen changed (leaves idle, draws promptly)."""
+        now = time.perf_counter()
+        if now - self._last_change > self.idle_after:
+            self._next_render = now
+        self._last_change = now
+
+    def handle(self, event):
+        """
+        Track visibility and focus from pygame window events. Coming back
+        into view (or being exposed) gets a prompt redraw. Any other event
+        counts as activity for the idle timer and wakes an idle window that
+        is in view and focused, but can't lift the hidden and background
+        caps.
+        """
+        import pygame
+        if event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+            self.minimized = True
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED, pygame.WINDOWSHOWN):
+            self.minimized = False
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+        now = time.perf_counter()
+        if event.type in (pygame.WINDOWSHOWN, pygame.WINDOWRESTORED, pygame.WINDOWEXPOSED,
+                          pygame.WINDOWFOCUSGAINED):
+            self._next_render = now
+        elif not self.minimized and self.focused and now - self._last_change > self.idle_after:
+            self._next_render = now
+        self._last_change = now
+
+    def render(self, steps=1, changed=None):
+        """
+        Whether to draw this iteration. ``steps`` is the number of physics
+        steps just run; ``changed`` says whether anything moved (default:
+        whether any step ran).
+        """
+        if changed is None:
+            changed = steps > 0
+        if changed:
+            self.changed()
+        now = time.perf_counter()
+        rate = self.rate
+        if rate and now < self._next_render:
+            return False
+        # Steps one loop period should take: the loop runs at the frame cap,
+        # but wakes at least wake_hz times a second
+        period_rate = max(rate, self.wake_hz) if rate else 0
+        expected = math.ceil(self.physics_hz / period_rate) if period_rate else 1
+        costly = self.render_ms * self.physics_hz > 100.0
+        if steps > expected + 1 and costly and self._skip_run < self.max_skip:
+            self._skip_run += 1
+            self.skipped += 1
+            return False
+        self._skip_run = 0
+        self.rendered += 1
+        if rate:
+            self._next_render = max(self._next_render + 1.0 / rate, now)
+        self._render_start = now
+        return True
+
+    def wait(self):
+        """Sleep until the next frame is due (or the next wake-up to simulate)."""
+        now = time.perf_counter()
+        if self._render_start is not None:
+            ms = (now - self._render_start) * 1000.0
+            self.render_ms += (ms - self.render_ms) * 0.1
+            self._render_start = None
+        if not self.rate:
+            return
+        target = self._next_render
+        if self.wake_hz:
+            target = min(target, now + 1.0 / self.wake_hz)
+        if target > now:
+            time.sleep(target - now)
@@ -0,0 +1,230 @@
+"""
+Multi-process parameter sweep over the snake/pentagon constants.
+
+    python -m snakesim.paramsweep --rotation-speed 0:0.05:11 --snake-speed 1,3,6 \\
+        --radius 200 --sides 3:8:6 --length 30 --steps 5000 --out sweep_out
+
+Every range is either a single value, a comma list (``1,3,6``) or
+``start:stop:count`` (both ends included). The full grid is split into
+chunks; each chunk runs headless as one ``BatchEngine`` in a worker process,
+and writes its own CSV file. Chunks that already have a file are skipped, so
+an interrupted sweep picks up where it left off when run again with the same
+arguments. When every chunk is done they are merged into one table.
+"""
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .engine import BatchEngine
+
+PARAMETERS = ("rotation_speed", "snake_speed", "radius", "sides", "length")
+
+COLUMNS = PARAMETERS + (
+    "run", "seed", "steps", "bounces", "bounces_per_1k_steps", "min_gap",
+    "mean_center_distance", "final_x", "final_y", "final_heading", "body_extent",
+)
+
+
+def parse_range(text, kind=float):
+    """Parse ``"a"``, ``"a,b,c"`` or ``"start:stop:count"`` into a list."""
+    text = text.strip()
+    if ":" in text:
+        start, stop, count = text.split(":")
+        values = np.linspace(float(start), float(stop), int(count))
+        if kind is int:
+            return sorted(set(int(round(v)) for v in values))
+        return [float(v) for v in values]
+    return [kind(v) for v in text.split(",") if v.strip()]
+
+
+def build_grid(ranges, seeds):
+    """All parameter combinations, as a list of dicts with a stable run index."""
+    grid = []
+    combos = itertools.product(*(ranges[name] for name in PARAMETERS), range(seeds))
+    for run, values in enumerate(combos):
+        config = dict(zip(PARAMETERS, values[:-1]))
+        config["run"] = run
+        config["seed"] = values[-1]
+        grid.append(config)
+    return grid
+
+
+def build_chunks(grid, chunk_size):
+    """
+    Split the grid into chunks that one engine can run together.
+
+    An engine has a single side count and body length, so configurations
+    are grouped by those first and then cut into pieces of ``chunk_size``.
+    """
+    groups = {}
+    for config in grid:
+        groups.setdefault((config["sides"], config["length"]), []).append(config)
+    chunks = []
+    for key in sorted(groups):
+        configs = groups[key]
+        for i in range(0, len(configs), chunk_size):
+            chunks.append(configs[i:i + chunk_size])
+    return chunks
+
+
+def run_chunk(configs, steps, head_radius, collision, center=(400.0, 300.0)):
+    """Run one chunk headless and return one metrics row per configuration."""
+    sides = configs[0]["sides"]
+    length = configs[0]["length"]
+    seeds = np.array([c["seed"] * 1000003 + c["run"] for c in configs])
+    # Each run gets its own reproducible start heading
+    headings = np.array([np.random.default_rng(s).uniform(0.0, 2 * math.pi) for s in seeds])
+
+    engine = BatchEngine(
+        len(configs), center=center,
+        radius=[c["radius"] for c in configs], sides=sides,
+        rotation_speed=[c["rotation_speed"] for c in configs],
+        speed=[c["snake_speed"] for c in configs],
+        head_radius=head_radius, length=length, heading=headings,
+        collision=collision,
+    )
+
+    min_gap = np.full(len(configs), np.inf)
+    distance_sum = np.zeros(len(configs))
+    for _ in range(steps):
+        engine.step()
+        gap = engine.wall_distances().min(axis=1) - engine.head_radius
+        np.minimum(min_gap, gap, out=min_gap)
+        distance_sum += np.hypot(*(engine.pos - engine.center).T)
+
+    bodies = engine.bodies()
+    extent = np.hypot(*(bodies.max(axis=1) - bodies.min(axis=1)).T)
+    rows = []
+    for i, config in enumerate(configs):
+        row = dict(config)
+        row.update(
+            steps=steps,
+            bounces=int(engine.bounces[i]),
+            bounces_per_1k_steps=1000.0 * engine.bounces[i] / max(steps, 1),
+            min_gap=float(min_gap[i]),
+            mean_center_distance=float(distance_sum[i] / max(steps, 1)),
+            final_x=float(engine.pos[i, 0]),
+            final_y=float(engine.pos[i, 1]),
+            final_heading=float(math.atan2(engine.vel[i, 1], engine.vel[i, 0])),
+            body_extent=float(extent[i]),
+        )
+        rows.append(row)
+    return rows
+
+
+def _chunk_path(out_dir, index):
+    return os.path.join(out_dir, "chunks", "chunk-%05d.csv" % index)
+
+
+def _write_rows(path, rows):
+    # Write to a temporary name first so a killed worker never leaves a
+    # half-written chunk that would be mistaken for a finished one
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def _run_and_write(index, configs, steps, head_radius, collision, out_dir):
+    rows = run_chunk(configs, steps, head_radius, collision)
+    _write_rows(_chunk_path(out_dir, index), rows)
+    return index, len(rows)
+
+
+def merge_chunks(out_dir, count, fmt="csv"):
+    """Merge chunk files into ``results.csv`` (or ``results.parquet``)."""
+    rows = []
+    for index in range(count):
+        with open(_chunk_path(out_dir, index), newline="") as f:
+            rows.extend(csv.DictReader(f))
+    rows.sort(key=lambda row: int(row["run"]))
+
+    if fmt == "parquet":
+        try:
+            import pandas as pd
+        except ImportError:
+            raise SystemExit("parquet output needs pandas and pyarrow installed")
+        path = os.path.join(out_dir, "results.parquet")
+        pd.DataFrame(rows, columns=COLUMNS).apply(pd.to_numeric).to_parquet(path, index=False)
+        return path
+
+    path = os.path.join(out_dir, "results.csv")
+    _write_rows(path, rows)
+    return path
+
+
+def run_sweep(ranges, steps, out_dir, seeds=1, head_radius=10.0, collision="discrete",
+              chunk_size=256, workers=None, fmt="csv", log=print):
+    """Run (or resume) a sweep and return the path of the merged table."""
+    grid = build_grid(ranges, seeds)
+    chunks = build_chunks(grid, chunk_size)
+
+    os.makedirs(os.path.join(out_dir, "chunks"), exist_ok=True)
+    manifest = {
+        "ranges": ranges, "steps": steps, "seeds": seeds, "head_radius": head_radius,
+        "collision": collision, "chunk_size": chunk_size,
+    }
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f) != json.loads(json.dumps(manifest)):
+                raise SystemExit("%s holds a different sweep; use another --out" % out_dir)
+    else:
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    todo = [i for i in range(len(chunks)) if not os.path.exists(_chunk_path(out_dir, i))]
+    log("%d runs in %d chunks, %d left to do" % (len(grid), len(chunks), len(todo)))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [pool.submit(_run_and_write, i, chunks[i], steps, head_radius,
+                                   collision, out_dir) for i in todo]
+            for done, future in enumerate(as_completed(futures), 1):
+                index, n = future.result()
+                log("chunk %d done (%d runs) [%d/%d]" % (index, n, done, len(todo)))
+
+    return merge_chunks(out_dir, len(chunks), fmt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless parameter sweep for the bouncing snake.")
+    parser.add_argument("--rotation-speed", default="0.01", help="radians per step")
+    parser.add_argument("--snake-speed", default="3", help="pixels per step")
+    parser.add_argument("--radius", default="200", help="polygon radius in pixels")
+    parser.add_argument("--sides", default="5", help="polygon side count")
+    parser.add_argument("--length", default="30", help="snake length in segments")
+    parser.add_argument("--head-radius", type=float, default=10.0)
+    parser.add_argument("--seeds", type=int, default=1, help="start headings per configuration")
+    parser.add_argument("--steps", type=int, default=10000)
+    parser.add_argument("--collision", choices=("discrete", "swept"), default="discrete")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None, help="default: every core")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--out", default="sweep_out")
+    args = parser.parse_args(argv)
+
+    ranges = {
+        "rotation_speed": parse_range(args.rotation_speed),
+        "snake_speed": parse_range(args.snake_speed),
+        "radius": parse_range(args.radius),
+        "sides": parse_range(args.sides, int),
+        "length": parse_range(args.length, int),
+    }
+    path = run_sweep(ranges, args.steps, args.out, seeds=args.seeds,
+                     head_radius=args.head_radius, collision=args.collision,
+                     chunk_size=args.chunk_size, workers=args.workers, fmt=args.format)
+    print(path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
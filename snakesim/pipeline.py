@@ -0,0 +1,155 @@
+"""
+Physics on its own thread, drawing on the main one.
+
+In the single-threaded loops a frame costs physics plus drawing. With
+``PhysicsThread`` the physics steps run on a background thread at their
+fixed rate, and the main loop only draws; a frame costs whichever of the
+two is slower, as far as they can overlap. pygame releases the GIL while
+it blits and flips (as NumPy does on large arrays), which is where the
+overlap comes from; pure-Python physics and pure-Python drawing still
+take turns.
+
+The threads never share live state. After each batch of steps the physics
+thread copies what drawing needs into a ``TripleBuffer`` slot and
+publishes it; the render loop takes the newest published slot and draws
+it, interpolated as usual. With three slots neither side ever waits for
+the other: the writer always has a free slot, and the reader keeps its
+slot until it asks for a newer one. The only lock guards the swap of two
+slot indices, never a copy or a draw.
+
+pygame itself (events, drawing, the display) stays on the main thread.
+"""
+import threading
+import time
+
+from .timestep import FixedTimestep
+
+
+class TripleBuffer:
+    """
+    Three slots built by ``make()``: the writer fills ``back`` and calls
+    ``publish``; ``acquire`` gives the reader the newest published slot.
+    """
+
+    def __init__(self, make):
+        self._slots = [make(), make(), make()]
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0  # published slots replaced before the reader took them
+
+    @property
+    def back(self):
+        """The writer's slot; only the writer may touch it until ``publish``."""
+        return self._slots[self._back]
+
+    @property
+    def front(self):
+        """The reader's slot, as of the last ``acquire``."""
+        return self._slots[self._front]
+
+    def publish(self):
+        """Hand the back slot over to the reader; the writer gets a free one."""
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            if self._fresh:
+                self.dropped += 1
+            self._fresh = True
+            self.published += 1
+
+    def acquire(self):
+        """The newest published slot, or None if nothing new since the last call."""
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._ready = self._ready, self._front
+            self._fresh = False
+        return self._slots[self._front]
+
+
+class _Frame:
+    """One slot: the drawable copy and when its last step was due."""
+
+    def __init__(self, view):
+        self.view = view
+        self.steps = 0
+        self.time = 0.0
+
+
+class PhysicsThread:
+    """
+    Runs ``step()`` ``rate`` times a second on a background thread.
+
+    ``make()`` builds a drawable copy of the simulation (three are made);
+    ``copy(view)`` overwrites one with the current state. After ``poll()``,
+    ``view`` is the newest copy and ``alpha`` how far the clock has got
+    towards the next step, for the usual interpolated draw. ``idle()``, if
+    given, is called each time the thread wakes up (for a profiler lap).
+    An exception in ``step`` stops the thread and is raised by ``poll``.
+    """
+
+    def __init__(self, step, rate, make, copy, max_steps=15, idle=None):
+        self.rate = rate
+        self.max_steps = max_steps
+        self.buffer = TripleBuffer(lambda: _Frame(make()))
+        self.error = None
+        self._step = step
+        self._copy = copy
+        self._idle = idle
+        self._frame = None
+        self._polled = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="physics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop stepping and wait for the thread to finish its current batch."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        timestep = FixedTimestep(self.rate, self.max_steps)
+        try:
+            while not self._stop.is_set():
+                if self._idle is not None:
+                    self._idle()
+                steps = timestep.tick()
+                for _ in range(steps):
+                    self._step()
+                if steps:
+                    frame = self.buffer.back
+                    self._copy(frame.view)
+                    frame.steps = timestep.steps
+                    frame.time = time.perf_counter() - timestep.accumulator
+                    self.buffer.publish()
+                # Sleep until the next step is due
+                self._stop.wait(max(timestep.dt - timestep.accumulator, 0.0))
+        except BaseException as e:
+            self.error = e
+
+    def poll(self):
+        """Take the newest copy, if any; returns the number of steps since the last poll."""
+        if self.error is not None:
+            raise self.error
+        frame = self.buffer.acquire()
+        if frame is None:
+            return 0
+        self._frame = frame
+        steps, self._polled = frame.steps - self._polled, frame.steps
+        return steps
+
+    @property
+    def view(self):
+        """The copy to draw (None until the first step has been published)."""
+        return None if self._frame is None else self._frame.view
+
+    @property
+    def alpha(self):
+        if self._frame is None:
+            return 1.0
+        return min(max((time.perf_counter() - self._frame.time) * self.rate, 0.0), 1.0)
@@ -0,0 +1,148 @@
+"""
+Per-phase frame profiler.
+
+The main loops mark the end of each phase with ``lap(name)``; the time
+since the previous lap is charged to that phase. A phase that runs several
+times in one frame (the physics phases, once per step) adds up. ``frame()``
+closes the frame and stores every phase's total in a rolling window of the
+last ``window`` frames, so percentiles and histograms always describe
+recent behaviour, and a slow frame can be traced to the phase that made it
+slow.
+
+Laps may come from more than one thread (see ``pipeline.py``): each thread
+times its laps from its own previous one, and all of them add up into the
+frame the main loop closes, so overlapping phases can sum to more than the
+frame. When ``enabled`` is False, ``lap`` and ``frame`` return straight
+away, so the marks can stay in the loops. This module never imports pygame
+(the overlay is ``render.TimingOverlay``).
+"""
+import json
+import threading
+import time
+
+import numpy as np
+
+# Histogram bin edges in milliseconds, log-spaced from 10us to 1s
+HISTOGRAM_EDGES = np.concatenate([[0.0], np.logspace(-2, 3, 26)])
+
+
+class FrameProfiler:
+    """Rolling per-phase timings of the last ``window`` frames."""
+
+    def __init__(self, window=600, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self.frames = 0
+        self._samples = {}  # phase -> ring of milliseconds per frame
+        self._frame_ms = np.zeros(window)
+        self._current = {}
+        self._clock = threading.local()  # per-thread time of the last lap
+        self._lock = threading.Lock()
+        self._frame_start = None
+
+    def lap(self, phase):
+        """Charge the time since the last lap (or frame) to ``phase``."""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        last = getattr(self._clock, "last", None)
+        if last is None:
+            # Nothing to measure before a thread's first lap, but keep the phase order
+            last = now
+        with self._lock:
+            if self._frame_start is None:
+                self._frame_start = now
+            self._current[phase] = self._current.get(phase, 0) + now - last
+        self._clock.last = now
+
+    def frame(self):
+        """Close the current frame."""
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter_ns()
+        slot = self.frames % self.window
+        with self._lock:
+            for phase in self._current:
+                if phase not in self._samples:
+                    # Earlier frames of the window didn't run it: 0 ms
+                    self._samples[phase] = np.zeros(self.window)
+            for phase, ring in self._samples.items():
+                ring[slot] = self._current.get(phase, 0) / 1e6
+            self._frame_ms[slot] = (now - self._frame_start) / 1e6
+            self._current.clear()
+            self._frame_start = now
+            self.frames += 1
+        self._clock.last = now
+
+    @property
+    def phases(self):
+        """Phase names, in the order they were first seen."""
+        return list(self._samples)
+
+    def _recent(self, ring):
+        # Window contents in frame order, oldest first
+        count = min(self.frames, self.window)
+        if self.frames <= self.window:
+            return ring[:count]
+        slot = self.frames % self.window
+        return np.concatenate([ring[slot:], ring[:slot]])
+
+    def samples(self, phase=None):
+        """Recent per-frame milliseconds of ``phase`` (the whole frame when None)."""
+        return self._recent(self._frame_ms if phase is None else self._samples[phase])
+
+    @staticmethod
+    def _summary(ms):
+        if len(ms) == 0:
+            return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        return {"mean_ms": float(ms.mean()), "p50_ms": float(p50), "p95_ms": float(p95),
+                "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+    def fps(self):
+        """Mean frames per second over the window."""
+        ms = self.samples()
+        return 1000.0 / ms.mean() if len(ms) and ms.mean() > 0 else 0.0
+
+    def stats(self):
+        """``{phase: summary}`` over the window, plus ``"frame"`` for whole frames."""
+        stats = {phase: self._summary(self.samples(phase)) for phase in self._samples}
+        stats["frame"] = self._summary(self.samples())
+        return stats
+
+    def histogram(self, phase=None, edges=HISTOGRAM_EDGES):
+        """Counts of recent frames per millisecond bin of ``phase``."""
+        counts, _ = np.histogram(self.samples(phase), bins=np.append(edges, np.inf))
+        return counts
+
+    def slowest(self, count=10):
+        """The ``count`` slowest recent frames with their per-phase breakdown."""
+        frame_ms = self.samples()
+        first = self.frames - len(frame_ms)
+        out = []
+        for i in np.argsort(frame_ms)[::-1][:count]:
+            phases = {phase: float(self.samples(phase)[i]) for phase in self._samples}
+            out.append({"frame": int(first + i), "ms": float(frame_ms[i]), "phases": phases})
+        return out
+
+    def report(self):
+        """Everything above as a JSON-serialisable dict."""
+        edges = HISTOGRAM_EDGES.tolist()
+        histograms = {phase: self.histogram(phase).tolist() for phase in self._samples}
+        histograms["frame"] = self.histogram().tolist()
+        return {
+            "frames": self.frames,
+            "window": min(self.frames, self.window),
+            "fps": self.fps(),
+            "stats": self.stats(),
+            "histogram_edges_ms": edges,
+            "histograms": histograms,
+            "slowest_frames": self.slowest(),
+        }
+
+    def dump(self, path):
+        """Write ``report()`` to ``path`` as JSON (nothing when disabled)."""
+        if not self.enabled:
+            return
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
@@ -0,0 +1,228 @@
+"""
+Compact binary trajectory recordings with indexed, memory-mapped replay.
+
+File layout (little endian)::
+
+    magic       8 bytes  b"SNKREC1\\0"
+    header_len  uint32
+    header      JSON: config, snake count, body length, keyframe interval
+    padding     to a 16-byte boundary
+    records     float32[steps, n, 5]  (x, y, vx, vy, angle) per snake per step
+    keyframes   float32[k, n, length, 2]  full bodies every ``keyframe_every`` steps
+    index       int64[k, 2]  (step, byte offset of the keyframe)
+    footer      uint64 steps, uint64 keyframe count, uint64 index offset,
+                8 bytes b"SNKIDX1\\0"
+
+Record ``i`` is the state after ``i`` steps (record 0 is the start state).
+Records have a fixed size, so any step is one memmap slice away, and the
+keyframe index gives the full body at any step from the nearest keyframe
+plus at most ``keyframe_every`` head positions, without re-running physics.
+"""
+import json
+import math
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b"SNKREC1\0"
+FOOTER_MAGIC = b"SNKIDX1\0"
+FIELDS = ("x", "y", "vx", "vy", "angle")
+_FOOTER = struct.Struct("<QQQ8s")
+
+
+def _align(offset, to=16):
+    return (offset + to - 1) // to * to
+
+
+class RecordingWriter:
+    """
+    Streams a run to disk, one ``append`` per step.
+
+    ``config`` is any JSON-serialisable dict (it should at least hold the
+    polygon centre, radius and side count so a replay can draw the walls).
+    """
+
+    def __init__(self, path, config, n=1, length=1, keyframe_every=256):
+        self.path = path
+        self.n = n
+        self.length = length
+        self.keyframe_every = keyframe_every
+        self.steps = 0
+        self._index = []
+
+        header = json.dumps({
+            "config": config, "n": n, "length": length,
+            "keyframe_every": keyframe_every, "fields": FIELDS, "dtype": "float32",
+        }).encode()
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._file.write(struct.pack("<I", len(header)))
+        self._file.write(header)
+        self._file.write(b"\0" * (_align(self._file.tell()) - self._file.tell()))
+        # Keyframes go to a side file and are appended on close, so the
+        # records stay one contiguous, fixed-stride block
+        self._keyframes = tempfile.TemporaryFile()
+        self._record = np.empty((n, len(FIELDS)), dtype=np.float32)
+
+    def append(self, pos, vel, angle, body=None):
+        """
+        Add the state after the next step.
+
+        ``pos`` and ``vel`` are (n, 2) arrays (or one (x, y) pair when
+        ``n == 1``), ``angle`` is one value per snake. ``body`` (n, length, 2)
+        is only read on keyframe steps; pass it whenever it is cheap to get.
+        """
+        rec = self._record
+        rec[:, 0:2] = np.reshape(pos, (self.n, 2))
+        rec[:, 2:4] = np.reshape(vel, (self.n, 2))
+        rec[:, 4] = angle
+        self._file.write(rec.tobytes())
+
+        if self.steps % self.keyframe_every == 0:
+            if body is None:
+                body = np.repeat(rec[:, None, 0:2], self.length, axis=1)
+            frame = np.asarray(body, dtype=np.float32).reshape(self.n, self.length, 2)
+            self._index.append((self.steps, self._keyframes.tell()))
+            self._keyframes.write(frame.tobytes())
+        self.steps += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        keyframes_offset = _align(self._file.tell())
+        self._file.write(b"\0" * (keyframes_offset - self._file.tell()))
+        self._keyframes.seek(0)
+        shutil.copyfileobj(self._keyframes, self._file)
+        self._keyframes.close()
+
+        index = np.array(self._index, dtype=np.int64).reshape(-1, 2)
+        index[:, 1] += keyframes_offset
+        index_offset = _align(self._file.tell())
+        self._file.write(b"\0" * (index_offset - self._file.tell()))
+        self._file.write(index.tobytes())
+        self._file.write(_FOOTER.pack(self.steps, len(index), index_offset, FOOTER_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record_engine(engine, path, steps, keyframe_every=256, dt=1.0):
+    """Run a ``BatchEngine`` for ``steps`` steps, recording every one."""
+    config = {
+        "center": engine.center.tolist(), "radius": engine.radius.tolist(),
+        "sides": engine.sides, "rotation_speed": engine.rotation_speed.tolist(),
+        "head_radius": engine.head_radius.tolist(), "dt": dt,
+    }
+    with RecordingWriter(path, config, engine.n, engine.length, keyframe_every) as writer:
+        writer.append(engine.pos, engine.vel, engine.angle, engine.bodies())
+        for i in range(1, steps + 1):
+            engine.step(dt)
+            body = engine.bodies() if i % keyframe_every == 0 else None
+            writer.append(engine.pos, engine.vel, engine.angle, body)
+    return path
+
+
+class Recording:
+    """Read-only, memory-mapped view of a recording file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(8) != MAGIC:
+                raise ValueError("%s is not a snake recording" % path)
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len))
+            records_offset = _align(f.tell())
+            f.seek(-_FOOTER.size, os.SEEK_END)
+            steps, count, index_offset, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if magic != FOOTER_MAGIC:
+                raise ValueError("%s is truncated (no index); was the writer closed?" % path)
+
+        self.config = header["config"]
+        self.n = header["n"]
+        self.length = header["length"]
+        self.keyframe_every = header["keyframe_every"]
+        self.steps = steps
+        width = len(FIELDS)
+        self.records = np.memmap(path, np.float32, "r", records_offset, (steps, self.n, width))
+        self.index = np.memmap(path, np.int64, "r", index_offset, (count, 2)) if count else np.empty((0, 2), np.int64)
+        if count:
+            self._keyframes = np.memmap(path, np.float32, "r", int(self.index[0, 1]),
+                                        (count, self.n, self.length, 2))
+
+    def __len__(self):
+        return self.steps
+
+    def frame(self, step):
+        """(n, 5) record of ``step`` (x, y, vx, vy, angle), zero-copy."""
+        return self.records[step]
+
+    def positions(self, step):
+        return self.records[step, :, 0:2]
+
+    def angles(self, step):
+        return self.records[step, :, 4]
+
+    def body(self, step, snake=0):
+        """
+        Body of ``snake`` at ``step``, head first, shape (length, 2).
+
+        Uses the nearest keyframe at or before ``step`` (found directly from
+        the index, no search) plus the heads recorded since then.
+        """
+        if not 0 <= step < self.steps:
+            raise IndexError("step %d out of range" % step)
+        key = min(step // self.keyframe_every, len(self.index) - 1)
+        key_step = int(self.index[key, 0])
+        since = step - key_step
+        heads = self.records[step:key_step:-1, snake, 0:2]
+        if since >= self.length:
+            return np.array(heads[:self.length])
+        base = self._keyframes[key, snake, :self.length - since]
+        return np.concatenate([heads, base])
+
+
+class Player:
+    """
+    Plays a recording back at any speed, forwards or backwards.
+
+    ``position`` is a fractional step; ``state`` interpolates between the
+    two neighbouring records, so playback stays smooth at slow speeds and
+    seeking anywhere is O(1).
+    """
+
+    def __init__(self, recording, rate=60.0, speed=1.0):
+        self.recording = recording
+        self.rate = rate  # recorded steps per second at speed 1
+        self.speed = speed
+        self.position = 0.0
+        self.paused = False
+
+    def seek(self, step):
+        self.position = min(max(float(step), 0.0), self.recording.steps - 1.0)
+
+    def advance(self, seconds):
+        if not self.paused:
+            self.seek(self.position + seconds * self.rate * self.speed)
+
+    def state(self):
+        """Interpolated (positions (n, 2), angles (n,)) at the current position."""
+        rec = self.recording
+        i = int(math.floor(self.position))
+        j = min(i + 1, rec.steps - 1)
+        t = self.position - i
+        a = rec.frame(i)
+        b = rec.frame(j)
+        pos = a[:, 0:2] + (b[:, 0:2] - a[:, 0:2]) * t
+        angle = a[:, 4] + (b[:, 4] - a[:, 4]) * t
+        return pos, angle
+
+    def body(self, snake=0):
+        return self.recording.body(int(round(self.position)), snake)
@@ -0,0 +1,337 @@
+"""
+Batched pygame rendering helpers.
+
+Drawing a snake with one ``pygame.draw.circle`` call per segment costs a
+Python-level call (and a rasterised circle) for every segment on every
+frame. Here each distinct (radius, colour) circle is rendered once into a
+small sprite, and the whole body is submitted in a single ``Surface.blits``
+call, so the Python overhead per frame does not grow with the segment count.
+
+Unlike the rest of the package this module imports pygame, so only import
+it from code that actually draws.
+"""
+import itertools
+import math
+
+import numpy as np
+import pygame
+
+
+class SpriteCache:
+    """Circle sprites, rendered once per (radius, colour)."""
+
+    def __init__(self):
+        self._sprites = {}
+
+    def circle(self, radius, color):
+        key = (int(radius), tuple(color))
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            r = key[0]
+            sprite = pygame.Surface((2 * r, 2 * r), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (r, r), r)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
+            self._sprites[key] = sprite
+        return sprite
+
+    def __len__(self):
+        return len(self._sprites)
+
+
+class SnakeSprites:
+    """
+    Draws a body of circles with one ``blits`` call.
+
+    ``radii`` and ``colors`` give the look of each segment, head first. When
+    both are single values every segment looks the same and any number of
+    points can be drawn. The sprite list and blit
+    offsets are worked out once; ``draw`` then only has to turn the point
+    array into integer positions. Segments are drawn head first, as in the
+    per-segment loops, so each one covers the segment in front of it.
+    """
+
+    def __init__(self, radii, colors, cache=None):
+        self.cache = cache if cache is not None else SpriteCache()
+        self.set_style(radii, colors)
+
+    def set_style(self, radii, colors):
+        if np.ndim(radii) == 0 and np.ndim(colors) == 1:
+            self._uniform = self.cache.circle(radii, colors)
+            self._radius = int(radii)
+            self.count = None
+            return
+        self._uniform = None
+        n = max(np.size(radii), 1 if np.ndim(colors) == 1 else len(colors))
+        radii = np.broadcast_to(np.asarray(radii, dtype=np.intp), (n,))
+        if np.ndim(colors) == 1:
+            colors = [tuple(colors)] * n
+        self._sprites = [self.cache.circle(r, c) for r, c in zip(radii, colors)]
+        self._offsets = radii[:, None]
+        self.count = n
+
+    def draw(self, surface, points):
+        """Blit the body at ``points`` ((n, 2) array-like, head first)."""
+        points = np.asarray(points, dtype=np.float64)
+        if self._uniform is not None:
+            if len(points):
+                corners = points.astype(np.intp) - self._radius
+                surface.blits(list(zip(itertools.repeat(self._uniform), corners.tolist())),
+                              doreturn=False)
+            return
+        n = min(len(points), self.count)
+        if n == 0:
+            return
+        # Truncate like int() in the scripts, then shift to the sprite corner
+        corners = points[:n].astype(np.intp) - self._offsets[:n]
+        surface.blits(list(zip(self._sprites[:n], corners.tolist())), doreturn=False)
+
+
+def points_rect(points, pad):
+    """Bounding rect of a point array, grown by ``pad`` pixels on every side."""
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return pygame.Rect(0, 0, 0, 0)
+    lo = np.floor(points.min(axis=0)).astype(int) - pad
+    hi = np.ceil(points.max(axis=0)).astype(int) + pad + 1
+    return pygame.Rect(int(lo[0]), int(lo[1]), int(hi[0] - lo[0]), int(hi[1] - lo[1]))
+
+
+def outline_rects(vertices, width, max_rects=16):
+    """
+    Rects covering a closed polygon outline, one per run of edges.
+
+    A single bounding box of the outline would also cover the whole inside
+    of the polygon, so each edge (or, for many-sided polygons, each run of
+    consecutive edges, at most ``max_rects`` in total) gets its own rect.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    n = len(vertices)
+    ring = np.concatenate([vertices, vertices[:1]])
+    per_rect = -(-n // max_rects)
+    rects = []
+    for start in range(0, n, per_rect):
+        rects.append(points_rect(ring[start:start + per_rect + 1], width))
+    return rects
+
+
+def _outline_distance(x, y, radius, sides, angle):
+    """Distance from points (x, y), relative to the centre, to a regular polygon's outline."""
+    apothem = radius * math.cos(math.pi / sides)
+    half_edge = radius * math.sin(math.pi / sides)
+    # Outward unit normal of each point's sector edge
+    k = np.floor((np.arctan2(y, x) - angle) * (sides / (2 * math.pi))).astype(np.intp) % sides
+    phi = angle + (2 * np.arange(sides) + 1) * math.pi / sides
+    ux = np.cos(phi)[k]
+    uy = np.sin(phi)[k]
+    # Across the edge's line, and past its ends
+    across = x * ux + y * uy - apothem
+    along = y * ux - x * uy
+    return np.hypot(across, along - np.clip(along, -half_edge, half_edge))
+
+
+# OutlineCache.shared, keyed on the settings
+_outline_caches = {}
+
+
+class OutlineCache:
+    """
+    Anti-aliased outlines of a rotating regular polygon, rendered once.
+
+    A regular polygon looks the same after turning by ``2*pi / sides``, so
+    one such period holds every outline it can ever show. ``count``
+    outlines spaced evenly over the period are rendered, each the first
+    time it is needed, and ``draw`` blits the one nearest the asked angle.
+    The angle snaps by at most half a step, which moves the vertices by up
+    to ``radius * pi / (sides * count)`` px: more outlines rotate more
+    smoothly and take more memory (``nbytes``).
+
+    An outline is cut into ``tile``-pixel tiles and only the tiles it
+    touches are kept, so a draw blits about as many pixels as the outline
+    covers, in one ``blits`` call. Coverage comes from each pixel's
+    distance to the outline (the edge of its sector, as in ``geometry.py``),
+    worked out with NumPy for the pixels of those tiles only.
+
+    This is for anti-aliased outlines wider than a pixel, which pygame has
+    no call for; a plain aliased ``draw.polygon`` is still several times
+    cheaper to draw, so the scripts keep it by default. Use ``shared`` to
+    get one cache per distinct outline however many polygons draw it.
+    """
+
+    def __init__(self, center, radius, sides, color, width, count=120, tile=16):
+        self.center = (int(round(center[0])), int(round(center[1])))
+        self.radius = float(radius)
+        self.sides = sides
+        self.color = tuple(color)[:3]
+        self.width = width
+        self.count = count
+        self.tile = tile
+        self.period = 2 * math.pi / sides
+        self.nbytes = 0
+        self._outlines = [None] * count
+        # Coverage falls from 1 to 0 over the pixel past half the line width
+        self._reach = width / 2 + 0.5
+        self._tiles = -(-2 * (int(math.ceil(self.radius + self._reach)) + 1) // tile)
+        self._half = self._tiles * tile // 2
+        # Tile corners and the pixel centres within a tile, from the polygon centre
+        corners = np.arange(self._tiles) * tile - self._half
+        self._corner_x, self._corner_y = [a.ravel() for a in np.meshgrid(corners, corners, indexing="ij")]
+        offsets = np.arange(tile) + 0.5
+        self._offset_x, self._offset_y = np.meshgrid(offsets, offsets, indexing="ij")  # [x, y], like surfarray
+
+    @classmethod
+    def shared(cls, center, radius, sides, color, width, count=120, tile=16):
+        """The one cache for these settings, made on first use."""
+        key = (tuple(center), float(radius), sides, tuple(color)[:3], width, count, tile)
+        cache = _outline_caches.get(key)
+        if cache is None:
+            cache = _outline_caches[key] = cls(center, radius, sides, color, width, count, tile)
+        return cache
+
+    def index(self, angle):
+        """Which pre-rendered outline is nearest the polygon at ``angle``."""
+        return int(round((angle % self.period) / self.period * self.count)) % self.count
+
+    def _render(self, i):
+        angle = i * self.period / self.count
+        tile = self.tile
+        # Tiles whose centre is near enough the outline for any pixel to be
+        middle = tile / 2
+        near = _outline_distance(self._corner_x + middle, self._corner_y + middle,
+                                 self.radius, self.sides, angle) <= middle * math.sqrt(2) + self._reach
+        used = np.flatnonzero(near)
+        x = self._corner_x[used, None, None] + self._offset_x
+        y = self._corner_y[used, None, None] + self._offset_y
+        coverage = np.clip(self._reach - _outline_distance(x, y, self.radius, self.sides, angle), 0.0, 1.0)
+        alpha = np.rint(coverage * 255).astype(np.uint8)
+        keep = alpha.reshape(len(used), -1).any(axis=1)
+        used, alpha = used[keep], alpha[keep]
+
+        size = self._tiles * tile
+        whole = pygame.Surface((size, size), pygame.SRCALPHA)
+        whole.fill(self.color + (0,))
+        pixels = pygame.surfarray.pixels_alpha(whole)
+        tx, ty = np.divmod(used, self._tiles)
+        pixels.reshape(self._tiles, tile, self._tiles, tile)[tx, :, ty, :] = alpha
+        del pixels  # unlocks the surface
+        if pygame.display.get_surface() is not None:
+            whole = whole.convert_alpha()
+        # Keep copies of the used tiles only; the whole sprite goes
+        left = self.center[0] - self._half
+        top = self.center[1] - self._half
+        blits = []
+        for x0, y0 in zip((tx * tile).tolist(), (ty * tile).tolist()):
+            blits.append((whole.subsurface((x0, y0, tile, tile)).copy(), (left + x0, top + y0)))
+        self.nbytes += len(blits) * tile * tile * 4
+
+        theta = angle + np.arange(self.sides) * self.period
+        vertices = np.stack([np.cos(theta), np.sin(theta)], axis=1) * self.radius + self.center
+        rects = outline_rects(vertices, int(math.ceil(self._reach)) + 1)
+        return blits, rects
+
+    def prerender(self):
+        """Render every outline now rather than on first use."""
+        for i in range(self.count):
+            self._outline(i)
+
+    def _outline(self, i):
+        outline = self._outlines[i]
+        if outline is None:
+            outline = self._outlines[i] = self._render(i)
+        return outline
+
+    def draw(self, surface, angle):
+        """Blit the outline nearest ``angle`` (radians); returns the rects drawn to."""
+        blits, rects = self._outline(self.index(angle))
+        surface.blits(blits, doreturn=False)
+        return list(rects)
+
+
+class DirtyRects:
+    """
+    Erase and present only the parts of the screen that changed.
+
+    Each frame, ``erase`` clears what was drawn on the previous frame, the
+    caller draws, and ``present`` pushes the previous and the new areas to
+    the display with ``pygame.display.update(rects)`` instead of a full
+    ``flip()``. The first frame (and every frame when ``enabled`` is False)
+    falls back to a full fill and flip.
+    """
+
+    def __init__(self, background, enabled=True):
+        self.background = background
+        self.enabled = enabled
+        self._previous = None
+
+    def erase(self, surface):
+        if not self.enabled or self._previous is None:
+            surface.fill(self.background)
+        else:
+            for rect in self._previous:
+                surface.fill(self.background, rect)
+
+    def present(self, rects):
+        if not self.enabled:
+            pygame.display.flip()
+            return
+        screen = pygame.display.get_surface().get_rect()
+        rects = [screen.clip(rect) for rect in rects]
+        if self._previous is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._previous + rects)
+        self._previous = rects
+
+    def invalidate(self):
+        """Force a full redraw on the next frame (e.g. after a resize)."""
+        self._previous = None
+
+
+class TimingOverlay:
+    """
+    FPS and per-phase milliseconds of a ``FrameProfiler``, drawn in a corner.
+
+    The text is only re-rendered every ``refresh`` seconds, so the overlay
+    itself barely shows up in the timings. F3 toggles it (pass every event
+    to ``handle``). It starts visible when the profiler is enabled.
+    """
+
+    def __init__(self, profiler, position=(8, 8), refresh=0.25, color=(255, 255, 0)):
+        self.profiler = profiler
+        self.position = position
+        self.refresh = refresh
+        self.color = color
+        self.visible = profiler.enabled
+        self._font = None
+        self._text = None
+        self._rendered_at = None
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.visible = not self.visible
+
+    def _render(self):
+        if self._font is None:
+            # Monospace so the columns line up; falls back to the default font
+            self._font = pygame.font.SysFont("dejavusansmono,consolas,menlo,monospace", 13)
+        stats = self.profiler.stats()
+        lines = ["%5.1f fps  %6.2f ms p99" % (self.profiler.fps(), stats["frame"]["p99_ms"])]
+        for phase in self.profiler.phases:
+            s = stats[phase]
+            lines.append("%-10s %6.2f ms  p99 %6.2f" % (phase, s["mean_ms"], s["p99_ms"]))
+        rows = [self._font.render(line, True, self.color) for line in lines]
+        height = self._font.get_linesize()
+        text = pygame.Surface((max(r.get_width() for r in rows), height * len(rows)))
+        for i, row in enumerate(rows):
+            text.blit(row, (0, i * height))
+        self._text = text
+
+    def draw(self, surface):
+        """Blit the overlay; returns the rects drawn to (none when hidden)."""
+        if not self.visible or not self.profiler.enabled or self.profiler.frames == 0:
+            return []
+        now = pygame.time.get_ticks() / 1000.0
+        if self._text is None or now - self._rendered_at >= self.refresh:
+            self._render()
+            self._rendered_at = now
+        return [surface.blit(self._text, self.position)]
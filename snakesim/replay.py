@@ -0,0 +1,109 @@
+"""
+Replay a recording in a window, without re-running any physics.
+
+    python -m snakesim.replay run.snkrec [--size 1200x900] [--snake 0]
+
+Keys: space pause, left/right scrub one second, up/down double/halve the
+playback speed, R reverse, Home/End jump to start/end. The window can be
+any size (and resized); the recording is scaled to fit.
+"""
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from .governor import FrameGovernor
+from .recording import Player, Recording
+
+
+def _polygon(center, radius, sides, angle):
+    theta = angle + 2 * math.pi * np.arange(sides) / sides
+    return np.stack([np.cos(theta), np.sin(theta)], axis=1) * radius + center
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a snake recording.")
+    parser.add_argument("path")
+    parser.add_argument("--size", default="800x600", help="window size WxH")
+    parser.add_argument("--snake", type=int, default=0, help="which snake to show")
+    parser.add_argument("--rate", type=float, default=60.0, help="recorded steps per second")
+    args = parser.parse_args(argv)
+
+    import pygame
+
+    recording = Recording(args.path)
+    player = Player(recording, rate=args.rate)
+    config = recording.config
+    snake = args.snake
+    center = np.array(config["center"], dtype=float)
+    radius = np.broadcast_to(config["radius"], (recording.n,))[snake]
+    head_radius = np.broadcast_to(config.get("head_radius", 5), (recording.n,))[snake]
+    sides = config["sides"]
+
+    pygame.init()
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
+    pygame.display.set_caption("Replay: %s" % args.path)
+    # Drops to its idle rate while paused (or stopped at either end)
+    governor = FrameGovernor(60)
+    shown = None
+    last = time.perf_counter()
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            governor.handle(event)
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    player.paused = not player.paused
+                elif event.key == pygame.K_RIGHT:
+                    player.seek(player.position + player.rate)
+                elif event.key == pygame.K_LEFT:
+                    player.seek(player.position - player.rate)
+                elif event.key == pygame.K_UP:
+                    player.speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    player.speed /= 2
+                elif event.key == pygame.K_r:
+                    player.speed = -player.speed
+                elif event.key == pygame.K_HOME:
+                    player.seek(0)
+                elif event.key == pygame.K_END:
+                    player.seek(recording.steps - 1)
+
+        now = time.perf_counter()
+        player.advance(now - last)
+        last = now
+        showing = (player.position, player.speed, screen.get_size())
+        if not governor.render(0, changed=showing != shown):
+            governor.wait()
+            continue
+        shown = showing
+
+        # Fit the polygon's circumcircle into the window
+        screen_w, screen_h = screen.get_size()
+        scale = 0.45 * min(screen_w, screen_h) / radius
+        offset = np.array([screen_w / 2, screen_h / 2]) - center * scale
+
+        _, angles = player.state()
+        screen.fill((0, 0, 0))
+        outline = _polygon(center, radius, sides, angles[snake]) * scale + offset
+        pygame.draw.polygon(screen, (255, 255, 255), outline.tolist(), 2)
+        body = player.body(snake) * scale + offset
+        if len(body) > 1:
+            pygame.draw.lines(screen, (0, 255, 0), False, body.tolist(), max(1, int(scale * 2)))
+        pygame.draw.circle(screen, (255, 0, 0), body[0].tolist(), max(1, int(head_radius * scale)))
+        pygame.display.set_caption("Replay: step %d / %d  speed x%g"
+                                   % (player.position, recording.steps - 1, player.speed))
+        pygame.display.flip()
+        governor.wait()
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
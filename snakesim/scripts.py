@@ -0,0 +1,44 @@
+"""
+Load the top-level ``Snake*.py`` scripts as modules.
+
+The script file names contain spaces and brackets, so they can't be
+imported with a plain ``import``. ``load_script("Deepseek")`` imports one by
+path under a clean module name. Importing a script only sets up its
+physics; pygame is imported when its ``init_display()`` is called. With
+``headless`` SDL's dummy video driver is selected (unless a driver was
+already chosen), so even then no window opens.
+"""
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPTS = {
+    "ChatGPT": "Snake (ChatGPT).py",
+    "Claude": "Snake(Claude).py",
+    "Deepseek": "Snake(Deepseek).py",
+    "Gemini": "Snake(Gemini).py",
+    "Julius": "Snake (Julius).py",
+}
+
+
+def script_path(name):
+    try:
+        return os.path.join(ROOT, SCRIPTS[name])
+    except KeyError:
+        raise ValueError("unknown script %r (expected one of %s)" % (name, ", ".join(SCRIPTS)))
+
+
+def load_script(name, headless=True):
+    """Import the script for ``name`` and return the module (a fresh copy each call)."""
+    if headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    module_name = "snake_" + name.lower()
+    spec = importlib.util.spec_from_file_location(module_name, script_path(name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,162 @@
+"""
+Uniform-grid spatial hash for head-vs-body collisions between many snakes.
+
+Checking every head against every segment of every snake is quadratic.
+Here every body point lives in a grid cell at least one collision distance
+wide, so a head only has to look at the 3x3 cells around it.
+
+The grid is updated incrementally: a snake body is the history of its head
+positions, so per step each snake adds exactly one point (its new head) and
+loses at most one (its old tail). Nothing is rebuilt.
+"""
+import math
+from collections import deque
+
+
+def _default_body(snake):
+    # Claude's Snake keeps its body in ``segments``, Deepseek's in ``tail``
+    body = getattr(snake, "segments", None)
+    if body is None:
+        body = snake.tail
+    return body
+
+
+class SpatialHash:
+    """
+    Grid of body points, keyed by integer cell.
+
+    Points are identified by ``(owner, seq)``, where ``seq`` counts the
+    points added for that owner; a point's index from the head of its body
+    is ``head_seq - seq``.
+    """
+
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self.cells = {}
+
+    def cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, key, owner, seq):
+        bucket = self.cells.get(key)
+        if bucket is None:
+            bucket = self.cells[key] = set()
+        bucket.add((owner, seq))
+
+    def remove(self, key, owner, seq):
+        bucket = self.cells[key]
+        bucket.discard((owner, seq))
+        if not bucket:
+            del self.cells[key]
+
+    def neighbours(self, x, y):
+        """Every (owner, seq) in the 3x3 cells around (x, y)."""
+        cx, cy = self.cell(x, y)
+        cells = self.cells
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                bucket = cells.get((cx + dx, cy + dy))
+                if bucket:
+                    yield from bucket
+
+
+class SnakeWorld:
+    """
+    Many snakes sharing one arena, with head-vs-body collision detection.
+
+    ``snakes`` are the script ``Snake`` objects (anything whose body is a
+    head-first ``SnakeBody`` that gains one head per update). ``radius`` is
+    the segment radius; a head collides with a segment closer than twice
+    that. ``neck`` is how many segments behind its own head a snake ignores,
+    so it doesn't collide with itself just by moving.
+
+    Call ``track()`` after every update of the snakes; it syncs the grid and
+    returns the collisions as ``(snake_index, other_index, segment_index)``,
+    sorted, so their order never depends on the grid's history. After a few
+    points are moved in place, call ``moved()``; after the snakes are
+    changed any other way (e.g. restored), call ``rebuild()``.
+    """
+
+    def __init__(self, snakes, radius, neck=None, body=_default_body):
+        self.snakes = list(snakes)
+        self.radius = float(radius)
+        self.reach = 2 * self.radius
+        self.body = body
+        self.neck = neck
+        self.rebuild()
+
+    def rebuild(self):
+        """Refill the grid from the snakes' current bodies."""
+        self.grid = SpatialHash(self.reach)
+        # Per snake: cells of the points in the grid, oldest first, and the
+        # seq number of the newest one
+        self._cells = [deque() for _ in self.snakes]
+        self._head_seq = [-1] * len(self.snakes)
+        for i, snake in enumerate(self.snakes):
+            # Oldest point first, so seq numbers increase towards the head
+            for x, y in self.body(snake).view()[::-1].tolist():
+                self._add(i, x, y)
+
+    def _add(self, i, x, y):
+        seq = self._head_seq[i] + 1
+        key = self.grid.cell(x, y)
+        self.grid.insert(key, i, seq)
+        self._cells[i].append(key)
+        self._head_seq[i] = seq
+
+    def _sync(self, i):
+        body = self.body(self.snakes[i])
+        x, y = body.head
+        self._add(i, x, y)
+        cells = self._cells[i]
+        while len(cells) > len(body):
+            oldest = self._head_seq[i] - len(cells) + 1
+            self.grid.remove(cells.popleft(), i, oldest)
+
+    def moved(self, i, indices):
+        """Re-file points of snake ``i`` (indices from the head) that were moved in place."""
+        body = self.body(self.snakes[i])
+        cells = self._cells[i]
+        for index in indices:
+            index = int(index)
+            slot = len(cells) - 1 - index
+            key = self.grid.cell(*body[index])
+            if key != cells[slot]:
+                seq = self._head_seq[i] - index
+                self.grid.remove(cells[slot], i, seq)
+                self.grid.insert(key, i, seq)
+                cells[slot] = key
+
+    def track(self):
+        """Sync the grid with the snakes' new heads and return collisions."""
+        for i in range(len(self.snakes)):
+            self._sync(i)
+        return self.collisions()
+
+    def collisions(self):
+        reach_sq = self.reach * self.reach
+        hits = []
+        for i, snake in enumerate(self.snakes):
+            x, y = self.body(snake).head
+            neck = self._neck(i)
+            for owner, seq in self.grid.neighbours(x, y):
+                index = self._head_seq[owner] - seq
+                if owner == i and index <= neck:
+                    continue
+                px, py = self.body(self.snakes[owner])[index]
+                if (px - x) ** 2 + (py - y) ** 2 < reach_sq:
+                    hits.append((i, owner, index))
+        hits.sort()
+        return hits
+
+    def _neck(self, i):
+        if self.neck is not None:
+            return self.neck
+        # Enough segments to cover the collision distance at the snake's speed
+        snake = self.snakes[i]
+        speed = getattr(snake, "speed", None)
+        if speed is None:
+            speed = math.hypot(*snake.velocity)
+        return int(math.ceil(self.reach / max(speed, 1e-9))) + 1
@@ -0,0 +1,306 @@
+"""
+One simulation, any number of viewers: a local spectator server.
+
+    python -m snakesim.spectate serve [--port 8765] [--snakes 8]
+    python -m snakesim.spectate watch [--host 127.0.0.1] [--port 8765]
+
+``serve`` runs the Deepseek script's simulation (loaded headless, see
+``scripts.py``) on an asyncio loop at its physics rate and broadcasts its
+state over TCP at ``--fps``. ``watch`` opens a window and draws whatever
+state arrives; it runs no physics of its own, so every viewer shows the
+same run.
+
+Each frame is encoded once and offered to every client. A client holds
+at most one frame waiting to be sent: a newer frame replaces it, so a slow
+viewer skips states instead of building up a backlog (and latency), and
+never holds up the simulation or the other viewers. The socket's write
+buffers are kept small so the skipping starts soon after a viewer falls
+behind.
+
+Protocol: every message is a little-endian uint32 byte count and a
+payload. The first payload is a JSON hello (window size, colours, sizes).
+Every later one is a frame::
+
+    step        uint64
+    sides, n    uint16, uint16
+    vertices    float32[sides, 2]
+    lengths     uint16[n]
+    points      float32[sum(lengths), 2]  every body, head first
+
+Plain TCP keeps this dependency-free. The server only runs the script's
+physics, so it never imports pygame; the viewer imports it in ``watch``.
+"""
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import sys
+import threading
+
+import numpy as np
+
+from .scripts import load_script
+from .timestep import FixedTimestep
+
+_SIZE = struct.Struct("<I")
+_FRAME = struct.Struct("<QHH")
+
+
+def encode_frame(step, vertices, bodies):
+    """Frame payload for polygon ``vertices`` and head-first ``bodies``."""
+    vertices = np.asarray(vertices, dtype=np.float32)
+    lengths = np.array([len(body) for body in bodies], dtype="<u2")
+    points = np.concatenate([np.asarray(body, dtype=np.float32) for body in bodies])
+    return b"".join([_FRAME.pack(step, len(vertices), len(bodies)), vertices.astype("<f4").tobytes(),
+                     lengths.tobytes(), points.astype("<f4").tobytes()])
+
+
+def decode_frame(payload):
+    """``(step, vertices, bodies)`` from a frame payload."""
+    step, sides, n = _FRAME.unpack_from(payload)
+    offset = _FRAME.size
+    vertices = np.frombuffer(payload, "<f4", sides * 2, offset).reshape(sides, 2)
+    offset += vertices.nbytes
+    lengths = np.frombuffer(payload, "<u2", n, offset)
+    offset += lengths.nbytes
+    points = np.frombuffer(payload, "<f4", int(lengths.sum()) * 2, offset).reshape(-1, 2)
+    bodies = np.split(points, np.cumsum(lengths)[:-1])
+    return step, vertices, bodies
+
+
+def _message(payload):
+    return _SIZE.pack(len(payload)) + payload
+
+
+class DeepseekSimulation:
+    """The Deepseek script's simulation, stepped on request."""
+
+    def __init__(self, snakes=None):
+        m = self.module = load_script("Deepseek")
+        if snakes is not None:
+            m.NUM_SNAKES = snakes
+        self.pentagon = m.Pentagon()
+        self.snakes = m.create_snakes(m.NUM_SNAKES)
+        self.world = m.SnakeWorld(self.snakes, m.SNAKE_SIZE) if len(self.snakes) > 1 else None
+        self.rate = m.PHYSICS_HZ
+        self.steps = 0
+
+    def step(self):
+        self.module.step(self.pentagon, self.snakes, self.world)
+        self.steps += 1
+
+    def hello(self):
+        m = self.module
+        return {"size": [m.WIDTH, m.HEIGHT], "rate": self.rate, "snake_size": m.SNAKE_SIZE,
+                "background": m.BLACK, "wall": m.WHITE, "head": m.RED, "body": m.GREEN}
+
+    def frame(self):
+        return encode_frame(self.steps, self.pentagon.vertices,
+                            [snake.tail.view() for snake in self.snakes])
+
+
+class _Viewer:
+    """One connected client: a slot for its next frame and a sender task."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.peer = writer.get_extra_info("peername")
+        self.sent = 0
+        self.dropped = 0
+        self._frame = None
+        self._ready = asyncio.Event()
+
+    def offer(self, message):
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = message
+        self._ready.set()
+
+    async def send(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            message, self._frame = self._frame, None
+            self.writer.write(message)
+            # Frames offered while this waits replace each other in the slot
+            await self.writer.drain()
+            self.sent += 1
+
+
+class SpectatorServer:
+    """
+    Runs ``simulation`` in real time and streams it to every viewer.
+
+    ``simulation`` needs ``rate``, ``step()``, ``hello()`` (JSON-able) and
+    ``frame()`` (payload bytes). Frames go out ``fps`` times a second
+    (default: the physics rate). ``buffer`` is the socket write buffer
+    size past which a viewer counts as behind.
+    """
+
+    def __init__(self, simulation, fps=None, buffer=64 * 1024, log=None):
+        self.simulation = simulation
+        self.fps = fps or simulation.rate
+        self.buffer = buffer
+        self.log = log or (lambda message: None)
+        self.viewers = set()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self._connect, host, port)
+        self.log("serving on %s" % ", ".join(str(s.getsockname()) for s in server.sockets))
+        async with server:
+            await self.run()
+
+    async def run(self):
+        """Step and broadcast until cancelled."""
+        loop = asyncio.get_running_loop()
+        timestep = FixedTimestep(self.simulation.rate)
+        interval = 1.0 / self.fps
+        deadline = loop.time()
+        while True:
+            for _ in range(timestep.tick()):
+                self.simulation.step()
+            if self.viewers:
+                message = _message(self.simulation.frame())
+                for viewer in self.viewers:
+                    viewer.offer(message)
+            deadline = max(deadline + interval, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+
+    async def _connect(self, reader, writer):
+        # Small buffers in both asyncio and the kernel, so a viewer that
+        # stops reading is noticed within a few frames
+        writer.transport.set_write_buffer_limits(high=self.buffer)
+        writer.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.buffer)
+        viewer = _Viewer(writer)
+        writer.write(_message(json.dumps(self.simulation.hello()).encode()))
+        self.viewers.add(viewer)
+        self.log("%s connected (%d watching)" % (viewer.peer, len(self.viewers)))
+        try:
+            await viewer.send()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            writer.close()
+            self.log("%s left after %d frames, %d skipped (%d watching)"
+                     % (viewer.peer, viewer.sent, viewer.dropped, len(self.viewers)))
+
+
+class FrameReceiver:
+    """
+    Reads frames from a server on a background thread.
+
+    ``latest()`` returns the newest decoded frame (or None if nothing new
+    arrived since the last call), so a viewer that draws slower than
+    frames arrive just skips the ones in between.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self._sock = socket.create_connection((host, port))
+        self.hello = json.loads(self._read())
+        self.received = 0
+        self.closed = False
+        self._frame = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="spectate", daemon=True)
+        self._thread.start()
+
+    def _read_exact(self, count):
+        data = bytearray()
+        while len(data) < count:
+            chunk = self._sock.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _read(self):
+        (size,) = _SIZE.unpack(self._read_exact(_SIZE.size))
+        return self._read_exact(size)
+
+    def _run(self):
+        try:
+            while True:
+                payload = self._read()
+                with self._lock:
+                    self._frame = payload
+                    self.received += 1
+        except OSError:
+            self.closed = True
+
+    def latest(self):
+        with self._lock:
+            payload, self._frame = self._frame, None
+        return None if payload is None else decode_frame(payload)
+
+    def close(self):
+        self._sock.close()
+
+
+def watch(host="127.0.0.1", port=8765):
+    """Open a window showing the server's simulation until it is closed."""
+    import pygame
+    from . import render
+
+    receiver = FrameReceiver(host, port)
+    hello = receiver.hello
+    pygame.init()
+    screen = pygame.display.set_mode(hello["size"])
+    clock = pygame.time.Clock()
+    size = hello["snake_size"]
+    heads = render.SnakeSprites(size, hello["head"])
+    tails = {}  # body length -> sprites of its tapering tail
+    frame = None
+    running = True
+    while running and not receiver.closed:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        frame = receiver.latest() or frame
+        if frame is not None:
+            step, vertices, bodies = frame
+            screen.fill(hello["background"])
+            pygame.draw.polygon(screen, hello["wall"], vertices.tolist(), 2)
+            for body in bodies:
+                n = len(body)
+                if n > 1:
+                    if n not in tails:
+                        radii = [int(size * (1 - i / (n * 2))) for i in range(1, n)]
+                        tails[n] = render.SnakeSprites(radii, hello["body"])
+                    tails[n].draw(screen, body[1:])
+                heads.draw(screen, body[:1])
+            pygame.display.set_caption("Spectating %s:%d  step %d  %d frames received"
+                                       % (host, port, step, receiver.received))
+            pygame.display.flip()
+        clock.tick(hello["rate"])
+    receiver.close()
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve one simulation to many viewers, or view it.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the simulation and stream it")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--fps", type=float, help="frames sent per second (default: physics rate)")
+    serve.add_argument("--snakes", type=int, help="number of snakes (default: the script's)")
+    view = commands.add_parser("watch", help="draw a served simulation")
+    view.add_argument("--host", default="127.0.0.1")
+    view.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.command == "watch":
+        watch(args.host, args.port)
+        return
+    log = lambda message: print(message, file=sys.stderr)
+    server = SpectatorServer(DeepseekSimulation(args.snakes), args.fps, log=log)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Fixed-timestep accumulator for decoupling physics from the render loop.
+
+Physics always advances in steps of exactly ``1 / rate`` seconds, however
+fast or slow frames are drawn. After running the due steps, ``alpha`` says
+how far the wall clock has got towards the next step, so the renderer can
+interpolate between the previous and the current physics state.
+"""
+import time
+
+
+class FixedTimestep:
+    """
+    Accumulates wall-clock time and hands it out as whole physics steps.
+
+    ``max_steps`` bounds how many steps a single frame may run. If rendering
+    stalls for longer than that, the extra time is dropped rather than
+    letting physics fall further and further behind.
+    """
+
+    def __init__(self, rate=60.0, max_steps=15):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.dt = 1.0 / rate
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.steps = 0
+        self._last = None
+
+    def advance(self, frame_time):
+        """Add ``frame_time`` seconds and return the number of steps now due."""
+        self.accumulator += frame_time
+        due = int(self.accumulator / self.dt)
+        if due > self.max_steps:
+            due = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= due * self.dt
+        self.steps += due
+        return due
+
+    def tick(self):
+        """Like ``advance`` but measures the frame time itself."""
+        now = time.perf_counter()
+        frame_time = 0.0 if self._last is None else now - self._last
+        self._last = now
+        return self.advance(frame_time)
+
+    @property
+    def alpha(self):
+        """Fraction of a step between the last physics state and the next."""
+        return min(self.accumulator / self.dt, 1.0)
+
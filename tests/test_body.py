@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from snakesim.body import SnakeBody
+
+
+def reference_push(points, x, y, capacity):
+    # What the scripts did before the ring buffer
+    points.insert(0, (x, y))
+    if len(points) > capacity:
+        points.pop()
+
+
+def test_push_keeps_head_first_order_across_wrap():
+    body = SnakeBody(5)
+    expected = []
+    for i in range(23):
+        body.push(i, -i)
+        reference_push(expected, i, -i, 5)
+        assert body.view().tolist() == [list(p) for p in expected]
+        assert body.head == expected[0]
+        assert body.tail == expected[-1]
+        assert len(body) == len(expected)
+
+
+def test_previous_is_the_body_before_the_last_push():
+    body = SnakeBody(4)
+    before = None
+    for i in range(11):
+        before = body.view().copy()
+        body.push(i, 2 * i)
+        if len(before) == len(body):
+            assert np.array_equal(body.previous(), before)
+        else:
+            # Still growing: the new tail stands where it was
+            assert np.array_equal(body.previous()[:-1], before)
+            assert np.array_equal(body.previous()[-1], body.view()[-1])
+
+
+def test_interpolated_blends_previous_and_current():
+    body = SnakeBody.filled(6, 10.0, 20.0)
+    for i in range(9):
+        body.push(10.0 + 3 * i, 20.0 - i)
+    cur = body.view().copy()
+    prev = body.previous().copy()
+    assert np.allclose(body.interpolated(0.0), prev)
+    assert np.allclose(body.interpolated(0.25), prev + 0.25 * (cur - prev))
+    assert np.array_equal(body.interpolated(1.0), cur)
+
+
+def test_snapshot_round_trip_keeps_previous():
+    body = SnakeBody.filled(7, 0.0, 0.0)
+    for i in range(12):
+        body.push(i, i * i)
+    state = body.snapshot()
+    copy = SnakeBody.from_snapshot(state)
+    assert np.array_equal(copy.view(), body.view())
+    assert np.array_equal(copy.previous(), body.previous())
+    # And both carry on identically
+    body.push(-1.0, -2.0)
+    copy.push(-1.0, -2.0)
+    assert np.array_equal(copy.view(), body.view())
+    assert np.array_equal(copy.previous(), body.previous())
+
+
+def test_snapshot_before_any_push_has_no_spare():
+    body = SnakeBody(3, [(1, 2), (3, 4)])
+    state = body.snapshot()
+    assert state["spare"] is None
+    copy = SnakeBody.from_snapshot(state)
+    assert np.array_equal(copy.previous(), copy.view())
+
+
+def test_restore_rejects_other_capacity():
+    with pytest.raises(ValueError):
+        SnakeBody(4).restore(SnakeBody(5).snapshot())
+
+
+def test_copy_from_and_sync_view():
+    body = SnakeBody.filled(5, 0.0, 0.0)
+    for i in range(8):
+        body.push(i, 0.0)
+    other = SnakeBody(5)
+    other.copy_from(body)
+    assert np.array_equal(other.view(), body.view())
+    assert np.array_equal(other.previous(), body.previous())
+
+    # Edits through view() reach the mirrored copies once synced, wherever
+    # the live window starts
+    for _ in range(other._size):
+        other.push(0.0, 0.0)
+        other.view()[:, 1] += 1.0
+        other.sync_view()
+        size = other._size
+        live = (other._start + np.arange(len(other))) % size
+        assert np.array_equal(other._buf[live], other._buf[live + size])
+
+
+def test_extend_and_drop_tail():
+    body = SnakeBody(3, [(0, 0), (1, 1)])
+    body.extend_tail([(2, 2)])
+    with pytest.raises(ValueError):
+        body.extend_tail([(3, 3)])
+    assert body.drop_tail() == (2.0, 2.0)
+    assert body.view().tolist() == [[0, 0], [1, 1]]
+    with pytest.raises(IndexError):
+        SnakeBody(2).drop_tail()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from snakesim.chain import chain_passes, follow_chain, resample_path
+
+
+def follow_loop(points, follow):
+    # Gemini's original per-segment loop
+    points = points.copy()
+    for i in range(1, len(points)):
+        points[i] += (points[i - 1] - points[i]) * follow
+    return points
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 17, 64, 1000])
+@pytest.mark.parametrize("follow", [0.0, 0.3, 0.5, 0.9, 1.0])
+def test_follow_chain_matches_sequential_loop(n, follow):
+    rng = np.random.default_rng(n)
+    points = rng.uniform(-500.0, 500.0, (n, 2))
+    expected = follow_loop(points, follow)
+    result = follow_chain(points, follow)
+    assert result is points
+    assert np.allclose(points, expected, rtol=0.0, atol=1e-9)
+
+
+def test_follow_chain_over_many_steps():
+    rng = np.random.default_rng(0)
+    chain = np.zeros((200, 2))
+    expected = chain.copy()
+    for _ in range(300):
+        head = chain[0] + rng.uniform(-5.0, 5.0, 2)
+        chain[0] = expected[0] = head
+        follow_chain(chain, 0.3)
+        expected = follow_loop(expected, 0.3)
+    assert np.allclose(chain, expected, rtol=0.0, atol=1e-9)
+
+
+def test_chain_passes():
+    assert chain_passes(0.0, 100) == 0
+    assert chain_passes(1.0, 100) == 7
+    # 0.3 ** 32 is already below double precision
+    assert chain_passes(0.3, 10000) == 5
+    assert chain_passes(0.3, 4) == 2
+
+
+def test_resample_path_spacing():
+    # An L-shaped path: 30 along x, then 40 along y
+    path = np.array([(0.0, 0.0), (10.0, 0.0), (30.0, 0.0), (30.0, 40.0)])
+    out = resample_path(path, 9, 10.0)
+    steps = np.hypot(*np.diff(out, axis=0).T)
+    assert np.allclose(out[0], (0.0, 0.0))
+    assert np.allclose(steps[:7], 10.0)
+    assert np.allclose(out[3], (30.0, 0.0))
+    assert np.allclose(out[7], (30.0, 40.0))
+    # Points past the end stay on the last point
+    assert np.allclose(out[8], (30.0, 40.0))
+
+
+def test_resample_path_into_out():
+    out = np.empty((4, 2))
+    result = resample_path([(0, 0), (0, 9)], 4, 3.0, out=out)
+    assert result is out
+    assert np.allclose(out[:, 1], [0.0, 3.0, 6.0, 9.0])
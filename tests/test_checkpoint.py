@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from snakesim.checkpoint import Timeline, load_states, save_states
+from snakesim.engine import BatchEngine
+from snakesim.scripts import load_script
+
+
+def simulation(name):
+    """(step, snapshot, restore) of a fresh copy of script ``name``."""
+    m = load_script(name)
+    if name == "Claude":
+        snake = m.Snake(m.WIDTH // 2, m.HEIGHT // 2)
+        pentagon = m.Pentagon(m.WIDTH // 2, m.HEIGHT // 2, 200)
+        return (lambda: m.step(snake, pentagon), lambda: m.snapshot(snake, pentagon),
+                lambda state: m.restore(state, snake, pentagon))
+    if name == "Deepseek":
+        pentagon = m.Pentagon()
+        snakes = m.create_snakes(m.NUM_SNAKES)
+        world = m.SnakeWorld(snakes, m.SNAKE_SIZE) if len(snakes) > 1 else None
+        return (lambda: m.step(pentagon, snakes, world), lambda: m.snapshot(pentagon, snakes),
+                lambda state: m.restore(state, pentagon, snakes, world))
+    return m.step, m.snapshot, m.restore
+
+
+def same(a, b):
+    """Whether two snapshots hold exactly the same state."""
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return isinstance(b, (list, tuple)) and len(a) == len(b) and all(map(same, a, b))
+    return a == b
+
+
+def straight_run(name, steps):
+    step, snapshot, _ = simulation(name)
+    states = {0: snapshot()}
+    for i in range(1, steps + 1):
+        step()
+        states[i] = snapshot()
+    return states
+
+
+SCRIPTS = ["ChatGPT", "Claude", "Deepseek", "Gemini", "Julius"]
+
+
+@pytest.mark.parametrize("name", SCRIPTS)
+def test_seek_matches_a_straight_run(name):
+    expected = straight_run(name, 400)
+    step, snapshot, restore = simulation(name)
+    timeline = Timeline(step, snapshot, restore, every=50)
+    timeline.advance(400)
+    for target in [399, 123, 0, 250, 251, 7, 400]:
+        replayed = timeline.seek(target)
+        assert replayed < 50
+        assert timeline.position == target
+        assert same(snapshot(), expected[target]), target
+
+
+def test_thinning_keeps_seek_exact():
+    expected = straight_run("Deepseek", 600)
+    step, snapshot, restore = simulation("Deepseek")
+    timeline = Timeline(step, snapshot, restore, every=10, limit=8)
+    timeline.advance(600)
+    assert len(timeline.checkpoints) <= 8
+    assert timeline.every == 80
+    assert sorted(timeline.checkpoints) == list(range(0, 600, 80))
+    for target in [599, 5, 333, 160, 481]:
+        timeline.seek(target)
+        assert same(snapshot(), expected[target]), target
+
+
+@pytest.mark.parametrize("name", ["Gemini", "Deepseek"])
+def test_saved_checkpoints_replay_the_same_steps(name, tmp_path):
+    expected = straight_run(name, 300)
+    path = tmp_path / "checkpoints.npz"
+    timeline = Timeline(*simulation(name), every=100)
+    timeline.advance(300)
+    timeline.save(path)
+
+    step, snapshot, restore = simulation(name)
+    loaded = Timeline(step, snapshot, restore, every=100)
+    loaded.load(path)
+    assert sorted(loaded.checkpoints) == [0, 100, 200, 300]
+    for target in [250, 120, 300]:
+        loaded.seek(target)
+        assert same(snapshot(), expected[target]), target
+
+
+def test_engine_timeline_and_npz_arrays(tmp_path):
+    engine = BatchEngine(50, seed=3, speed=5.0)
+    timeline = Timeline(engine.step, engine.snapshot, engine.restore, every=64)
+    timeline.advance(500)
+    after = engine.snapshot()
+    timeline.seek(130)
+    timeline.seek(500)
+    assert same(engine.snapshot(), after)
+
+    path = tmp_path / "engine.npz"
+    save_states(path, timeline.checkpoints, {"every": timeline.every})
+    states, meta = load_states(path)
+    assert meta == {"every": 64}
+    assert sorted(states) == sorted(timeline.checkpoints)
+    for key, state in states.items():
+        assert same(state, timeline.checkpoints[key])
+        assert isinstance(state["pos"], np.ndarray)
+
+
+def test_seek_before_the_first_checkpoint():
+    engine = BatchEngine(2, seed=0)
+    timeline = Timeline(engine.step, engine.snapshot, engine.restore, every=5, position=10)
+    with pytest.raises(ValueError):
+        timeline.seek(9)
@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pytest
+
+from snakesim.collision import push_inside, sweep
+from snakesim.engine import BatchEngine
+
+
+def fast_engine(collision):
+    # Up to 60 px a step against a 150 px polygon turning 0.05 rad a step
+    return BatchEngine(500, radius=150.0, speed=np.linspace(2.0, 60.0, 500), rotation_speed=0.05,
+                       seed=2, collision=collision)
+
+
+def test_swept_heads_never_penetrate():
+    e = fast_engine("swept")
+    speed = np.hypot(*e.vel.T)
+    for _ in range(200):
+        e.step()
+        assert (e.wall_distances() >= e.head_radius[:, None] - 1e-9).all()
+    assert e.bounces.sum() > 0
+    assert np.allclose(np.hypot(*e.vel.T), speed)
+
+
+def test_discrete_heads_do_penetrate_at_speed():
+    # What the swept solver is for
+    e = fast_engine("discrete")
+    worst = np.inf
+    for _ in range(200):
+        e.step()
+        worst = min(worst, (e.wall_distances() - e.head_radius[:, None]).min())
+    assert worst < -1.0
+
+
+@pytest.mark.parametrize("dt", [0.5, 1.0, 7.0])
+def test_sweep_with_large_steps(dt):
+    n = 300
+    rng = np.random.default_rng(int(dt * 10))
+    heading = rng.uniform(0.0, 2 * math.pi, n)
+    vel = np.stack([np.cos(heading), np.sin(heading)], axis=1) * rng.uniform(1.0, 40.0, n)[:, None]
+    pos = np.tile([400.0, 300.0], (n, 1))
+    angle = np.zeros(n)
+    omega = rng.uniform(-0.05, 0.05, n)
+    center = np.array([400.0, 300.0])
+    radius = np.full(n, 200.0)
+    head = np.full(n, 10.0)
+    edge_phase = (2 * np.arange(5) + 1) * math.pi / 5
+    apothem = 200.0 * math.cos(math.pi / 5)
+    for _ in range(100):
+        sweep(pos, vel, angle, head, center, radius, 5, omega, dt)
+        phi = angle[:, None] + edge_phase
+        rel = pos - center
+        d = apothem - (rel[:, 0, None] * np.cos(phi) + rel[:, 1, None] * np.sin(phi))
+        assert (d >= 10.0 - 1e-9).all()
+
+
+def test_push_inside_only_moves_overlapping_rows():
+    center = np.array([0.0, 0.0])
+    pos = np.array([[0.0, 0.0], [500.0, 0.0], [0.0, -500.0]])
+    angle = np.zeros(3)
+    before = pos.copy()
+    push_inside(pos, np.array([0, 1]), np.full(3, 10.0), center, np.full(3, 100.0), 4, angle)
+    assert np.array_equal(pos[0], before[0])
+    assert np.array_equal(pos[2], before[2])
+    # Pushed into the corner of the square: 10 px inside both walls there
+    apothem = 100.0 * math.cos(math.pi / 4)
+    normals = np.array([[math.cos(a), math.sin(a)] for a in (np.arange(4) * 2 + 1) * math.pi / 4])
+    assert (apothem - normals @ pos[1] >= 10.0 - 1e-9).all()
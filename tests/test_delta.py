@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from snakesim.body import SnakeBody
+from snakesim.delta import HeadDeltaDecoder, HeadDeltaEncoder
+
+
+def walk(bodies, rng):
+    for body in bodies:
+        x, y = body.head
+        body.push(x + rng.uniform(-4.0, 4.0), y + rng.uniform(-4.0, 4.0))
+
+
+def assert_decoded(bodies, decoded, scale):
+    assert len(decoded) == len(bodies)
+    for body, copy in zip(bodies, decoded):
+        assert copy.capacity == body.capacity
+        assert len(copy) == len(body)
+        assert np.abs(copy.view() - body.view()).max() <= 0.5 / scale + 1e-9
+
+
+def test_round_trip_sends_deltas():
+    rng = np.random.default_rng(0)
+    bodies = [SnakeBody(40, [(100.0, 100.0)]), SnakeBody.filled(25, 300.0, 200.0)]
+    encoder = HeadDeltaEncoder(scale=16.0)
+    decoder = HeadDeltaDecoder()
+    sizes = []
+    for step in range(200):
+        walk(bodies, rng)
+        if step == 120:
+            # Moved in place, as a wall push does: goes out as a patch
+            bodies[1].view()[5:8] += 3.0
+            bodies[1].sync_view()
+        message = encoder.encode(bodies)
+        sizes.append(len(message))
+        assert_decoded(bodies, decoder.decode(message), 16.0)
+    assert encoder.keyframes == 1
+    # One head step and a patch count per snake, plus three patches
+    assert sizes[-1] == 5 + 8 * 2
+    assert sizes[120] == 5 + 8 * 2 + 3 * 12
+
+
+def test_keyframe_after_a_dropped_message():
+    rng = np.random.default_rng(1)
+    bodies = [SnakeBody.filled(30, 50.0, 60.0) for _ in range(3)]
+    encoder = HeadDeltaEncoder()
+    decoder = HeadDeltaDecoder()
+    for _ in range(10):
+        walk(bodies, rng)
+        decoder.decode(encoder.encode(bodies))
+    walk(bodies, rng)
+    encoder.encode(bodies)  # lost on the way
+    walk(bodies, rng)
+    with pytest.raises(ValueError):
+        decoder.decode(encoder.encode(bodies))
+
+    encoder.request_keyframe()
+    walk(bodies, rng)
+    message = encoder.encode(bodies)
+    assert message[:1] == b"K"
+    assert_decoded(bodies, decoder.decode(message), encoder.scale)
+    walk(bodies, rng)
+    message = encoder.encode(bodies)
+    assert message[:1] == b"D"
+    assert_decoded(bodies, decoder.decode(message), encoder.scale)
+
+
+def test_body_change_forces_keyframe():
+    bodies = [SnakeBody(10, [(0.0, 0.0)])]
+    encoder = HeadDeltaEncoder()
+    decoder = HeadDeltaDecoder()
+    decoder.decode(encoder.encode(bodies))
+    bodies[0].push(1.0, 1.0)
+    bodies[0].push(2.0, 2.0)
+    message = encoder.encode(bodies)
+    assert message[:1] == b"K"
+    assert_decoded(bodies, decoder.decode(message), encoder.scale)
+
+
+def test_bodies_longer_than_uint16():
+    rng = np.random.default_rng(2)
+    body = SnakeBody.filled(70000, 10.0, 20.0)
+    body.view()[:] = rng.uniform(0.0, 800.0, (70000, 2))
+    body.sync_view()
+    encoder = HeadDeltaEncoder()
+    decoder = HeadDeltaDecoder()
+    assert_decoded([body], decoder.decode(encoder.encode([body])), encoder.scale)
+    for _ in range(3):
+        walk([body], rng)
+        # A patch past index 65535
+        body.view()[66000] += 1.0
+        body.sync_view()
+        message = encoder.encode([body])
+        assert message[:1] == b"D"
+        assert_decoded([body], decoder.decode(message), encoder.scale)
+
+
+def test_decoder_rejects_bad_input():
+    decoder = HeadDeltaDecoder()
+    with pytest.raises(ValueError):
+        decoder.decode(b"X")
+    encoder = HeadDeltaEncoder()
+    body = SnakeBody.filled(4, 0.0, 0.0)
+    encoder.encode([body])
+    body.push(1.0, 0.0)
+    with pytest.raises(ValueError):
+        decoder.decode(encoder.encode([body]))
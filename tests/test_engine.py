@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from snakesim.engine import BatchEngine
+
+
+def engine(**kwargs):
+    n = 200
+    settings = dict(radius=np.linspace(120.0, 300.0, n), rotation_speed=np.linspace(-0.03, 0.03, n),
+                    speed=np.linspace(1.0, 12.0, n), length=12, seed=1)
+    settings.update(kwargs)
+    return BatchEngine(n, **settings)
+
+
+def test_rotating_frame_matches_world_frame():
+    world = engine()
+    rotating = engine(frame="rotating")
+    for _ in range(2000):
+        assert np.array_equal(world.step(), rotating.step())
+    assert world.bounces.sum() > 0
+    assert np.array_equal(world.bounces, rotating.bounces)
+    assert np.allclose(world.angle, rotating.angle, rtol=0.0, atol=1e-12)
+    assert np.allclose(world.pos, rotating.pos, rtol=0.0, atol=1e-6)
+    assert np.allclose(world.vel, rotating.vel, rtol=0.0, atol=1e-9)
+    assert np.allclose(world.bodies(), rotating.bodies(), rtol=0.0, atol=1e-6)
+    assert np.allclose(world.wall_distances(), rotating.wall_distances(), rtol=0.0, atol=1e-6)
+
+
+@pytest.mark.parametrize("frame", ["world", "rotating"])
+def test_bounces_keep_speed(frame):
+    e = engine(frame=frame)
+    speed = np.hypot(*e.vel.T)
+    e.run(500)
+    assert e.bounces.min() > 0
+    assert np.allclose(np.hypot(*e.vel.T), speed)
+
+
+@pytest.mark.parametrize("frame", ["world", "rotating"])
+def test_bodies_are_head_history(frame):
+    e = engine(frame=frame)
+    heads = []
+    for _ in range(20):
+        e.step()
+        heads.append(e.pos.copy())
+    expected = np.stack(heads[::-1][:e.length], axis=1)
+    assert np.allclose(e.bodies(), expected, rtol=0.0, atol=1e-9)
+    assert np.allclose(e.body(7), expected[7], rtol=0.0, atol=1e-9)
+
+
+@pytest.mark.parametrize("frame", ["world", "rotating"])
+def test_snapshot_restore_replays_exactly(frame):
+    e = engine(frame=frame)
+    e.run(100)
+    state = e.snapshot()
+    e.run(300)
+    after = e.snapshot()
+    e.restore(state)
+    e.run(300)
+    again = e.snapshot()
+    for key in after:
+        assert np.array_equal(after[key], again[key])
+
+
+def test_restore_rejects_other_frame():
+    with pytest.raises(ValueError):
+        engine().restore(engine(frame="rotating").snapshot())
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        BatchEngine(0)
+    with pytest.raises(ValueError):
+        BatchEngine(1, sides=2)
+    with pytest.raises(ValueError):
+        BatchEngine(1, radius=10.0, head_radius=10.0)
+    with pytest.raises(ValueError):
+        BatchEngine(1, collision="swept", frame="rotating")
@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pytest
+
+from snakesim.geometry import RegularPolygon, sector_of
+
+
+def segment_distance(px, py, x1, y1, x2, y2):
+    # The scripts' old per-edge distance
+    dx, dy = x2 - x1, y2 - y1
+    t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def nearest_segment(polygon, x, y):
+    """The old search: the edge segment closest to (x, y), over every edge."""
+    verts = polygon.vertices()
+    n = len(verts)
+    return min(range(n), key=lambda k: segment_distance(x, y, *verts[k], *verts[(k + 1) % n]))
+
+
+def point_in_polygon(x, y, verts):
+    # The old ray-casting test
+    inside = False
+    for (x1, y1), (x2, y2) in zip(verts, verts[1:] + verts[:1]):
+        if (y1 > y) != (y2 > y) and x1 + (y - y1) * (x2 - x1) / (y2 - y1) > x:
+            inside = not inside
+    return inside
+
+
+@pytest.mark.parametrize("sides", [3, 5, 8, 60])
+def test_sector_matches_nearest_segment_inside(sides):
+    rng = np.random.default_rng(sides)
+    polygon = RegularPolygon((400.0, 300.0), 200.0, sides, angle=rng.uniform(-10.0, 10.0))
+    checked = 0
+    for x, y in rng.uniform((200.0, 100.0), (600.0, 500.0), (2000, 2)).tolist():
+        if not polygon.contains(x, y):
+            continue
+        assert polygon.sector(x, y) == nearest_segment(polygon, x, y)
+        checked += 1
+    assert checked > 500
+
+
+@pytest.mark.parametrize("sides", [3, 5, 7, 1000])
+def test_sector_of_is_the_nearest_edge_line(sides):
+    rng = np.random.default_rng(sides)
+    angle = rng.uniform(-10.0, 10.0, 5000)
+    rel = rng.uniform(-400.0, 400.0, (5000, 2))
+    k = sector_of(rel[:, 0], rel[:, 1], angle, sides)
+    # The edge line nearest (or furthest outside) has the largest projection
+    # on its outward normal, inside and outside the polygon alike
+    phi = angle[:, None] + (2 * np.arange(sides) + 1) * math.pi / sides
+    projection = rel[:, 0, None] * np.cos(phi) + rel[:, 1, None] * np.sin(phi)
+    assert np.array_equal(k, projection.argmax(axis=1))
+    # Scalars give the same answer as arrays
+    assert sector_of(rel[0, 0], rel[0, 1], angle[0], sides) == k[0]
+
+
+def test_nearest_edge_and_contains_match_the_full_search():
+    rng = np.random.default_rng(0)
+    polygon = RegularPolygon((400.0, 300.0), 200.0, 5, step=0.01)
+    for _ in range(300):
+        polygon.rotate()
+        x, y = rng.uniform((150.0, 50.0), (650.0, 550.0))
+        k, distance = polygon.nearest_edge(x, y)
+        assert k == polygon.sector(x, y)
+        assert distance == pytest.approx(min(polygon.signed_distances(x, y)), abs=1e-9)
+        assert polygon.contains(x, y) == point_in_polygon(x, y, polygon.vertices())
@@ -0,0 +1,142 @@
+import pygame
+import pytest
+
+from snakesim import governor as governor_module
+from snakesim.governor import FrameGovernor
+
+
+class Clock:
+    """Stands in for time.perf_counter and time.sleep."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(governor_module.time, "perf_counter", clock.perf_counter)
+    monkeypatch.setattr(governor_module.time, "sleep", clock.sleep)
+    return clock
+
+
+def frames(governor, clock, seconds, steps=1, changed=None):
+    """Run the loop for ``seconds`` of fake time; returns the frames drawn."""
+    drawn = 0
+    end = clock.now + seconds
+    while clock.now < end:
+        if governor.render(steps, changed):
+            drawn += 1
+        governor.wait()
+    return drawn
+
+
+def window(kind):
+    return pygame.event.Event(kind)
+
+
+def test_caps_at_fps_and_sleeps_between_frames(clock):
+    governor = FrameGovernor(fps=60)
+    assert governor.render()
+    governor.wait()
+    assert clock.slept == [pytest.approx(1 / 60)]
+    assert frames(governor, clock, 2.0) == pytest.approx(120, abs=1)
+
+
+def test_uncapped_never_sleeps(clock):
+    governor = FrameGovernor(fps=0)
+    for _ in range(10):
+        assert governor.render()
+        governor.wait()
+    assert clock.slept == []
+
+
+def test_drops_to_idle_rate_when_nothing_changes(clock):
+    governor = FrameGovernor(fps=60, idle_fps=10, idle_after=1.0)
+    frames(governor, clock, 1.0, steps=0)
+    assert governor.idle
+    assert frames(governor, clock, 2.0, steps=0) == pytest.approx(20, abs=1)
+    # The next change is drawn straight away, at the full rate again
+    assert governor.render(1)
+    assert not governor.idle
+    assert frames(governor, clock, 1.0) == pytest.approx(60, abs=1)
+
+
+def test_input_wakes_an_idle_window(clock):
+    governor = FrameGovernor(fps=60, idle_fps=10)
+    frames(governor, clock, 1.5, steps=0)
+    assert governor.render(0)
+    clock.now += 0.01
+    assert not governor.render(0)
+    governor.handle(window(pygame.KEYDOWN))
+    assert not governor.idle
+    assert governor.render(0)
+
+
+def test_hidden_and_background_caps(clock):
+    governor = FrameGovernor(fps=60, background_fps=30, hidden_fps=1, wake_hz=10)
+    governor.handle(window(pygame.WINDOWFOCUSLOST))
+    assert governor.rate == 30
+    assert frames(governor, clock, 2.0) == pytest.approx(60, abs=1)
+
+    governor.handle(window(pygame.WINDOWMINIMIZED))
+    assert governor.rate == 1
+    clock.slept.clear()
+    assert frames(governor, clock, 5.0) == pytest.approx(5, abs=1)
+    # Still wakes wake_hz times a second to run the physics
+    assert max(clock.slept) <= 0.1 + 1e-9
+
+    governor.handle(window(pygame.WINDOWRESTORED))
+    assert governor.render()
+    governor.handle(window(pygame.WINDOWFOCUSGAINED))
+    assert governor.rate == 60
+
+
+def test_input_does_not_lift_hidden_cap(clock):
+    governor = FrameGovernor(fps=60, hidden_fps=1)
+    governor.handle(window(pygame.WINDOWMINIMIZED))
+    assert governor.render()
+    for _ in range(5):
+        clock.now += 0.05
+        governor.handle(window(pygame.KEYDOWN))
+        governor.handle(window(pygame.MOUSEMOTION))
+        assert not governor.render()
+
+
+def test_skips_drawing_when_behind_and_drawing_is_costly(clock):
+    governor = FrameGovernor(fps=60, physics_hz=60, max_skip=4)
+    governor.render_ms = 20.0
+    # One step per frame is on schedule
+    assert governor.render(1)
+    clock.now += 1.0
+    # Five steps in one frame is behind: skip at most max_skip in a row
+    results = [governor.render(5) for _ in range(6)]
+    assert results == [False, False, False, False, True, False]
+    assert governor.skipped == 5
+
+
+def test_cheap_drawing_is_never_skipped(clock):
+    governor = FrameGovernor(fps=60, physics_hz=60)
+    governor.render_ms = 0.5
+    clock.now += 1.0
+    assert governor.render(10)
+    assert governor.skipped == 0
+
+
+def test_wait_measures_draw_cost(clock):
+    governor = FrameGovernor(fps=60)
+    for _ in range(100):
+        assert governor.render()
+        clock.now += 0.008  # drawing takes 8 ms
+        governor.wait()
+    assert governor.render_ms == pytest.approx(8.0, rel=1e-3)
+    # The time spent drawing counts towards the frame period
+    assert clock.slept[-1] == pytest.approx(1 / 60 - 0.008)
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from snakesim.paramsweep import build_chunks, build_grid, parse_range, run_sweep
+
+RANGES = {
+    "rotation_speed": [0.0, 0.02, 0.04],
+    "snake_speed": [2.0, 5.0],
+    "radius": [150.0],
+    "sides": [4, 6],
+    "length": [10],
+}
+
+
+def sweep(out_dir, ranges=RANGES, messages=None):
+    log = messages.append if messages is not None else (lambda message: None)
+    return run_sweep(ranges, 200, str(out_dir), seeds=2, chunk_size=5, workers=2, log=log)
+
+
+def test_resumed_sweep_matches_a_full_run(tmp_path):
+    full = sweep(tmp_path / "full")
+    with open(full) as f:
+        expected = f.read()
+
+    partial = tmp_path / "partial"
+    sweep(partial)
+    chunks = sorted(os.listdir(partial / "chunks"))
+    assert len(chunks) == 6
+    # As if the sweep was stopped two chunks before the end, one of them
+    # killed while writing
+    os.remove(partial / "chunks" / chunks[1])
+    os.rename(partial / "chunks" / chunks[4], partial / "chunks" / (chunks[4] + ".tmp"))
+    os.remove(partial / "results.csv")
+
+    messages = []
+    resumed = sweep(partial, messages=messages)
+    assert "24 runs in 6 chunks, 2 left to do" in messages
+    with open(resumed) as f:
+        assert f.read() == expected
+
+
+def test_results_cover_every_run(tmp_path):
+    with open(sweep(tmp_path)) as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith("rotation_speed,snake_speed,radius,sides,length,run,seed")
+    runs = [int(line.split(",")[5]) for line in lines[1:]]
+    assert runs == list(range(24))
+
+
+def test_refuses_a_different_sweep_in_the_same_directory(tmp_path):
+    sweep(tmp_path)
+    with pytest.raises(SystemExit):
+        sweep(tmp_path, dict(RANGES, radius=[180.0]))
+
+
+def test_grid_and_chunks():
+    grid = build_grid(RANGES, seeds=2)
+    assert len(grid) == 24
+    assert [config["run"] for config in grid] == list(range(24))
+    chunks = build_chunks(grid, 5)
+    for chunk in chunks:
+        assert len(chunk) <= 5
+        assert len({(c["sides"], c["length"]) for c in chunk}) == 1
+    assert sorted(c["run"] for chunk in chunks for c in chunk) == list(range(24))
+
+
+def test_parse_range():
+    assert parse_range("3") == [3.0]
+    assert parse_range("1, 3,6") == [1.0, 3.0, 6.0]
+    assert parse_range("0:0.1:3") == pytest.approx([0.0, 0.05, 0.1])
+    assert parse_range("3:8:6", int) == [3, 4, 5, 6, 7, 8]
+    assert parse_range("3:4:5", int) == [3, 4]
@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+
+from snakesim.pipeline import PhysicsThread, TripleBuffer
+
+
+def test_triple_buffer_hands_over_the_newest_slot():
+    made = iter(range(3))
+    buffer = TripleBuffer(lambda: {"id": next(made), "value": None})
+    assert buffer.acquire() is None
+
+    buffer.back["value"] = 1
+    buffer.publish()
+    buffer.back["value"] = 2
+    buffer.publish()
+    assert buffer.dropped == 1
+    front = buffer.acquire()
+    assert front is buffer.front
+    assert front["value"] == 2
+    assert buffer.acquire() is None
+
+    # The writer never gets the slot the reader holds
+    for value in range(3, 10):
+        assert buffer.back is not buffer.front
+        buffer.back["value"] = value
+        buffer.publish()
+    assert front["value"] == 2
+    assert buffer.acquire()["value"] == 9
+    assert buffer.published == 9
+
+
+class Counter:
+    """A simulation whose state is the number of steps taken."""
+
+    def __init__(self, fail_at=None):
+        self.steps = 0
+        self.fail_at = fail_at
+
+    def step(self):
+        self.steps += 1
+        if self.steps == self.fail_at:
+            raise RuntimeError("step %d failed" % self.steps)
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < end, "timed out"
+        time.sleep(0.001)
+
+
+def test_poll_returns_steps_and_the_newest_copy():
+    sim = Counter()
+    physics = PhysicsThread(sim.step, 500, make=lambda: [0],
+                            copy=lambda view: view.__setitem__(0, sim.steps))
+    assert physics.view is None
+    assert physics.alpha == 1.0
+    assert physics.poll() == 0
+    physics.start()
+    try:
+        total = 0
+        for _ in range(20):
+            wait_for(lambda: physics.buffer.published > 0)
+            total += physics.poll()
+            # The copy is the state after exactly the steps polled so far
+            assert physics.view[0] == total
+            assert 0.0 <= physics.alpha <= 1.0
+            time.sleep(0.005)
+    finally:
+        physics.stop()
+    assert total > 0
+    assert not physics._thread.is_alive()
+
+
+def test_step_error_is_raised_by_poll():
+    sim = Counter(fail_at=3)
+    physics = PhysicsThread(sim.step, 1000, make=lambda: [0],
+                            copy=lambda view: view.__setitem__(0, sim.steps)).start()
+    wait_for(lambda: physics.error is not None)
+    # The error stopped the thread
+    physics._thread.join(5.0)
+    assert not physics._thread.is_alive()
+    with pytest.raises(RuntimeError, match="step 3 failed"):
+        physics.poll()
+    physics.stop()
+    assert sim.steps == 3
+
+
+def test_stop_waits_for_the_thread():
+    sim = Counter()
+    started = threading.Event()
+
+    def step():
+        started.set()
+        sim.step()
+
+    physics = PhysicsThread(step, 1000, make=lambda: [0], copy=lambda view: None).start()
+    started.wait(5.0)
+    physics.stop()
+    steps = sim.steps
+    time.sleep(0.02)
+    assert sim.steps == steps
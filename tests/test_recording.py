@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from snakesim.engine import BatchEngine
+from snakesim.recording import Player, Recording, RecordingWriter, record_engine
+
+
+def run(tmp_path, steps=700, keyframe_every=64):
+    """Record a run and keep every state of it in memory too."""
+    engine = BatchEngine(4, seed=5, speed=np.array([2.0, 4.0, 6.0, 9.0]), length=40)
+    expected = BatchEngine(4, seed=5, speed=np.array([2.0, 4.0, 6.0, 9.0]), length=40)
+    path = record_engine(engine, str(tmp_path / "run.snkrec"), steps, keyframe_every)
+    states = [(expected.pos.copy(), expected.vel.copy(), expected.angle.copy(), expected.bodies())]
+    for _ in range(steps):
+        expected.step()
+        states.append((expected.pos.copy(), expected.vel.copy(), expected.angle.copy(), expected.bodies()))
+    return path, states
+
+
+def test_records_reopen_through_memmap(tmp_path):
+    path, states = run(tmp_path)
+    recording = Recording(path)
+    assert isinstance(recording.records, np.memmap)
+    assert len(recording) == len(states) == 701
+    assert recording.n == 4 and recording.length == 40
+    assert recording.config["sides"] == 5
+    for step in [0, 1, 63, 64, 65, 399, 700]:
+        pos, vel, angle, _ = states[step]
+        frame = recording.frame(step)
+        assert np.allclose(frame[:, 0:2], pos, atol=1e-3)
+        assert np.allclose(frame[:, 2:4], vel, atol=1e-5)
+        assert np.allclose(recording.angles(step), angle, atol=1e-5)
+        assert np.array_equal(recording.positions(step), frame[:, 0:2])
+
+
+def test_body_is_rebuilt_from_keyframes_and_heads(tmp_path):
+    path, states = run(tmp_path)
+    recording = Recording(path)
+    assert len(recording.index) == 11
+    for step in [0, 5, 39, 40, 63, 64, 100, 127, 128, 650, 700]:
+        bodies = states[step][3]
+        for snake in range(4):
+            assert np.allclose(recording.body(step, snake), bodies[snake], atol=1e-3), (step, snake)
+    with pytest.raises(IndexError):
+        recording.body(701)
+
+
+def test_player_interpolates_and_clamps(tmp_path):
+    path, states = run(tmp_path, steps=100)
+    player = Player(Recording(path), rate=60.0)
+    player.seek(10.5)
+    pos, _ = player.state()
+    assert np.allclose(pos, (states[10][0] + states[11][0]) / 2, atol=1e-3)
+    player.advance(1.0)
+    assert player.position == pytest.approx(70.5)
+    player.paused = True
+    player.advance(1.0)
+    assert player.position == pytest.approx(70.5)
+    player.seek(1000)
+    assert player.position == 100
+    player.seek(-5)
+    assert player.position == 0
+
+
+def test_writer_fills_missing_keyframe_bodies(tmp_path):
+    path = str(tmp_path / "heads.snkrec")
+    with RecordingWriter(path, {"sides": 5}, n=1, length=3, keyframe_every=2) as writer:
+        for i in range(5):
+            writer.append((i, 2 * i), (1.0, 2.0), 0.1 * i)
+    recording = Recording(path)
+    # Without a body a keyframe holds the head in every segment
+    assert recording.body(4).tolist() == [[4, 8], [4, 8], [4, 8]]
+    assert recording.body(3).tolist() == [[3, 6], [2, 4], [2, 4]]
+
+
+def test_rejects_other_and_unclosed_files(tmp_path):
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a recording at all")
+    with pytest.raises(ValueError):
+        Recording(str(other))
+    path = str(tmp_path / "open.snkrec")
+    writer = RecordingWriter(path, {}, n=1, length=1)
+    writer.append((0, 0), (0, 0), 0.0)
+    writer._file.flush()
+    with pytest.raises(ValueError):
+        Recording(path)
+    writer.close()
+    assert len(Recording(path)) == 1
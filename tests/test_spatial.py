@@ -0,0 +1,82 @@
+import numpy as np
+
+from snakesim.body import SnakeBody
+from snakesim.spatial import SnakeWorld, SpatialHash
+
+
+class Walker:
+    """A snake as SnakeWorld sees one: a head-first body and a speed."""
+
+    def __init__(self, capacity, x, y, speed):
+        self.segments = SnakeBody(capacity, [(x, y)])
+        self.speed = speed
+
+
+def brute_force(snakes, reach, neck):
+    hits = []
+    for i, snake in enumerate(snakes):
+        head = np.array(snake.segments.head)
+        for owner, other in enumerate(snakes):
+            points = other.segments.view()
+            close = np.flatnonzero(((points - head) ** 2).sum(axis=1) < reach * reach)
+            hits.extend((i, owner, int(index)) for index in close if owner != i or index > neck)
+    return sorted(hits)
+
+
+def test_collisions_match_brute_force():
+    rng = np.random.default_rng(0)
+    snakes = [Walker(rng.integers(5, 60), *rng.uniform(0.0, 120.0, 2), 3.0) for _ in range(12)]
+    world = SnakeWorld(snakes, radius=4.0, neck=3)
+    total = 0
+    for step in range(400):
+        for snake in snakes:
+            x, y = snake.segments.head
+            dx, dy = rng.uniform(-3.0, 3.0, 2)
+            snake.segments.push(min(max(x + dx, 0.0), 120.0), min(max(y + dy, 0.0), 120.0))
+        hits = world.track()
+        if step % 7 == 0:
+            # Move a few points in place, as a wall push does
+            snake = snakes[step % len(snakes)]
+            view = snake.segments.view()
+            moved = np.arange(1, len(view), 3)
+            view[moved] += 5.0
+            snake.segments.sync_view()
+            world.moved(step % len(snakes), moved)
+            hits = world.collisions()
+        expected = brute_force(snakes, 8.0, 3)
+        assert hits == expected, step
+        total += len(hits)
+    assert total > 100
+
+
+def test_rebuild_after_restore():
+    rng = np.random.default_rng(1)
+    snakes = [Walker(30, *rng.uniform(0.0, 60.0, 2), 2.0) for _ in range(5)]
+    world = SnakeWorld(snakes, radius=3.0)
+    for _ in range(50):
+        for snake in snakes:
+            x, y = snake.segments.head
+            snake.segments.push(x + rng.uniform(-2.0, 2.0), y + rng.uniform(-2.0, 2.0))
+        world.track()
+    states = [snake.segments.snapshot() for snake in snakes]
+    for _ in range(50):
+        for snake in snakes:
+            x, y = snake.segments.head
+            snake.segments.push(x + 1.0, y)
+        world.track()
+    for snake, state in zip(snakes, states):
+        snake.segments.restore(state)
+    world.rebuild()
+    # Default neck: enough segments to cover 2 * radius at the snake's speed
+    assert world.collisions() == brute_force(snakes, 6.0, 4)
+
+
+def test_spatial_hash_neighbours():
+    grid = SpatialHash(10.0)
+    grid.insert(grid.cell(5.0, 5.0), 0, 0)
+    grid.insert(grid.cell(15.0, 5.0), 1, 0)
+    grid.insert(grid.cell(35.0, 5.0), 2, 0)
+    assert sorted(grid.neighbours(9.0, 9.0)) == [(0, 0), (1, 0)]
+    grid.remove(grid.cell(15.0, 5.0), 1, 0)
+    assert sorted(grid.neighbours(9.0, 9.0)) == [(0, 0)]
+    assert len(grid.cells) == 2